@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+HTTP Load - Load test for the Genesis API server cores
+
+This script starts the Genesis API with the threaded server and with the
+asyncio server on ephemeral ports and sends the same request load to both,
+reporting requests per second and latency percentiles. Clients of the
+threaded server open a new connection per request (it closes connections
+after every response); clients of the asyncio server reuse keep-alive
+connections.
+
+Usage:
+    GENESIS_OPERATION_STORE=memory python benchmarks/http_load.py --requests 5000 --concurrency 32
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+import http.client
+import socketserver
+import concurrent.futures
+from typing import Dict, List, Any, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'builder'))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of a list of values.
+    
+    Args:
+        values: Sample values
+        pct: Percentile between 0 and 100
+    
+    Returns:
+        Percentile value, 0 for an empty sample
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def start_threaded_server(handler_class) -> Tuple[int, Any]:
+    """Start the ThreadingTCPServer core, returning its port and a stop function."""
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    def stop():
+        server.shutdown()
+        server.server_close()
+    return server.server_address[1], stop
+
+
+def start_async_server(handler_class, max_concurrency: int) -> Tuple[int, Any]:
+    """Start the asyncio server core on a background loop, returning its port and a stop function."""
+    from async_server import AsyncHTTPServer
+    
+    server = AsyncHTTPServer(handler_class, '127.0.0.1', 0, max_concurrency=max_concurrency)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    
+    def stop():
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+    return server.port, stop
+
+
+def run_load(port: int, path: str, requests: int, concurrency: int, keep_alive: bool) -> Dict[str, Any]:
+    """
+    Send GET requests from concurrent clients and measure latencies.
+    
+    Args:
+        port: Server port on localhost
+        path: Request path
+        requests: Total number of requests
+        concurrency: Number of concurrent clients
+        keep_alive: Reuse one connection per client instead of connecting per request
+    
+    Returns:
+        Dict containing throughput, latency percentiles and error count
+    """
+    per_client = [requests // concurrency + (1 if index < requests % concurrency else 0)
+                  for index in range(concurrency)]
+    
+    def client(count: int) -> Tuple[List[float], int]:
+        latencies, errors = [], 0
+        connection = None
+        for _ in range(count):
+            started = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 500:
+                    errors += 1
+                if not keep_alive or response.will_close:
+                    connection.close()
+                    connection = None
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                if connection is not None:
+                    connection.close()
+                connection = None
+            latencies.append(time.perf_counter() - started)
+        if connection is not None:
+            connection.close()
+        return latencies, errors
+    
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(client, per_client))
+    elapsed = time.perf_counter() - started
+    
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors for _, errors in results),
+        'elapsed': elapsed,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 50) * 1000,
+        'p99': percentile(latencies, 99) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Genesis API server cores under load')
+    parser.add_argument('--requests', type=int, default=5000, help='Requests per server')
+    parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients')
+    parser.add_argument('--path', default='/api/status', help='Request path')
+    parser.add_argument('--server', choices=['both', 'threaded', 'async'], default='both',
+                        help='Server core(s) to benchmark')
+    parser.add_argument('--max-concurrency', type=int, default=64,
+                        help='Request concurrency limit of the asyncio server')
+    args = parser.parse_args()
+    
+    import logging
+    logging.disable(logging.INFO)
+    import genesis_api
+    
+    class QuietHandler(genesis_api.GenesisAPIHandler):
+        def log_message(self, format, *args):
+            pass
+    
+    servers = []
+    if args.server in ('both', 'threaded'):
+        servers.append(('threaded', False, lambda: start_threaded_server(QuietHandler)))
+    if args.server in ('both', 'async'):
+        servers.append(('async', True, lambda: start_async_server(QuietHandler, args.max_concurrency)))
+    
+    print(f"{args.requests} x GET {args.path}, {args.concurrency} concurrent clients")
+    print(f"{'server':<10} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>8}")
+    for name, keep_alive, start in servers:
+        port, stop = start()
+        try:
+            # Warm up code paths and caches before measuring
+            run_load(port, args.path, min(200, args.requests), min(4, args.concurrency), keep_alive)
+            result = run_load(port, args.path, args.requests, args.concurrency, keep_alive)
+        finally:
+            stop()
+        print(f"{name:<10} {result['rps']:>10.1f} {result['p50']:>10.2f} {result['p99']:>10.2f} "
+              f"{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Run Benchmarks - Benchmark suite for the Genesis Builder and API hot paths
+
+This script measures the cost of the orchestration layer with the stub
+`docker`/`kubectl` executables in benchmarks/stubs (or the fake Docker
+daemon) standing in for real tools. Each scenario runs in its own process,
+from the repository root, so its peak RSS can be reported. Results are
+compared with a stored baseline. Baselines hold absolute timings of the
+machine that recorded them, so regressions beyond the tolerance only fail the
+run with --check, meant for runs on that machine.
+
+Scenarios:
+    build_all         Build-all of many components with the docker CLI stub
+    build_all_engine  The same through the Engine API backend and the fake daemon
+    status_polls      Concurrent GET /api/components through the asyncio server
+    kubectl_status    Kubernetes status from a large `kubectl get` output
+    deploy            Incremental deploy of a large kustomization, then a no-op redeploy
+    startup           Import time and time until a new API process serves and is ready
+
+Usage:
+    python benchmarks/run_benchmarks.py                  # run all, report differences to the baseline
+    python benchmarks/run_benchmarks.py --check          # run all, fail on regressions
+    python benchmarks/run_benchmarks.py --save-baseline  # run all, store as new baseline
+    python benchmarks/run_benchmarks.py --scenario status_polls --polls 5000
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+from typing import Dict, List, Any, Callable
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'src', 'builder'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from http_load import percentile
+
+STUB_DIR = os.path.join(BENCHMARK_DIR, 'stubs')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+SCENARIOS = ('build_all', 'build_all_engine', 'status_polls', 'kubectl_status', 'deploy', 'startup')
+
+
+def _write_config(workdir: str, components: int, **sections: Any) -> str:
+    """
+    Write a builder configuration with generated components.
+    
+    The components GenesisBuilder adds by default are pinned to the benchmark
+    build context and count towards the number of components.
+    
+    Args:
+        workdir: Directory for the configuration, build contexts and state
+        components: Number of components to define, at least the two defaults
+        **sections: Configuration sections merged over the defaults
+    
+    Returns:
+        Path of the configuration file
+    """
+    import yaml
+    
+    context = os.path.join(workdir, 'context')
+    os.makedirs(context, exist_ok=True)
+    with open(os.path.join(context, 'Dockerfile'), 'w') as f:
+        f.write('FROM scratch\nCOPY . /app\n')
+    
+    config = {
+        # Nothing listens on the discard port, so registry API calls fail fast and pushes use the CLI
+        'registry': {'url': '127.0.0.1:9'},
+        'builder': {'cache': False, 'state_dir': os.path.join(workdir, 'state'), 'docker_backend': 'cli'},
+        'kubernetes': {'watch_status': False, 'namespace': 'singularity-system'},
+        'components': {
+            'singularity-engine': {'repository': 'singularity-engine', 'context': context,
+                                   'dockerfile': os.path.join(context, 'Dockerfile')},
+            'timescaledb': {'repository': 'timescaledb', 'tag': 'latest-pg14', 'external': True}
+        }
+    }
+    for index in range(max(components - len(config['components']), 0)):
+        config['components'][f"component-{index}"] = {'repository': f"component-{index}", 'context': context,
+                                                      'dockerfile': os.path.join(context, 'Dockerfile')}
+    for name, section in sections.items():
+        config.setdefault(name, {}).update(section)
+    
+    path = os.path.join(workdir, 'builder_config.yml')
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return path
+
+
+def _latency_stats(prefix: str, latencies: List[float]) -> Dict[str, float]:
+    return {
+        f"{prefix}_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        f"{prefix}_p99_ms": round(percentile(latencies, 99) * 1000, 2)
+    }
+
+
+def _timed_builds(builder) -> List[float]:
+    """Record the duration of every build_component call of a builder."""
+    latencies = []
+    build_component = builder.build_component
+    
+    def timed(name: str, **kwargs) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = build_component(name, **kwargs)
+        latencies.append(time.perf_counter() - started)
+        return result
+    builder.build_component = timed
+    return latencies
+
+
+def _build_all(builder, latencies: List[float]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    results = builder.build_all_components()
+    elapsed = time.perf_counter() - started
+    return dict({
+        'components': len(results),
+        'failed': sum(1 for result in results.values() if result.get('status') == 'error'),
+        'duration_s': round(elapsed, 3),
+        'builds_per_s': round(len(results) / elapsed, 2)
+    }, **_latency_stats('build', latencies))
+
+
+def scenario_build_all(workdir: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Build-all of many components through the docker CLI stub."""
+    from genesis_builder import GenesisBuilder
+    
+    builder = GenesisBuilder(_write_config(workdir, args.components,
+                                           builder={'max_parallel_builds': args.workers}))
+    return _build_all(builder, _timed_builds(builder))
+
+
+def scenario_build_all_engine(workdir: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Build-all of many components through the Engine API backend and the fake daemon."""
+    from fake_docker_engine import FakeDockerEngine
+    from genesis_builder import GenesisBuilder
+    
+    with FakeDockerEngine(latency=args.latency, output_lines=args.output_lines) as engine:
+        engine.add_image('scratch')
+        builder = GenesisBuilder(_write_config(
+            workdir, args.components,
+            builder={'max_parallel_builds': args.workers, 'docker_backend': 'engine',
+                     'docker_socket': engine.socket_path}
+        ))
+        return _build_all(builder, _timed_builds(builder))
+
+
+def scenario_status_polls(workdir: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Concurrent component status polls through the asyncio API server."""
+    os.environ['GENESIS_CONFIG'] = _write_config(workdir, args.components)
+    os.environ.setdefault('GENESIS_OPERATION_STORE', 'memory')
+    import genesis_api
+    from async_server import AsyncHTTPServer
+    
+    class QuietHandler(genesis_api.GenesisAPIHandler):
+        def log_message(self, format, *args):
+            pass
+    
+    server = AsyncHTTPServer(QuietHandler, '127.0.0.1', 0, max_concurrency=64)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    
+    async def client(count: int, latencies: List[float], errors: List[int]):
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        request = b'GET /api/components HTTP/1.1\r\nHost: bench\r\n\r\n'
+        for _ in range(count):
+            started = time.perf_counter()
+            writer.write(request)
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if not status_line.startswith(b'HTTP/1.1 200'):
+                errors.append(1)
+        writer.close()
+    
+    async def run_clients() -> float:
+        latencies, errors = [], []
+        per_client = max(1, args.polls // args.clients)
+        started = time.perf_counter()
+        await asyncio.gather(*(client(per_client, latencies, errors) for _ in range(args.clients)))
+        return time.perf_counter() - started, latencies, errors
+    
+    elapsed, latencies, errors = asyncio.run(run_clients())
+    return dict({
+        'clients': args.clients,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'duration_s': round(elapsed, 3),
+        'requests_per_s': round(len(latencies) / elapsed, 1)
+    }, **_latency_stats('poll', latencies))
+
+
+def scenario_kubectl_status(workdir: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Kubernetes status parsed from a large kubectl output."""
+    from genesis_builder import GenesisBuilder
+    
+    os.environ['GENESIS_STUB_OBJECTS'] = str(args.objects)
+    builder = GenesisBuilder(_write_config(workdir, 1))
+    latencies = []
+    for _ in range(args.iterations):
+        started = time.perf_counter()
+        status = builder.get_kubernetes_status('singularity-system')
+        latencies.append(time.perf_counter() - started)
+    return dict({
+        'objects': len(status.get('deployments', [])),
+        'calls_per_s': round(len(latencies) / sum(latencies), 2)
+    }, **_latency_stats('status', latencies))
+
+
+def scenario_deploy(workdir: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Incremental deploy of a large kustomization followed by an unchanged redeploy."""
+    from genesis_builder import GenesisBuilder
+    
+    os.environ['GENESIS_STUB_OBJECTS'] = str(args.objects)
+    kustomize_path = os.path.join(workdir, 'kustomize')
+    os.makedirs(kustomize_path, exist_ok=True)
+    builder = GenesisBuilder(_write_config(
+        workdir, 1, clusters={'bench': {'context': 'bench', 'kustomize_path': kustomize_path}}
+    ))
+    
+    started = time.perf_counter()
+    first = builder.deploy_to_clusters(['bench'])['clusters']['bench']
+    first_elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    second = builder.deploy_to_clusters(['bench'])['clusters']['bench']
+    second_elapsed = time.perf_counter() - started
+    return {
+        'objects': first.get('objects'),
+        'applied': len(first.get('applied', [])),
+        'failed': len(first.get('failed', [])) + len(second.get('failed', [])),
+        'deploy_s': round(first_elapsed, 3),
+        'applies_per_s': round(len(first.get('applied', [])) / first_elapsed, 2),
+        'noop_deploy_s': round(second_elapsed, 3)
+    }
+
+
+def scenario_startup(workdir: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Import time and time until a freshly started API process serves and is ready."""
+    import startup_time
+    
+    return startup_time.measure(args.startup_runs)
+
+
+def run_child(scenario: str, args: argparse.Namespace):
+    """Run one scenario in this process and print its result as JSON."""
+    import logging
+    scenarios: Dict[str, Callable[[str, argparse.Namespace], Dict[str, Any]]] = {
+        name: globals()[f"scenario_{name}"] for name in SCENARIOS
+    }
+    with tempfile.TemporaryDirectory(prefix='genesis-bench-') as workdir:
+        # genesis_builder configures logging on import; keep benchmark output clean
+        logging.disable(logging.CRITICAL)
+        result = scenarios[scenario](workdir, args)
+    result['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    print(json.dumps(result))
+
+
+def run_scenario(scenario: str, argv: List[str], args: argparse.Namespace) -> Dict[str, Any]:
+    """Run a scenario in a child process with the stubs on PATH."""
+    env = dict(os.environ)
+    env['PATH'] = STUB_DIR + os.pathsep + env.get('PATH', '')
+    env['GENESIS_STUB_LATENCY'] = str(args.latency)
+    env['GENESIS_STUB_OUTPUT_LINES'] = str(args.output_lines)
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', scenario] + argv,
+                             env=env, cwd=REPO_ROOT, capture_output=True, text=True)
+    if process.returncode != 0:
+        return {'error': process.stderr.strip().splitlines()[-1] if process.stderr.strip() else 'failed'}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """
+    Compare results with a baseline.
+    
+    Metrics ending in `_per_s` must not drop, metrics ending in `_ms`, `_s` or
+    `_mb` must not grow by more than the tolerance; error counts must not grow.
+    
+    Returns:
+        Descriptions of regressions
+    """
+    regressions = []
+    for scenario, result in results.items():
+        for metric, base in (baseline.get(scenario) or {}).items():
+            value = result.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(base, (int, float)):
+                continue
+            if metric.endswith('_per_s'):
+                regressed = value < base * (1 - tolerance)
+            elif metric.endswith(('_ms', '_s', '_mb')):
+                regressed = value > base * (1 + tolerance)
+            elif metric in ('errors', 'failed'):
+                regressed = value > base
+            else:
+                continue
+            if regressed:
+                regressions.append(f"{scenario}.{metric}: {value} (baseline {base})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Genesis Builder and API hot paths')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='Scenario to run (repeatable), defaults to all')
+    parser.add_argument('--components', type=int, default=100, help='Components in build-all scenarios')
+    parser.add_argument('--workers', type=int, default=8, help='Parallel builds in build-all scenarios')
+    parser.add_argument('--clients', type=int, default=1000, help='Concurrent clients polling status')
+    parser.add_argument('--polls', type=int, default=10000, help='Total status polls')
+    parser.add_argument('--objects', type=int, default=500, help='Objects in kubectl scenarios')
+    parser.add_argument('--iterations', type=int, default=20, help='Calls in the kubectl status scenario')
+    parser.add_argument('--startup-runs', type=int, default=5, help='API process starts in the startup scenario')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds every stub command takes')
+    parser.add_argument('--output-lines', type=int, default=20, help='Output lines per build step')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative regression')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline file')
+    parser.add_argument('--check', action='store_true',
+                        help='Fail on regressions beyond the tolerance (baseline recorded on this machine)')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args, _ = parser.parse_known_args()
+    
+    if args.child:
+        run_child(args.child, args)
+        return
+    
+    # Scenario parameters are passed on to the child processes unchanged
+    argv = [arg for arg in sys.argv[1:] if arg not in ('--save-baseline', '--check')]
+    results = {}
+    for scenario in args.scenario or SCENARIOS:
+        results[scenario] = run_scenario(scenario, argv, args)
+        print(f"{scenario:<18} {json.dumps(results[scenario])}")
+    
+    if args.save_baseline:
+        # Scenarios that were not run keep their stored baseline
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+        return
+    
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if any('error' in result for result in results.values()) or (regressions and args.check):
+        sys.exit(1)
+    if regressions:
+        print('Timings are machine-specific; pass --check to fail on regressions')
+    else:
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Startup Time - Startup benchmark for the Genesis API process
+
+This script measures how long a freshly started API process takes until
+`/api/status` answers and until `/ready` reports the builder warmed up, and
+breaks the import of `genesis_api` down per module (`python -X importtime`).
+Each measurement starts a new interpreter, like a container restart.
+
+Usage:
+    python benchmarks/startup_time.py --runs 5 --top 20
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import http.client
+from typing import Dict, List, Optional, Tuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BENCHMARK_DIR, '..'))
+BUILDER_DIR = os.path.join(ROOT_DIR, 'src', 'builder')
+
+
+def _environment(state_dir: str, port: Optional[int] = None) -> Dict[str, str]:
+    """Environment of a benchmarked API process with its own state directory."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = BUILDER_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    env.setdefault('GENESIS_CONFIG', os.path.join(ROOT_DIR, 'configs', 'builder_config.yml'))
+    env['GENESIS_STATE_DIR'] = state_dir
+    if port is not None:
+        env['GENESIS_API_PORT'] = str(port)
+    return env
+
+
+def import_times(module: str = 'genesis_api') -> List[Tuple[str, float, float]]:
+    """
+    Measure the import time of a module and everything it imports.
+    
+    Args:
+        module: Module to import
+    
+    Returns:
+        List of (module, self ms, cumulative ms) in import order
+    """
+    with tempfile.TemporaryDirectory(prefix='genesis-startup-') as state_dir:
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                                 env=_environment(state_dir), cwd=state_dir, capture_output=True, text=True)
+    times = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return times
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _get_status(port: int, path: str) -> Optional[int]:
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+        connection.request('GET', path)
+        status = connection.getresponse().status
+        connection.close()
+        return status
+    except OSError:
+        return None
+
+
+def time_to_serve(paths: Tuple[str, ...] = ('/api/status', '/ready'), timeout: float = 30) -> Dict[str, float]:
+    """
+    Start an API process and measure when each path first answers 200.
+    
+    Args:
+        paths: Paths polled in order
+        timeout: Seconds to wait for each path
+    
+    Returns:
+        Dict mapping paths to milliseconds since the process was started
+    """
+    port = _free_port()
+    with tempfile.TemporaryDirectory(prefix='genesis-startup-') as state_dir:
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, os.path.join(BUILDER_DIR, 'genesis_api.py')],
+                                   env=_environment(state_dir, port), cwd=state_dir,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            results = {}
+            for path in paths:
+                deadline = time.perf_counter() + timeout
+                while _get_status(port, path) != 200:
+                    if process.poll() is not None or time.perf_counter() > deadline:
+                        raise RuntimeError(f"API process did not serve {path} (exit code {process.poll()})")
+                    time.sleep(0.005)
+                results[path] = (time.perf_counter() - started) * 1000
+            return results
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+def measure(runs: int = 5) -> Dict[str, float]:
+    """
+    Measure startup times over several process starts.
+    
+    Args:
+        runs: Number of process starts
+    
+    Returns:
+        Dict containing median milliseconds to import genesis_api, to serve
+        /api/status and to report ready
+    """
+    imports, status, ready = [], [], []
+    for _ in range(runs):
+        times = import_times()
+        imports.append(next((cumulative for name, _, cumulative in times if name == 'genesis_api'), 0.0))
+        served = time_to_serve()
+        status.append(served['/api/status'])
+        ready.append(served['/ready'])
+    return {
+        'import_ms': round(statistics.median(imports), 1),
+        'first_status_ms': round(statistics.median(status), 1),
+        'ready_ms': round(statistics.median(ready), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure Genesis API startup time')
+    parser.add_argument('--runs', type=int, default=5, help='Process starts to take the median of')
+    parser.add_argument('--top', type=int, default=20, help='Slowest modules to list')
+    args = parser.parse_args()
+    
+    print(f"Startup over {args.runs} runs (median):")
+    for name, value in measure(args.runs).items():
+        print(f"  {name:<18} {value:>10.1f}")
+    
+    project_modules = {name[:-3] for name in os.listdir(BUILDER_DIR) if name.endswith('.py')}
+    times = import_times()
+    print("\nSlowest imports of genesis_api (cumulative ms, * = project module):")
+    for name, self_ms, cumulative_ms in sorted(times, key=lambda entry: entry[2], reverse=True)[:args.top]:
+        marker = '*' if name in project_modules else ' '
+        print(f"  {marker} {name:<40} {cumulative_ms:>8.1f} {self_ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
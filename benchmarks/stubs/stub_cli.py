@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Stub CLI - Fake `docker` and `kubectl` executables for benchmarks
+
+The `docker` and `kubectl` scripts next to this module answer the commands
+Genesis Builder runs with plausible output after a configurable delay, so
+the cost of the orchestration layer can be measured without a daemon or a
+cluster. Behaviour is controlled through environment variables:
+    
+    GENESIS_STUB_LATENCY       Seconds every command takes (default 0.05)
+    GENESIS_STUB_OUTPUT_LINES  Output lines per build step (default 20)
+    GENESIS_STUB_LINE_BYTES    Length of each output line (default 80)
+    GENESIS_STUB_BUILD_STEPS   Dockerfile steps per build (default 5)
+    GENESIS_STUB_OBJECTS       Objects rendered by kustomize and listed by get (default 50)
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+from typing import List
+
+
+def _setting(name: str, default: float) -> float:
+    return float(os.environ.get(f"GENESIS_STUB_{name}", default))
+
+
+def _digest(value: str) -> str:
+    return 'sha256:' + hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def _filler(prefix: str, width: int) -> str:
+    return (prefix + ' ' + 'x' * width)[:max(width, len(prefix))]
+
+
+def docker(args: List[str]) -> int:
+    """Answer a docker command."""
+    lines = int(_setting('OUTPUT_LINES', 20))
+    width = int(_setting('LINE_BYTES', 80))
+    if args[:2] == ['buildx', 'build']:
+        args = args[1:]
+    command = args[0] if args else ''
+    
+    if command == 'build':
+        steps = int(_setting('BUILD_STEPS', 5))
+        # BuildKit writes progress to stderr
+        out = sys.stderr
+        out.write('#1 [internal] load build definition from Dockerfile\n#1 transferring dockerfile: 312B done\n'
+                  '#1 DONE 0.0s\n')
+        for step in range(steps):
+            vertex = step + 2
+            out.write(f"#{vertex} [{step + 1}/{steps}] RUN step {step + 1}\n")
+            for line in range(lines):
+                out.write(f"#{vertex} {line * 0.01:.3f} {_filler(f'output {line}', width)}\n")
+            out.write(f"#{vertex} DONE 0.0s\n")
+        out.write(f"#{steps + 2} exporting to image\n#{steps + 2} DONE 0.0s\n")
+        return 0
+    if command == 'push':
+        image = args[-1]
+        print(f"The push refers to repository [{image.rsplit(':', 1)[0]}]")
+        for layer in range(3):
+            print(f"{_digest(image + str(layer))[7:19]}: Pushed")
+        print(f"{image.rsplit(':', 1)[-1]}: digest: {_digest(image)} size: 1234")
+        return 0
+    if command == 'login':
+        sys.stdin.read()
+        print('Login Succeeded')
+        return 0
+    if args[:2] == ['image', 'inspect']:
+        image = args[2]
+        print(json.dumps([{'Id': _digest(image), 'RepoTags': [image], 'RepoDigests': [], 'Size': 1000000}]))
+        return 0
+    if args[:2] == ['image', 'ls']:
+        return 0
+    return 0
+
+
+def _deployment(index: int, namespace: str, width: int) -> dict:
+    name = f"component-{index}"
+    return {
+        'apiVersion': 'apps/v1',
+        'kind': 'Deployment',
+        'metadata': {'name': name, 'namespace': namespace, 'generation': 1,
+                     'annotations': {'genesis/padding': 'x' * width}},
+        'spec': {'replicas': 1, 'template': {'spec': {'containers': [{'name': name, 'image': f"{name}:latest"}]}}},
+        'status': {'readyReplicas': 1, 'updatedReplicas': 1, 'availableReplicas': 1, 'observedGeneration': 1}
+    }
+
+
+def kubectl(args: List[str]) -> int:
+    """Answer a kubectl command."""
+    objects = int(_setting('OBJECTS', 50))
+    width = int(_setting('LINE_BYTES', 80))
+    namespace = args[args.index('-n') + 1] if '-n' in args else 'default'
+    command = args[0] if args else ''
+    
+    if command == 'kustomize':
+        documents = []
+        for index in range(objects):
+            deployment = _deployment(index, 'singularity-system', width)
+            del deployment['status']
+            documents.append(json.dumps(deployment))
+        # JSON is valid YAML, one document per object
+        print('\n---\n'.join(documents))
+        return 0
+    if command == 'apply':
+        obj = json.loads(sys.stdin.read() or '{}')
+        print(f"{obj.get('kind', 'object').lower()}/{obj.get('metadata', {}).get('name', '')} serverside-applied")
+        return 0
+    if command == 'get' and '-o' in args:
+        items = [_deployment(index, namespace, width) for index in range(objects)]
+        print(json.dumps({'apiVersion': 'v1', 'kind': 'List', 'items': items}))
+        return 0
+    if command in ('delete', 'set', 'rollout', 'get'):
+        print(f"{' '.join(args[:2])}: ok")
+        return 0
+    return 0
+
+
+def main(tool: str, args: List[str]) -> int:
+    """
+    Run a stub command.
+    
+    Args:
+        tool: `docker` or `kubectl`
+        args: Command line arguments
+    
+    Returns:
+        Exit code
+    """
+    time.sleep(_setting('LATENCY', 0.05))
+    return docker(args) if tool == 'docker' else kubectl(args)
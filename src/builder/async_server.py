@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Async Server - asyncio HTTP/1.1 server core for the Genesis API
+
+This module serves a `BaseHTTPRequestHandler` subclass from an asyncio event
+loop. Connections are persistent (HTTP/1.1 keep-alive with Content-Length
+framing), idle connections cost no thread, and handler methods run on a
+bounded thread pool so at most `max_concurrency` requests are processed at
+the same time. Long-lived requests (event streams, long polls), as reported
+by the handler's `is_long_lived`, run on a separate pool bounded by
+`max_streams`, so open streams never hold up short requests such as health
+checks. The handler's routes and responses are used unchanged.
+"""
+
+import io
+import asyncio
+import contextlib
+import logging
+import threading
+import http.client
+import email.parser
+import concurrent.futures
+from typing import Any, Optional, Tuple, Type
+
+logger = logging.getLogger('genesis_api')
+
+# Limits protecting the server from oversized requests
+MAX_REQUEST_LINE = 8192
+MAX_HEADERS = 100
+MAX_BODY_SIZE = 10 * 1024 * 1024
+
+
+class _TransportWriter:
+    """
+    File-like object handing bytes written by a handler thread to the event loop.
+    
+    Must be created on the event loop thread.
+    """
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, writer: asyncio.StreamWriter,
+                 drain_timeout: float = 30):
+        self.loop = loop
+        self.writer = writer
+        self.drain_timeout = drain_timeout
+        self.bytes_written = 0
+        self._loop_thread = threading.get_ident()
+    
+    def write(self, data: bytes) -> int:
+        if self.writer.is_closing():
+            raise BrokenPipeError('Client disconnected')
+        data = bytes(data)
+        self.loop.call_soon_threadsafe(self.writer.write, data)
+        self.bytes_written += len(data)
+        return len(data)
+    
+    def flush(self):
+        """Wait until written data is handed to the socket (applies backpressure to streams)."""
+        if self.writer.is_closing():
+            raise BrokenPipeError('Client disconnected')
+        if threading.get_ident() == self._loop_thread:
+            # The connection handler drains after the request when running on the loop
+            return
+        future = asyncio.run_coroutine_threadsafe(self.writer.drain(), self.loop)
+        try:
+            future.result(self.drain_timeout)
+        except (ConnectionError, concurrent.futures.TimeoutError) as e:
+            raise BrokenPipeError(f"Client not reading: {str(e)}")
+
+
+class _AsyncRequestMixin:
+    """
+    Lets a BaseHTTPRequestHandler subclass process one request parsed by the
+    async server instead of reading from its own socket.
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def __init__(self, command: str, path: str, request_version: str, headers: http.client.HTTPMessage,
+                 body: bytes, wfile: _TransportWriter, client_address: Tuple[str, int], server: Any):
+        # BaseHTTPRequestHandler.__init__ would start reading from a socket, so it is not called
+        self.command = command
+        self.path = path
+        self.request_version = request_version
+        self.requestline = f"{command} {path} {request_version}"
+        self.headers = headers
+        self.rfile = io.BytesIO(body)
+        self.wfile = wfile
+        self.client_address = client_address
+        self.server = server
+        self.close_connection = False
+        self.has_content_length = False
+    
+    def send_header(self, keyword: str, value: str):
+        if keyword.lower() == 'content-length':
+            self.has_content_length = True
+        super().send_header(keyword, value)
+
+
+class AsyncHTTPServer:
+    """
+    asyncio HTTP/1.1 server dispatching requests to a BaseHTTPRequestHandler subclass.
+    """
+    
+    def __init__(self, handler_class: Type, host: str = '0.0.0.0', port: int = 8080,
+                 max_concurrency: int = 64, keepalive_timeout: float = 15, max_streams: int = 256):
+        """
+        Initialize the server.
+        
+        Args:
+            handler_class: BaseHTTPRequestHandler subclass implementing do_GET/do_POST,
+                optionally `is_long_lived()` to mark requests served on the stream pool
+            host: Address to listen on
+            port: Port to listen on
+            max_concurrency: Maximum number of requests processed at the same time
+            keepalive_timeout: Seconds an idle persistent connection is kept open
+            max_streams: Maximum number of long-lived requests open at the same time;
+                further ones are answered with 503
+        """
+        self.handler_class = type(f"Async{handler_class.__name__}", (_AsyncRequestMixin, handler_class), {})
+        self.host = host
+        self.port = port
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.keepalive_timeout = keepalive_timeout
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                              thread_name_prefix='genesis-http')
+        self.max_streams = max(1, int(max_streams))
+        self.stream_executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_streams,
+                                                                     thread_name_prefix='genesis-stream')
+        self.streams = 0
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def start(self):
+        """Start listening; the bound port is available as `port` afterwards."""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  limit=MAX_REQUEST_LINE * 2)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Genesis API server (asyncio) listening on {self.host}:{self.port}")
+    
+    async def serve_forever(self):
+        """Start (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+    
+    async def stop(self):
+        """Stop accepting connections."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.executor.shutdown(wait=False)
+        self.stream_executor.shutdown(wait=False)
+    
+    @staticmethod
+    async def _send_simple(writer: asyncio.StreamWriter, status: int, message: str):
+        """Send a minimal error response and close the connection."""
+        body = f'{{"error": "{message}"}}'.encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {http.client.responses.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+    
+    async def _read_request(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> Optional[Tuple[str, str, str, Any, bytes]]:
+        """
+        Read one request from a connection.
+        
+        Returns:
+            Tuple of (command, path, version, headers, body), or None to close the connection
+        """
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=self.keepalive_timeout)
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            return None
+        if not request_line or not request_line.strip():
+            return None
+        
+        parts = request_line.decode('latin-1').strip().split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            await self._send_simple(writer, 400, 'Bad request line')
+            return None
+        command, path, version = parts
+        
+        header_lines = []
+        try:
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=self.keepalive_timeout)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                header_lines.append(line)
+                if len(header_lines) > MAX_HEADERS:
+                    await self._send_simple(writer, 431, 'Too many headers')
+                    return None
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            return None
+        headers = email.parser.BytesParser(_class=http.client.HTTPMessage).parsebytes(b''.join(header_lines))
+        
+        if headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            await self._send_simple(writer, 411, 'Chunked request bodies are not supported')
+            return None
+        try:
+            length = int(headers.get('Content-Length', 0))
+        except ValueError:
+            await self._send_simple(writer, 400, 'Invalid Content-Length')
+            return None
+        if length > MAX_BODY_SIZE:
+            await self._send_simple(writer, 413, 'Request body too large')
+            return None
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), timeout=self.keepalive_timeout) \
+                if length else b''
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            return None
+        return command, path, version, headers, body
+    
+    @staticmethod
+    def _is_long_lived(handler) -> bool:
+        """Check whether the handler marks a request as long-lived."""
+        is_long_lived = getattr(handler, 'is_long_lived', None)
+        try:
+            return bool(is_long_lived and is_long_lived())
+        except Exception as e:
+            logger.debug(f"Failed to classify {handler.command} {handler.path}: {str(e)}")
+            return False
+    
+    def _dispatch(self, handler) -> None:
+        """Run the handler method for a request on a worker thread."""
+        method = getattr(handler, f"do_{handler.command}", None)
+        if method is None:
+            handler.send_error(501, f"Unsupported method ({handler.command})")
+            return
+        method()
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        client_address = writer.get_extra_info('peername') or ('', 0)
+        self.connections += 1
+        try:
+            while True:
+                request = await self._read_request(reader, writer)
+                if request is None:
+                    break
+                command, path, version, headers, body = request
+                self.requests += 1
+                
+                wfile = _TransportWriter(loop, writer)
+                handler = self.handler_class(command, path, version, headers, body, wfile, client_address, self)
+                if self._is_long_lived(handler):
+                    # Streams and long polls hold a thread for their whole life, keep them off the request pool
+                    if self.streams >= self.max_streams:
+                        await self._send_simple(writer, 503, 'Too many open streams')
+                        break
+                    executor, semaphore = self.stream_executor, contextlib.nullcontext()
+                    self.streams += 1
+                else:
+                    executor, semaphore = self.executor, self._semaphore
+                try:
+                    async with semaphore:
+                        await loop.run_in_executor(executor, self._dispatch, handler)
+                except Exception as e:
+                    logger.error(f"Error handling {command} {path}: {str(e)}")
+                    if wfile.bytes_written == 0:
+                        await self._send_simple(writer, 500, 'Internal Server Error')
+                    break
+                finally:
+                    if executor is self.stream_executor:
+                        self.streams -= 1
+                await writer.drain()
+                
+                # Responses without Content-Length are delimited by closing the connection
+                connection = headers.get('Connection', '').lower()
+                if handler.close_connection or not handler.has_content_length or connection == 'close' or \
+                        (version == 'HTTP/1.0' and connection != 'keep-alive'):
+                    break
+        except (ConnectionError, BrokenPipeError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, BrokenPipeError):
+                pass
+
+
+def run_async_server(handler_class: Type, host: str = '0.0.0.0', port: int = 8080,
+                     max_concurrency: int = 64, keepalive_timeout: float = 15, max_streams: int = 256):
+    """
+    Run an AsyncHTTPServer until interrupted.
+    
+    Args:
+        handler_class: BaseHTTPRequestHandler subclass implementing do_GET/do_POST
+        host: Address to listen on
+        port: Port to listen on
+        max_concurrency: Maximum number of requests processed at the same time
+        keepalive_timeout: Seconds an idle persistent connection is kept open
+        max_streams: Maximum number of long-lived requests open at the same time
+    """
+    server = AsyncHTTPServer(handler_class, host, port, max_concurrency, keepalive_timeout, max_streams)
+    asyncio.run(server.serve_forever())
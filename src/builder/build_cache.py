@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Build Cache - Content-addressed build fingerprints for Genesis Builder
+
+This module computes a fingerprint of everything that goes into a component
+build (context files, Dockerfile, build arguments, base image digests) and
+keeps an index of the fingerprint of each component's last successful build,
+so unchanged components can skip `docker build` and `docker push` entirely.
+Context files are hashed through a per-file (mtime, size, hash) index, so
+only files that changed since the previous scan are read.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+from build_context import iter_context_files
+
+logger = logging.getLogger('genesis_cache')
+
+# Size of the chunks used when hashing files
+HASH_CHUNK_SIZE = 1024 * 1024
+# Files modified this recently (nanoseconds) are re-hashed on the next scan, since a
+# change within the same mtime tick would otherwise go unnoticed
+RACY_MTIME_NS = 2 * 1000 ** 3
+
+FROM_PATTERN = re.compile(r'^\s*FROM\s+(?:--\S+\s+)*(\S+)(?:\s+AS\s+(\S+))?', re.IGNORECASE | re.MULTILINE)
+
+
+def hash_file(path: str) -> str:
+    """
+    Hash the content of a file.
+    
+    Args:
+        path: Path of the file
+    
+    Returns:
+        Hex SHA-256 digest of the file content (or symlink target, nothing for directories)
+    """
+    digest = hashlib.sha256()
+    if os.path.islink(path):
+        digest.update(os.readlink(path).encode('utf-8'))
+        return digest.hexdigest()
+    if os.path.isdir(path):
+        return digest.hexdigest()
+    
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def base_images(dockerfile_content: str) -> List[str]:
+    """
+    Find the external base images of a Dockerfile.
+    
+    Args:
+        dockerfile_content: Content of the Dockerfile
+    
+    Returns:
+        List of base image references, excluding build stages and `scratch`
+    """
+    images = []
+    stages = set()
+    for match in FROM_PATTERN.finditer(dockerfile_content):
+        image, stage = match.group(1), match.group(2)
+        if image.lower() != 'scratch' and image not in stages and image not in images:
+            images.append(image)
+        if stage:
+            stages.add(stage)
+    return images
+
+
+class ContextIndex:
+    """
+    Per-file (mtime, size, hash) index of build contexts.
+    
+    Scanning a context stats every file sent to the daemon but only reads
+    files whose modification time or size changed since the previous scan.
+    Each context has its own JSON index file in the index directory.
+    """
+    
+    def __init__(self, directory: str):
+        """
+        Initialize the index.
+        
+        Args:
+            directory: Directory holding the per-context index files
+        """
+        self.directory = directory
+        self._entries: Dict[str, Dict[str, List[Any]]] = {}
+        self._lock = threading.Lock()
+    
+    def _path(self, context: str) -> str:
+        """Index file of a context, named after its absolute path."""
+        name = hashlib.sha256(os.path.abspath(context).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, f"{name}.json")
+    
+    def _load(self, context: str) -> Dict[str, List[Any]]:
+        """
+        Get the entries of a context, loading them from disk on first use.
+        
+        Returns:
+            Dict mapping context-relative paths to [mtime_ns, size, hash]
+        """
+        with self._lock:
+            entries = self._entries.get(context)
+        if entries is not None:
+            return entries
+        try:
+            with open(self._path(context), 'r') as f:
+                entries = json.load(f).get('files', {})
+        except FileNotFoundError:
+            entries = {}
+        except Exception as e:
+            logger.error(f"Failed to load context index of {context}: {str(e)}")
+            entries = {}
+        return entries
+    
+    def _save(self, context: str, entries: Dict[str, List[Any]]):
+        """Write the entries of a context to disk atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(context)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'context': os.path.abspath(context), 'files': entries}, f, sort_keys=True)
+        os.replace(tmp_path, path)
+    
+    def scan(self, context: str) -> Dict[str, Any]:
+        """
+        Scan the files of a build context, hashing changed files only.
+        
+        Args:
+            context: Path of the build context
+        
+        Returns:
+            Dict containing `files` (list of (path, size, hash) tuples in
+            archive order), total `bytes`, the number of files `hashed` and
+            the scan duration in `seconds`
+        """
+        started = time.monotonic()
+        key = os.path.abspath(context)
+        previous = self._load(key)
+        racy_after = time.time_ns() - RACY_MTIME_NS
+        entries: Dict[str, List[Any]] = {}
+        files: List[Tuple[str, int, str]] = []
+        hashed = 0
+        
+        # The index files change with every scan; a context containing them does not hash them
+        own_dir = os.path.relpath(os.path.abspath(self.directory), key)
+        own_prefix = None if own_dir.startswith('..') else own_dir.replace(os.sep, '/') + '/'
+        
+        for path in iter_context_files(context):
+            full_path = os.path.join(context, path)
+            stat = os.lstat(full_path)
+            if path.endswith('/'):
+                # Directory entries carry no content
+                files.append((path, 0, hash_file(full_path)))
+                continue
+            entry = previous.get(path)
+            if own_prefix and path.startswith(own_prefix):
+                files.append((path, stat.st_size, ''))
+                continue
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                digest = entry[2]
+            else:
+                digest = hash_file(full_path)
+                hashed += 1
+            if stat.st_mtime_ns < racy_after:
+                entries[path] = [stat.st_mtime_ns, stat.st_size, digest]
+            files.append((path, stat.st_size, digest))
+        
+        with self._lock:
+            self._entries[key] = entries
+        if entries != previous:
+            try:
+                self._save(key, entries)
+            except Exception as e:
+                logger.error(f"Failed to save context index of {context}: {str(e)}")
+        
+        return {
+            'files': files,
+            'bytes': sum(size for _, size, _ in files),
+            'hashed': hashed,
+            'seconds': time.monotonic() - started
+        }
+
+
+class BuildCache:
+    """
+    Index of build-input fingerprints of successful component builds.
+    
+    The index is a small JSON file mapping component names to the fingerprint
+    and image references of their last successful build.
+    """
+    
+    def __init__(self, index_path: str):
+        """
+        Initialize the cache and load its index.
+        
+        Args:
+            index_path: Path of the JSON index file
+        """
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._index = self._load()
+    
+    def _load(self) -> Dict[str, Any]:
+        """
+        Load the index from disk.
+        
+        Returns:
+            Dict mapping component names to cache entries
+        """
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Failed to load build cache index {self.index_path}: {str(e)}")
+            return {}
+    
+    def _save(self):
+        """Write the index to disk atomically. Caller must hold the lock."""
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+    
+    def fingerprint(self, context: str, dockerfile: str, build_args: List[str], image_name: str,
+                    resolve_digest: Callable[[str], Optional[str]],
+                    files: Optional[List[Tuple[str, int, str]]] = None,
+                    tag: str = 'latest') -> Optional[str]:
+        """
+        Compute the build-input fingerprint of a component.
+        
+        Args:
+            context: Path of the build context
+            dockerfile: Path of the Dockerfile
+            build_args: Build arguments passed to `docker build`; bare `KEY`
+                arguments contribute their value from the environment
+            image_name: Target image name (registry and repository)
+            resolve_digest: Callable returning the local digest of a base image
+            files: Context files as (path, size, hash) from ContextIndex.scan;
+                the context is walked and hashed if not given
+            tag: Tag the image is published under
+        
+        Returns:
+            Hex fingerprint, or None if a base image could not be resolved
+        """
+        digest = hashlib.sha256()
+        digest.update(f"image\0{image_name}\0tag\0{tag}\0".encode('utf-8'))
+        
+        with open(dockerfile, 'rb') as f:
+            dockerfile_content = f.read()
+        digest.update(b'dockerfile\0' + dockerfile_content + b'\0')
+        
+        for arg in sorted(build_args):
+            if '=' not in arg:
+                # `docker build` takes the value of a bare KEY from the environment
+                value = os.environ.get(arg)
+                arg = f"{arg}={value}" if value is not None else f"{arg}\0unset"
+            digest.update(f"arg\0{arg}\0".encode('utf-8'))
+        
+        for image in base_images(dockerfile_content.decode('utf-8', errors='replace')):
+            image_digest = resolve_digest(image)
+            if not image_digest:
+                logger.info(f"Base image {image} not resolvable, build will not be cached")
+                return None
+            digest.update(f"base\0{image}\0{image_digest}\0".encode('utf-8'))
+        
+        # The cache's own state must not invalidate builds whose context contains it
+        state_dir = os.path.relpath(os.path.dirname(os.path.abspath(self.index_path)), os.path.abspath(context))
+        state_prefix = None if state_dir.startswith('..') else state_dir.replace(os.sep, '/') + '/'
+        
+        if files is None:
+            files = [(path, 0, hash_file(os.path.join(context, path))) for path in iter_context_files(context)]
+        for path, _, file_hash in files:
+            if state_prefix and path.startswith(state_prefix):
+                continue
+            digest.update(f"file\0{path}\0{file_hash}\0".encode('utf-8'))
+        
+        return digest.hexdigest()
+    
+    def lookup(self, component_name: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the cached build of a component matching a fingerprint.
+        
+        Args:
+            component_name: Name of the component
+            fingerprint: Build-input fingerprint
+        
+        Returns:
+            Cache entry of the last successful build, or None on a miss
+        """
+        with self._lock:
+            entry = self._index.get(component_name)
+        if entry and entry.get('fingerprint') == fingerprint:
+            return dict(entry)
+        return None
+    
+    def record(self, component_name: str, fingerprint: str, entry: Dict[str, Any]):
+        """
+        Record a successful build of a component.
+        
+        Args:
+            component_name: Name of the component
+            fingerprint: Build-input fingerprint
+            entry: Image references and metadata of the build
+        """
+        with self._lock:
+            self._index[component_name] = dict(entry, fingerprint=fingerprint)
+            try:
+                self._save()
+            except Exception as e:
+                logger.error(f"Failed to save build cache index {self.index_path}: {str(e)}")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Build Context - Docker build context inspection for Genesis Builder
+
+This module resolves which files of a build context are sent to the Docker
+daemon, applying .dockerignore rules the same way `docker build` does, and
+produces the context tar archive as a stream.
+"""
+
+import io
+import os
+import re
+import logging
+import tarfile
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger('genesis_context')
+
+# Size of the chunks file content is streamed in
+TAR_CHUNK_SIZE = 256 * 1024
+
+
+class DockerIgnore:
+    """
+    Matcher for .dockerignore patterns.
+    
+    Patterns are evaluated in order and the last matching pattern wins;
+    patterns prefixed with `!` re-include paths excluded earlier. A pattern
+    matching a directory also matches everything below it.
+    """
+    
+    def __init__(self, patterns: Optional[List[str]] = None):
+        """
+        Initialize the matcher.
+        
+        Args:
+            patterns: List of .dockerignore patterns
+        """
+        self.rules: List[Tuple[re.Pattern, bool]] = []
+        for pattern in patterns or []:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith('#'):
+                continue
+            negate = pattern.startswith('!')
+            if negate:
+                pattern = pattern[1:].strip()
+            pattern = os.path.normpath(pattern).lstrip('/')
+            if pattern == '.':
+                continue
+            self.rules.append((self._compile(pattern), negate))
+    
+    @classmethod
+    def from_context(cls, context: str) -> 'DockerIgnore':
+        """
+        Load the .dockerignore file of a build context.
+        
+        Args:
+            context: Path of the build context
+        
+        Returns:
+            Matcher for the context, matching nothing if there is no .dockerignore
+        """
+        path = os.path.join(context, '.dockerignore')
+        if not os.path.isfile(path):
+            return cls()
+        with open(path, 'r') as f:
+            return cls(f.read().splitlines())
+    
+    @staticmethod
+    def _compile(pattern: str) -> re.Pattern:
+        """
+        Translate a .dockerignore pattern into a regular expression.
+        
+        Args:
+            pattern: Normalized pattern
+        
+        Returns:
+            Compiled regular expression matching a path or any path below it
+        """
+        regex = ''
+        index = 0
+        while index < len(pattern):
+            char = pattern[index]
+            if pattern.startswith('**', index):
+                # `**/` matches zero or more directories, `**` anything
+                if pattern.startswith('**/', index):
+                    regex += '(?:.*/)?'
+                    index += 3
+                else:
+                    regex += '.*'
+                    index += 2
+                continue
+            if char == '*':
+                regex += '[^/]*'
+            elif char == '?':
+                regex += '[^/]'
+            elif char == '[':
+                end = pattern.find(']', index)
+                if end == -1:
+                    regex += re.escape(char)
+                else:
+                    regex += '[' + pattern[index + 1:end].replace('\\', '\\\\') + ']'
+                    index = end
+            else:
+                regex += re.escape(char)
+            index += 1
+        return re.compile(f"^{regex}(?:/.*)?$")
+    
+    def excluded(self, path: str) -> bool:
+        """
+        Check whether a context-relative path is excluded.
+        
+        Args:
+            path: Path relative to the context root, using `/` separators
+        
+        Returns:
+            True if the path is not sent to the daemon
+        """
+        excluded = False
+        for regex, negate in self.rules:
+            if regex.match(path):
+                excluded = not negate
+        return excluded
+    
+    def has_exceptions(self) -> bool:
+        """Whether any pattern re-includes paths."""
+        return any(negate for _, negate in self.rules)
+
+
+def iter_context_files(context: str, ignore: Optional[DockerIgnore] = None) -> Iterator[str]:
+    """
+    Iterate over the files of a build context in a stable order.
+    
+    Args:
+        context: Path of the build context
+        ignore: Optional matcher, defaults to the context's .dockerignore
+    
+    Yields:
+        Context-relative paths (with `/` separators) of the entries sent to the
+        daemon; directories end with `/` and precede their content, symlinks
+        (including symlinks to directories) are not followed
+    """
+    if ignore is None:
+        ignore = DockerIgnore.from_context(context)
+    
+    for root, dirs, files in os.walk(context):
+        rel_root = os.path.relpath(root, context)
+        rel_root = '' if rel_root == '.' else rel_root.replace(os.sep, '/') + '/'
+        # Sent like `docker build` does, so empty directories and directory modes are kept
+        if rel_root and not ignore.excluded(rel_root[:-1]):
+            yield rel_root
+        
+        # os.walk lists symlinks to directories as directories but does not descend into them
+        links = [d for d in dirs if os.path.islink(os.path.join(root, d))]
+        dirs[:] = [d for d in dirs if d not in links]
+        # Prune excluded directories unless an exception could re-include their content
+        if not ignore.has_exceptions():
+            dirs[:] = [d for d in dirs if not ignore.excluded(rel_root + d)]
+        dirs.sort()
+        
+        for name in sorted(files + links):
+            path = rel_root + name
+            if not ignore.excluded(path):
+                yield path
+
+
+def iter_context_tar(members: Iterable[Tuple[str, str]], chunk_size: int = TAR_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Produce a tar archive of build context files as a stream of chunks.
+    
+    The archive is generated while it is consumed, one file chunk at a time,
+    so it is never staged in memory or on disk.
+    
+    Args:
+        members: Pairs of (path inside the archive, path of the file, directory or symlink)
+        chunk_size: Maximum number of file content bytes per chunk
+    
+    Yields:
+        Chunks of the tar archive
+    """
+    # Only used to build member headers (owner names, hard link detection), never written to
+    with tarfile.open(fileobj=io.BytesIO(), mode='w', format=tarfile.PAX_FORMAT) as helper:
+        for arcname, path in members:
+            info = helper.gettarinfo(path, arcname)
+            yield info.tobuf(tarfile.PAX_FORMAT, 'utf-8', 'surrogateescape')
+            if not info.isreg():
+                continue
+            
+            with open(path, 'rb') as f:
+                remaining = info.size
+                while remaining:
+                    chunk = f.read(min(chunk_size, remaining))
+                    if not chunk:
+                        raise OSError(f"{path} shrank while it was being archived")
+                    remaining -= len(chunk)
+                    yield chunk
+            padding = -info.size % tarfile.BLOCKSIZE
+            if padding:
+                yield tarfile.NUL * padding
+    
+    # End-of-archive marker
+    yield tarfile.NUL * (2 * tarfile.BLOCKSIZE)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Build Ledger - Indexed history of Genesis image builds
+
+This module records every image build in a local SQLite database: component,
+image and tags, pushed manifest digest, build-input fingerprint, duration
+and status. The ledger is indexed by component and time, so questions like
+"the last good image of component X" are answered locally instead of by
+listing registry tags, and a deployment can be re-pointed to a previously
+built digest without rebuilding.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger('genesis_ledger')
+
+# Build published to the registry, usable for rollouts
+STATUS_SUCCESS = 'success'
+# Build succeeded but the image could not be pushed
+STATUS_PUSH_ERROR = 'push_error'
+# Build failed
+STATUS_ERROR = 'error'
+LEDGER_STATUSES = (STATUS_SUCCESS, STATUS_PUSH_ERROR, STATUS_ERROR)
+# Upper bound for the number of entries returned by one query
+MAX_QUERY_LIMIT = 1000
+
+COLUMNS = ('id', 'component', 'status', 'image', 'tags', 'digest', 'fingerprint',
+           'started_at', 'duration', 'details')
+
+
+class BuildLedger:
+    """
+    Build history persisted in a local SQLite database.
+    
+    Entries are append-only; each build of a component adds one row. Queries
+    filter by component, status and time range and return entries newest
+    first.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize the ledger and open the database.
+        
+        Args:
+            path: Path of the SQLite database file, `:memory:` for a
+                non-persistent ledger
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS builds ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, component TEXT NOT NULL, status TEXT NOT NULL, '
+            'image TEXT, tags TEXT NOT NULL, digest TEXT, fingerprint TEXT, '
+            'started_at REAL NOT NULL, duration REAL, details TEXT)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS builds_component ON builds (component, started_at)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS builds_started ON builds (started_at)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS builds_digest ON builds (digest)')
+        self._db.commit()
+        logger.info(f"Build ledger opened at {path}")
+    
+    @staticmethod
+    def _entry(row: tuple) -> Dict[str, Any]:
+        """Convert a database row to a ledger entry."""
+        entry = dict(zip(COLUMNS, row))
+        entry['tags'] = json.loads(entry['tags'])
+        entry['details'] = json.loads(entry['details']) if entry['details'] else {}
+        entry['started'] = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(entry['started_at']))
+        return entry
+    
+    def record(self, component: str, status: str, started_at: float, duration: Optional[float] = None,
+               image: Optional[str] = None, tags: Optional[List[str]] = None, digest: Optional[str] = None,
+               fingerprint: Optional[str] = None, details: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Record a build.
+        
+        Args:
+            component: Name of the built component
+            status: One of LEDGER_STATUSES
+            started_at: Time the build started (seconds since the epoch)
+            duration: Seconds from the start of the build to the end of the push
+            image: Image name without tag (registry and repository)
+            tags: Tags the image was published under
+            digest: Manifest digest of the pushed image
+            fingerprint: Build-input fingerprint
+            details: Optional additional JSON-serializable information
+        
+        Returns:
+            ID of the new entry
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                'INSERT INTO builds (component, status, image, tags, digest, fingerprint, started_at, duration, '
+                'details) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (component, status, image, json.dumps(tags or []), digest, fingerprint, started_at, duration,
+                 json.dumps(details) if details else None)
+            )
+            self._db.commit()
+            return cursor.lastrowid
+    
+    def get(self, build_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a ledger entry.
+        
+        Args:
+            build_id: ID of the entry
+        
+        Returns:
+            Ledger entry, or None if not found
+        """
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(COLUMNS)} FROM builds WHERE id = ?",
+                                   (build_id,)).fetchone()
+        return self._entry(row) if row else None
+    
+    def query(self, component: Optional[str] = None, status: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              digest: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Query ledger entries, newest first.
+        
+        Args:
+            component: Only entries of this component
+            status: Only entries with this status
+            since: Only builds started at or after this time (seconds since the epoch)
+            until: Only builds started before this time (seconds since the epoch)
+            digest: Only entries with this manifest digest
+            limit: Maximum number of entries, capped at MAX_QUERY_LIMIT
+        
+        Returns:
+            List of ledger entries
+        """
+        conditions, params = [], []
+        for column, value in (('component', component), ('status', status), ('digest', digest)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append('started_at >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('started_at < ?')
+            params.append(until)
+        
+        sql = f"SELECT {', '.join(COLUMNS)} FROM builds"
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY started_at DESC, id DESC LIMIT ?'
+        params.append(max(1, min(int(limit), MAX_QUERY_LIMIT)))
+        
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [self._entry(row) for row in rows]
+    
+    def last_good(self, component: str, exclude_digest: Optional[str] = None,
+                  before: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the most recent published build of a component.
+        
+        Args:
+            component: Name of the component
+            exclude_digest: Skip builds of this digest, e.g. the one currently deployed
+            before: Only builds started before this time (seconds since the epoch)
+        
+        Returns:
+            Ledger entry, or None if the component has no such build
+        """
+        sql = (f"SELECT {', '.join(COLUMNS)} FROM builds "
+               "WHERE component = ? AND status = ? AND digest IS NOT NULL")
+        params = [component, STATUS_SUCCESS]
+        if exclude_digest:
+            sql += ' AND digest != ?'
+            params.append(exclude_digest)
+        if before is not None:
+            sql += ' AND started_at < ?'
+            params.append(before)
+        sql += ' ORDER BY started_at DESC, id DESC LIMIT 1'
+        
+        with self._lock:
+            row = self._db.execute(sql, params).fetchone()
+        return self._entry(row) if row else None
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM builds').fetchone()[0]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Build Pipeline - Pipelined build-and-deploy for Genesis Builder
+
+This module overlaps image builds with rollouts: as soon as a component's
+image is built and pushed, its rollout starts on a separate worker pool
+while the remaining builds keep running. Failures either abort the rest of
+the pipeline or only affect the failed component (and its dependents).
+"""
+
+import time
+import logging
+import threading
+import concurrent.futures
+from typing import Dict, List, Any, Callable, Optional
+
+from build_scheduler import BuildScheduler, SUCCESS_STATUSES
+
+logger = logging.getLogger('genesis_pipeline')
+
+ON_FAILURE_MODES = ('abort', 'continue')
+
+
+class BuildDeployPipeline:
+    """
+    Runs component builds and per-component rollouts as a pipeline.
+    
+    Every component passes two stages, build (including push) and rollout.
+    Stage start and end times are recorded in seconds since the pipeline
+    started, so overlapping stages are visible in the result.
+    """
+    
+    def __init__(self, components: Dict[str, Any], build_fn: Callable[[str], Dict[str, Any]],
+                 rollout_fn: Callable[[str, Dict[str, Any]], Dict[str, Any]], max_builds: int = 4,
+                 max_rollouts: int = 2, on_failure: str = 'abort',
+                 on_update: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            components: Component definitions keyed by component name
+            build_fn: Callable building and pushing one component, returning its result dict
+            rollout_fn: Callable rolling out one component given its build result
+            max_builds: Maximum number of builds running at the same time
+            max_rollouts: Maximum number of rollouts running at the same time
+            on_failure: `abort` stops starting builds and rollouts after the first failure,
+                `continue` keeps going with unaffected components
+            on_update: Optional callable receiving the stage table whenever a stage changes
+        """
+        if on_failure not in ON_FAILURE_MODES:
+            raise ValueError(f"Unknown on_failure mode: {on_failure}")
+        self.components = components
+        self.build_fn = build_fn
+        self.rollout_fn = rollout_fn
+        self.max_builds = max_builds
+        self.max_rollouts = max(1, int(max_rollouts))
+        self.on_failure = on_failure
+        self.on_update = on_update
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started = 0.0
+    
+    def _now(self) -> float:
+        return round(time.monotonic() - self._started, 3)
+    
+    def _set_stage(self, name: str, stage: str, **fields):
+        """Update a stage of a component and publish the stage table."""
+        with self._lock:
+            self._stages.setdefault(name, {}).setdefault(stage, {}).update(fields)
+            snapshot = {component: {key: dict(value) for key, value in stages.items()}
+                        for component, stages in self._stages.items()}
+        if self.on_update:
+            try:
+                self.on_update(snapshot)
+            except Exception as e:
+                logger.debug(f"Pipeline update callback failed: {str(e)}")
+    
+    def _fail(self, reason: str):
+        """Handle a failed stage according to the on_failure mode."""
+        if self.on_failure == 'abort' and not self._stop.is_set():
+            logger.warning(f"Aborting pipeline: {reason}")
+            self._stop.set()
+    
+    def _build(self, name: str) -> Dict[str, Any]:
+        self._set_stage(name, 'build', status='running', start=self._now())
+        return self.build_fn(name)
+    
+    def _rollout(self, name: str, build_result: Dict[str, Any]) -> Dict[str, Any]:
+        if self._stop.is_set():
+            self._set_stage(name, 'rollout', status='skipped', message='Aborted')
+            return {'status': 'skipped', 'message': 'Aborted'}
+        
+        start = self._now()
+        self._set_stage(name, 'rollout', status='running', start=start,
+                        queued=round(start - self._stages[name]['build'].get('end', start), 3))
+        try:
+            result = self.rollout_fn(name, build_result)
+        except Exception as e:
+            logger.error(f"Error rolling out {name}: {str(e)}")
+            result = {'status': 'error', 'message': str(e)}
+        
+        end = self._now()
+        self._set_stage(name, 'rollout', status=result.get('status'), end=end, duration=round(end - start, 3))
+        if result.get('status') != 'success':
+            self._fail(f"rollout of {name} failed")
+        return result
+    
+    def run(self, names: List[str]) -> Dict[str, Any]:
+        """
+        Build and roll out components.
+        
+        Args:
+            names: Components to build and roll out
+        
+        Returns:
+            Dict containing overall status, build and rollout results and stage timings
+        """
+        self._started = time.monotonic()
+        rollouts: Dict[str, concurrent.futures.Future] = {}
+        scheduler = BuildScheduler(self.components, self._build, max_workers=self.max_builds)
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_rollouts,
+                                                   thread_name_prefix='genesis-rollout') as rollout_pool:
+            def on_build(name: str, result: Dict[str, Any]):
+                status = result.get('status')
+                fields = {'status': status}
+                if 'start' in self._stages.get(name, {}).get('build', {}):
+                    end = self._now()
+                    fields.update(end=end, duration=round(end - self._stages[name]['build']['start'], 3))
+                    if result.get('push_time') is not None:
+                        fields['push_time'] = result['push_time']
+                self._set_stage(name, 'build', **fields)
+                
+                if result.get('external', False):
+                    return
+                if status in SUCCESS_STATUSES:
+                    # Hand the image to the rollout stage while other builds continue
+                    rollouts[name] = rollout_pool.submit(self._rollout, name, result)
+                elif status == 'error':
+                    self._fail(f"build of {name} failed")
+            
+            build_results = scheduler.run(names, on_result=on_build, stop_event=self._stop)
+            rollout_results = {name: future.result() for name, future in rollouts.items()}
+        
+        succeeded = all(
+            result.get('status') in SUCCESS_STATUSES or result.get('external', False)
+            for result in build_results.values()
+        ) and all(result.get('status') == 'success' for result in rollout_results.values())
+        
+        with self._lock:
+            stages = {component: {key: dict(value) for key, value in component_stages.items()}
+                      for component, component_stages in self._stages.items()}
+        return {
+            'status': 'success' if succeeded else 'error',
+            'on_failure': self.on_failure,
+            'aborted': self._stop.is_set(),
+            'build_results': build_results,
+            'rollout_results': rollout_results,
+            'stages': stages,
+            'duration': self._now()
+        }
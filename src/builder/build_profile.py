@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Build Profile - Per-step timing of docker builds for Genesis Builder
+
+This module turns docker build output into a timeline of build steps with
+their duration, cache status and bytes transferred. It understands BuildKit
+`--progress=plain` and `--progress=rawjson` output as well as the classic
+builder output streamed by the Engine API. Profiles of successful builds are
+kept per component so a build can be compared with the previous one.
+"""
+
+import os
+import re
+import json
+import time
+import base64
+import logging
+import datetime
+import threading
+from typing import Dict, List, Any, Callable, Optional
+
+logger = logging.getLogger('genesis_profile')
+
+# BuildKit plain progress: `#5 [2/4] RUN ...`, `#5 DONE 1.2s`, `#5 CACHED`, `#5 0.312 output`
+PLAIN_LINE_PATTERN = re.compile(r'^#(\d+) (.*)$')
+PLAIN_DONE_PATTERN = re.compile(r'^DONE (\d+(?:\.\d+)?)s$')
+PLAIN_LOG_PATTERN = re.compile(r'^\d+\.\d+ ')
+PLAIN_TRANSFER_PATTERN = re.compile(
+    r'^(sha256:[0-9a-f]+|transferring [\w ]+:|sending tarball|exporting layers|writing image [^ ]+)\s+'
+    r'(\d+(?:\.\d+)?)([kMGT]?B)\b'
+)
+# Classic builder: `Step 2/4 : RUN ...` followed by ` ---> Using cache`
+CLASSIC_STEP_PATTERN = re.compile(r'^Step (\d+)/(\d+) : (.*)$')
+CLASSIC_CACHED_LINE = '---> Using cache'
+CLASSIC_DONE_PATTERN = re.compile(r'^(Successfully built|Successfully tagged|Image ID:)')
+# Leading `[2/4] ` of step names; step numbers shift when steps are added or removed
+STEP_NUMBER_PATTERN = re.compile(r'^\[\d+/\d+\]\s*')
+
+SIZE_UNITS = {'B': 1, 'kB': 1000, 'MB': 1000 ** 2, 'GB': 1000 ** 3, 'TB': 1000 ** 4}
+
+# A step counts as a regression when it is this many seconds and this much relatively slower
+REGRESSION_MIN_SECONDS = 1.0
+REGRESSION_MIN_RATIO = 0.5
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    """Parse a BuildKit RFC 3339 timestamp (with nanoseconds) into epoch seconds."""
+    if not value:
+        return None
+    match = re.match(r'^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d+))?(Z|[+-]\d\d:\d\d)$', value)
+    if not match:
+        return None
+    base, fraction, zone = match.groups()
+    parsed = datetime.datetime.fromisoformat(base + ('+00:00' if zone == 'Z' else zone))
+    return parsed.timestamp() + (float(f"0.{fraction}") if fraction else 0.0)
+
+
+def step_key(name: str) -> str:
+    """
+    Identify a step across builds independently of its step number.
+    
+    Args:
+        name: Step name, e.g. `[2/4] RUN pip install -r requirements.txt`
+    
+    Returns:
+        Step name without the step number
+    """
+    return STEP_NUMBER_PATTERN.sub('', name).strip()
+
+
+class BuildProfiler:
+    """
+    Incremental parser of docker build output into per-step timings.
+    
+    Feed every output line to `feed`, which returns the lines to show in the
+    build log (rawjson events are rendered as readable lines), and call
+    `profile` once the build finished.
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the profiler.
+        
+        Args:
+            clock: Clock used to time steps of output formats without timings
+        """
+        self.clock = clock
+        self.format: Optional[str] = None
+        self._started = clock()
+        self._steps: Dict[str, Dict[str, Any]] = {}
+        self._transfers: Dict[str, Dict[str, int]] = {}
+        self._current: Optional[str] = None
+        self._epoch_start: Optional[float] = None
+    
+    def _step(self, step_id: str, name: Optional[str] = None) -> Dict[str, Any]:
+        step = self._steps.get(step_id)
+        if step is None:
+            step = self._steps[step_id] = {
+                'id': step_id, 'name': name or step_id, 'start': round(self.clock() - self._started, 3),
+                'duration': None, 'cached': False, 'bytes': 0
+            }
+        elif name and step['name'] == step_id:
+            step['name'] = name
+        return step
+    
+    def _transfer(self, step_id: str, key: str, size: int):
+        transfers = self._transfers.setdefault(step_id, {})
+        transfers[key] = max(transfers.get(key, 0), size)
+        self._steps[step_id]['bytes'] = sum(transfers.values())
+    
+    def feed(self, line: str) -> List[str]:
+        """
+        Process one output line.
+        
+        Args:
+            line: Build output line without trailing newline
+        
+        Returns:
+            Lines to show in the build log for this output line
+        """
+        stripped = line.strip()
+        if stripped.startswith('{'):
+            try:
+                event = json.loads(stripped)
+            except ValueError:
+                event = None
+            if isinstance(event, dict) and ('vertexes' in event or 'statuses' in event or 'logs' in event):
+                self.format = 'rawjson'
+                return self._feed_rawjson(event)
+        
+        match = PLAIN_LINE_PATTERN.match(stripped)
+        if match:
+            self.format = self.format or 'plain'
+            # `#0` describes the builder instance, not a build step
+            if match.group(1) != '0':
+                self._feed_plain(match.group(1), match.group(2))
+            return [line]
+        
+        match = CLASSIC_STEP_PATTERN.match(stripped)
+        if match:
+            self.format = self.format or 'classic'
+            self._finish_current()
+            self._current = match.group(1)
+            self._step(self._current, f"[{match.group(1)}/{match.group(2)}] {match.group(3)}")
+        elif self._current is not None:
+            if stripped == CLASSIC_CACHED_LINE:
+                self._steps[self._current]['cached'] = True
+            elif CLASSIC_DONE_PATTERN.match(stripped):
+                self._finish_current()
+        return [line]
+    
+    def _finish_current(self):
+        """End the running classic builder step at the current time."""
+        if self._current is not None:
+            step = self._steps[self._current]
+            step['duration'] = max(0.0, round(self.clock() - self._started - step['start'], 3))
+            self._current = None
+    
+    def _feed_plain(self, step_id: str, text: str):
+        if step_id not in self._steps:
+            self._step(step_id, text)
+            return
+        step = self._steps[step_id]
+        done = PLAIN_DONE_PATTERN.match(text)
+        if done:
+            step['duration'] = float(done.group(1))
+        elif text == 'CACHED':
+            step['cached'] = True
+            step['duration'] = step['duration'] or 0.0
+        elif text.startswith('ERROR'):
+            step['error'] = text[len('ERROR'):].lstrip(': ')
+            step['duration'] = step['duration'] if step['duration'] is not None else \
+                max(0.0, round(self.clock() - self._started - step['start'], 3))
+        elif not PLAIN_LOG_PATTERN.match(text):
+            transfer = PLAIN_TRANSFER_PATTERN.match(text)
+            if transfer:
+                self._transfer(step_id, transfer.group(1),
+                               int(float(transfer.group(2)) * SIZE_UNITS[transfer.group(3)]))
+    
+    def _feed_rawjson(self, event: Dict[str, Any]) -> List[str]:
+        output = []
+        for vertex in event.get('vertexes') or []:
+            step = self._step(vertex.get('digest', ''), vertex.get('name'))
+            started = _parse_time(vertex.get('started'))
+            completed = _parse_time(vertex.get('completed'))
+            if started is not None and self._epoch_start is None:
+                self._epoch_start = started
+            if started is not None:
+                step['start'] = round(started - self._epoch_start, 3)
+            if vertex.get('cached'):
+                step['cached'] = True
+            if vertex.get('error'):
+                step['error'] = vertex['error']
+            if completed is not None and step['duration'] is None:
+                step['duration'] = round(completed - started, 3) if started is not None else 0.0
+                status = 'CACHED' if step['cached'] else \
+                    f"ERROR {step['error']}" if step.get('error') else f"DONE {step['duration']:.1f}s"
+                output.append(f"{step['name']} {status}")
+        for status in event.get('statuses') or []:
+            if status.get('vertex') in self._steps and status.get('current'):
+                self._transfer(status['vertex'], status.get('id', ''), int(status['current']))
+        for log in event.get('logs') or []:
+            try:
+                data = base64.b64decode(log.get('data') or '').decode('utf-8', errors='replace')
+            except (ValueError, TypeError):
+                continue
+            output.extend(data.splitlines())
+        return output
+    
+    def profile(self) -> Dict[str, Any]:
+        """
+        Get the timeline of the build.
+        
+        The cache hit rate counts Dockerfile steps only (`[2/4] RUN ...`), since
+        BuildKit's internal steps (loading metadata, exporting) are never cached.
+        
+        Returns:
+            Dict containing the output format, steps in start order and totals
+        """
+        self._finish_current()
+        steps = sorted((dict(step) for step in self._steps.values()), key=lambda step: step['start'])
+        for step in steps:
+            if step['duration'] is None:
+                step['duration'] = 0.0
+        dockerfile_steps = [step for step in steps if STEP_NUMBER_PATTERN.match(step['name'])] or steps
+        cached = sum(1 for step in dockerfile_steps if step['cached'])
+        return {
+            'format': self.format,
+            'steps': steps,
+            'total_steps': len(dockerfile_steps),
+            'cached_steps': cached,
+            'cache_hit_rate': round(cached / len(dockerfile_steps), 3) if dockerfile_steps else None,
+            'bytes': sum(step['bytes'] for step in steps),
+            'duration': round(self.clock() - self._started, 3)
+        }
+
+
+def compare_profiles(current: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compare the timeline of a build with a previous build of the same component.
+    
+    Steps are matched by name without step number.
+    
+    Args:
+        current: Profile of the build to examine
+        previous: Profile of the previous build, or None
+    
+    Returns:
+        Dict containing per-step deltas, the total delta and the regressed steps
+    """
+    if not previous:
+        return {'previous': None, 'steps': [], 'regressions': [], 'duration_delta': None}
+    
+    previous_steps = {}
+    for step in previous.get('steps', []):
+        previous_steps.setdefault(step_key(step['name']), step)
+    
+    steps = []
+    seen = set()
+    for step in current.get('steps', []):
+        key = step_key(step['name'])
+        before = previous_steps.get(key) if key not in seen else None
+        seen.add(key)
+        entry = {'name': step['name'], 'duration': step['duration'], 'cached': step['cached']}
+        if before is None:
+            entry['change'] = 'new'
+        else:
+            delta = round(step['duration'] - before['duration'], 3)
+            entry.update(previous_duration=before['duration'], previous_cached=before['cached'], delta=delta)
+            regressed = delta >= REGRESSION_MIN_SECONDS and delta >= before['duration'] * REGRESSION_MIN_RATIO
+            entry['change'] = 'slower' if regressed else 'faster' if delta <= -REGRESSION_MIN_SECONDS else 'same'
+        steps.append(entry)
+    for key, step in previous_steps.items():
+        if key not in seen:
+            steps.append({'name': step['name'], 'duration': None, 'previous_duration': step['duration'],
+                          'cached': None, 'previous_cached': step['cached'], 'change': 'removed'})
+    
+    regressions = sorted((step for step in steps if step['change'] == 'slower'),
+                         key=lambda step: step['delta'], reverse=True)
+    return {
+        'previous': {key: previous.get(key) for key in ('recorded_at', 'image', 'duration', 'cache_hit_rate')},
+        'steps': steps,
+        'regressions': [step['name'] for step in regressions],
+        'duration_delta': round(current.get('duration', 0) - previous.get('duration', 0), 3)
+    }
+
+
+class BuildProfileStore:
+    """
+    Recent build profiles per component, persisted as one JSON file.
+    """
+    
+    def __init__(self, path: str, max_per_component: int = 20):
+        """
+        Initialize the store and load its profiles.
+        
+        Args:
+            path: Path of the JSON profile file
+            max_per_component: Number of profiles kept per component
+        """
+        self.path = path
+        self.max_per_component = max(1, int(max_per_component))
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, List[Dict[str, Any]]] = self._load()
+    
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Failed to load build profiles {self.path}: {str(e)}")
+            return {}
+    
+    def _save(self):
+        """Write the profiles to disk atomically. Caller must hold the lock."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._profiles, f)
+        os.replace(tmp_path, self.path)
+    
+    def record(self, component_name: str, profile: Dict[str, Any]):
+        """
+        Record the profile of a successful build.
+        
+        Args:
+            component_name: Name of the component
+            profile: Build profile
+        """
+        with self._lock:
+            history = self._profiles.setdefault(component_name, [])
+            history.append(profile)
+            del history[:-self.max_per_component]
+            try:
+                self._save()
+            except Exception as e:
+                logger.error(f"Failed to save build profiles {self.path}: {str(e)}")
+    
+    def history(self, component_name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get recorded profiles of a component.
+        
+        Args:
+            component_name: Name of the component
+            limit: Maximum number of profiles to return
+        
+        Returns:
+            Profiles, most recent first
+        """
+        with self._lock:
+            history = list(reversed(self._profiles.get(component_name, [])))
+        return history[:limit] if limit else history
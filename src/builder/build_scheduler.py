@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Build Scheduler - Dependency-aware parallel builds for Genesis Builder
+
+This module implements a scheduler that orders component builds according to
+their optional `depends_on` declarations and runs independent builds
+concurrently on a bounded worker pool.
+"""
+
+import logging
+import threading
+import concurrent.futures
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+logger = logging.getLogger('genesis_scheduler')
+
+# Build result statuses that allow dependent components to proceed
+SUCCESS_STATUSES = ('success', 'cached')
+
+
+class BuildScheduler:
+    """
+    Schedules component builds as a dependency graph.
+    
+    Components without unfinished dependencies are submitted to a thread pool
+    as soon as they become ready, so independent images build side by side
+    while dependent images wait for their base images.
+    """
+    
+    def __init__(self, components: Dict[str, Any], build_fn: Callable[[str], Dict[str, Any]],
+                 max_workers: int = 4):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            components: Component definitions keyed by component name
+            build_fn: Callable building one component and returning its result dict
+            max_workers: Maximum number of builds running at the same time
+        """
+        self.components = components
+        self.build_fn = build_fn
+        self.max_workers = max(1, int(max_workers))
+    
+    def _dependencies(self, name: str) -> List[str]:
+        """
+        Get the declared dependencies of a component.
+        
+        Args:
+            name: Name of the component
+        
+        Returns:
+            List of component names the component depends on
+        """
+        depends_on = self.components.get(name, {}).get('depends_on') or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        return list(depends_on)
+    
+    def _find_cycle(self, names: Iterable[str]) -> List[str]:
+        """
+        Find components that are part of (or blocked by) a dependency cycle.
+        
+        Args:
+            names: Component names to check
+        
+        Returns:
+            List of component names that can never become ready
+        """
+        remaining = {name: set(dep for dep in self._dependencies(name) if dep in names) for name in names}
+        
+        # Repeatedly strip components whose dependencies are all resolved
+        progress = True
+        while progress:
+            progress = False
+            for name in [n for n, deps in remaining.items() if not deps]:
+                del remaining[name]
+                for deps in remaining.values():
+                    deps.discard(name)
+                progress = True
+        
+        return sorted(remaining)
+    
+    def run(self, names: Optional[List[str]] = None,
+            on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+            stop_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Build components in dependency order.
+        
+        Args:
+            names: Optional list of components to build, defaults to all components
+            on_result: Optional callable invoked with each build result as soon as it is known
+            stop_event: Optional event; once set, builds not yet started are skipped
+        
+        Returns:
+            Dict containing build results for each component, in definition order
+        """
+        if names is None:
+            names = list(self.components.keys())
+        
+        results = {}
+        to_build = []
+        for name in names:
+            definition = self.components.get(name)
+            if definition is None:
+                results[name] = {'status': 'error', 'message': f"Component not found: {name}"}
+            elif definition.get('external', False):
+                # External components are pulled, never built, so they never block dependents
+                logger.info(f"Skipping build for external component: {name}")
+                results[name] = {'status': 'skipped', 'external': True}
+            else:
+                to_build.append(name)
+        
+        # Validate dependency declarations before starting any build
+        pending = set(to_build)
+        for name in to_build:
+            unknown = [dep for dep in self._dependencies(name) if dep not in self.components]
+            if unknown:
+                logger.error(f"Component {name} depends on unknown components: {', '.join(unknown)}")
+                results[name] = {'status': 'error', 'message': f"Unknown dependencies: {', '.join(unknown)}"}
+                pending.discard(name)
+        
+        for name in self._find_cycle(pending):
+            logger.error(f"Component {name} is part of a dependency cycle")
+            results[name] = {'status': 'error', 'message': 'Dependency cycle detected'}
+            pending.discard(name)
+        
+        # Components only wait for dependencies that are being built in this run
+        waiting_on = {name: set(dep for dep in self._dependencies(name) if dep in to_build) for name in pending}
+        
+        if on_result:
+            for name in names:
+                if name in results:
+                    on_result(name, results[name])
+        
+        logger.info(f"Scheduling {len(pending)} builds with up to {self.max_workers} workers")
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix='genesis-build') as executor:
+            running = {}
+            
+            while pending or running:
+                if stop_event is not None and stop_event.is_set():
+                    for name in sorted(pending, key=to_build.index):
+                        results[name] = {'status': 'skipped', 'message': 'Aborted'}
+                        if on_result:
+                            on_result(name, results[name])
+                    pending.clear()
+                
+                # Resolve components whose dependencies have settled
+                for name in sorted(pending, key=to_build.index):
+                    deps = waiting_on[name]
+                    failed = [dep for dep in deps if dep in results
+                              and results[dep].get('status') not in SUCCESS_STATUSES
+                              and not results[dep].get('external', False)]
+                    if failed:
+                        logger.warning(f"Skipping {name}: dependencies failed: {', '.join(failed)}")
+                        results[name] = {
+                            'status': 'skipped',
+                            'message': f"Dependencies failed: {', '.join(failed)}"
+                        }
+                        pending.discard(name)
+                        if on_result:
+                            on_result(name, results[name])
+                    elif all(dep in results for dep in deps):
+                        logger.info(f"Building component: {name}")
+                        running[executor.submit(self.build_fn, name)] = name
+                        pending.discard(name)
+                
+                if not running:
+                    continue
+                
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Error building {name}: {str(e)}")
+                        results[name] = {'status': 'error', 'message': str(e)}
+                    if on_result:
+                        on_result(name, results[name])
+        
+        return {name: results[name] for name in names if name in results}
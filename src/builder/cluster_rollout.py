@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Cluster Rollout - Multi-cluster deploy fan-out for Genesis Builder
+
+This module runs a deploy against several clusters according to a rollout
+strategy: all clusters at once (`parallel`), in waves of a fixed size
+(`rolling`), or one canary cluster first and the rest in parallel once it
+succeeded (`canary`). A failed wave stops the rollout; clusters that were
+not attempted are reported as skipped.
+"""
+
+import time
+import logging
+import concurrent.futures
+from typing import Dict, List, Any, Callable, Optional
+
+logger = logging.getLogger('genesis_rollout')
+
+STRATEGIES = ('parallel', 'rolling', 'canary')
+
+
+def plan_waves(clusters: List[str], strategy: str = 'parallel', canary: Optional[str] = None,
+               wave_size: int = 1) -> List[List[str]]:
+    """
+    Split clusters into the waves of a rollout.
+    
+    Args:
+        clusters: Cluster names in rollout order
+        strategy: One of STRATEGIES
+        canary: Canary cluster for the canary strategy, defaults to the first cluster
+        wave_size: Number of clusters per wave for the rolling strategy
+    
+    Returns:
+        List of waves, each a list of cluster names deployed concurrently
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown rollout strategy: {strategy}")
+    if not clusters:
+        return []
+    
+    if strategy == 'parallel':
+        return [list(clusters)]
+    if strategy == 'rolling':
+        size = max(1, int(wave_size))
+        return [clusters[index:index + size] for index in range(0, len(clusters), size)]
+    
+    canary = canary if canary in clusters else clusters[0]
+    rest = [cluster for cluster in clusters if cluster != canary]
+    return [[canary], rest] if rest else [[canary]]
+
+
+def run_rollout(clusters: List[str], deploy_fn: Callable[[str], Dict[str, Any]], strategy: str = 'parallel',
+                canary: Optional[str] = None, wave_size: int = 1, max_workers: Optional[int] = None,
+                on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Deploy to several clusters following a rollout strategy.
+    
+    Args:
+        clusters: Cluster names in rollout order
+        deploy_fn: Callable deploying to one cluster, returning a result dict with `status`
+        strategy: One of STRATEGIES
+        canary: Canary cluster for the canary strategy
+        wave_size: Number of clusters per wave for the rolling strategy
+        max_workers: Maximum number of clusters deployed at the same time
+        on_result: Optional callable invoked with each cluster result as it completes
+    
+    Returns:
+        Dict containing the overall status, per-cluster results and timings
+    """
+    waves = plan_waves(clusters, strategy, canary, wave_size)
+    results: Dict[str, Dict[str, Any]] = {}
+    started = time.monotonic()
+    workers = max_workers or max((len(wave) for wave in waves), default=1)
+    
+    def deploy(cluster: str) -> Dict[str, Any]:
+        cluster_started = time.monotonic()
+        try:
+            result = deploy_fn(cluster)
+        except Exception as e:
+            logger.error(f"Deploy to cluster {cluster} raised: {str(e)}")
+            result = {'status': 'error', 'message': str(e)}
+        return dict(result, duration=round(time.monotonic() - cluster_started, 3))
+    
+    halted = None
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for wave_number, wave in enumerate(waves):
+            if halted is not None:
+                for cluster in wave:
+                    results[cluster] = {'status': 'skipped', 'message': f"Rollout halted after wave {halted}"}
+                continue
+            
+            logger.info(f"Rollout wave {wave_number + 1}/{len(waves)} ({strategy}): {', '.join(wave)}")
+            futures = {executor.submit(deploy, cluster): cluster for cluster in wave}
+            for future in concurrent.futures.as_completed(futures):
+                cluster = futures[future]
+                results[cluster] = future.result()
+                if on_result:
+                    on_result(cluster, results[cluster])
+            
+            if any(results[cluster].get('status') != 'success' for cluster in wave) and strategy != 'parallel':
+                halted = wave_number + 1
+                logger.warning(f"Rollout halted: wave {halted} had failures")
+    
+    succeeded = sum(1 for result in results.values() if result.get('status') == 'success')
+    if succeeded == len(clusters):
+        status = 'success'
+    elif succeeded:
+        status = 'partial'
+    else:
+        status = 'error'
+    
+    return {
+        'status': status,
+        'strategy': strategy,
+        'waves': waves,
+        'clusters': {cluster: results[cluster] for cluster in clusters},
+        'succeeded': succeeded,
+        'failed': [cluster for cluster in clusters if results[cluster].get('status') not in ('success', 'skipped')],
+        'skipped': [cluster for cluster in clusters if results[cluster].get('status') == 'skipped'],
+        'duration': round(time.monotonic() - started, 3)
+    }
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Config Manager - Hot-reloadable configuration for Genesis Builder and API
+
+This module loads and validates the builder configuration and watches the
+configuration file for changes. Every successfully validated version is
+published as a new, never-modified snapshot; readers keep the snapshot they
+started with, so a reload never changes the configuration under a running
+operation. Invalid versions are rejected and the previous snapshot stays in
+effect.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Callable, Optional
+
+import yaml
+
+logger = logging.getLogger('genesis_config')
+
+# Seconds between checks of the configuration file
+DEFAULT_POLL_INTERVAL = 2.0
+
+DOCKER_BACKENDS = ('auto', 'engine', 'cli')
+ROLLOUT_STRATEGIES = ('parallel', 'rolling', 'canary')
+PIPELINE_MODES = ('sequential', 'pipelined')
+FAILURE_MODES = ('abort', 'continue')
+SECTIONS = ('registry', 'builder', 'kubernetes', 'components', 'clusters', 'rollout', 'pipeline')
+# Settings that must be positive integers, by section
+POSITIVE_INTEGERS = {
+    'builder': ('max_parallel_builds', 'max_parallel_pushes', 'profile_history', 'docker_pool_size'),
+    'kubernetes': ('max_parallel_applies',),
+    'rollout': ('wave_size', 'max_parallel_clusters'),
+    'pipeline': ('max_parallel_rollouts', 'rollout_timeout')
+}
+# Settings that must be non-negative numbers, by section
+NON_NEGATIVE_NUMBERS = {
+    'builder': ('registry_session_ttl', 'status_cache_ttl')
+}
+
+
+def validate_config(config: Any) -> List[str]:
+    """
+    Validate a parsed configuration.
+    
+    Args:
+        config: Parsed configuration file content
+    
+    Returns:
+        List of error messages, empty if the configuration is valid
+    """
+    if not isinstance(config, dict):
+        return ['Configuration must be a mapping']
+    
+    errors = []
+    for section in SECTIONS:
+        if config.get(section) is not None and not isinstance(config[section], dict):
+            errors.append(f"Section {section} must be a mapping")
+    if errors:
+        return errors
+    
+    for section, keys in POSITIVE_INTEGERS.items():
+        for key in keys:
+            value = (config.get(section) or {}).get(key)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 1):
+                errors.append(f"{section}.{key} must be a positive integer")
+    for section, keys in NON_NEGATIVE_NUMBERS.items():
+        for key in keys:
+            value = (config.get(section) or {}).get(key)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0):
+                errors.append(f"{section}.{key} must be a non-negative number")
+    
+    registry_url = (config.get('registry') or {}).get('url')
+    if registry_url is not None and not isinstance(registry_url, str):
+        errors.append("registry.url must be a string")
+    
+    choices = [
+        ('builder', 'docker_backend', DOCKER_BACKENDS),
+        ('rollout', 'strategy', ROLLOUT_STRATEGIES),
+        ('pipeline', 'mode', PIPELINE_MODES),
+        ('pipeline', 'on_failure', FAILURE_MODES)
+    ]
+    for section, key, allowed in choices:
+        value = (config.get(section) or {}).get(key)
+        if value is not None and value not in allowed:
+            errors.append(f"{section}.{key} must be one of {', '.join(allowed)}")
+    
+    components = config.get('components') or {}
+    for name, component in components.items():
+        if not isinstance(component, dict):
+            errors.append(f"Component {name} must be a mapping")
+            continue
+        for key in ('repository', 'tag', 'dockerfile', 'context'):
+            if component.get(key) is not None and not isinstance(component[key], str):
+                errors.append(f"Component {name}: {key} must be a string")
+        build_args = component.get('build_args')
+        if build_args is not None and (not isinstance(build_args, list)
+                                       or not all(isinstance(arg, str) for arg in build_args)):
+            errors.append(f"Component {name}: build_args must be a list of strings")
+        depends_on = component.get('depends_on') or []
+        if not isinstance(depends_on, (str, list)) or not all(isinstance(dependency, str)
+                                                            for dependency in depends_on):
+            errors.append(f"Component {name}: depends_on must be a component name or a list of names")
+            continue
+        for dependency in [depends_on] if isinstance(depends_on, str) else depends_on:
+            if dependency not in components:
+                errors.append(f"Component {name} depends on unknown component {dependency}")
+    
+    for name, cluster in (config.get('clusters') or {}).items():
+        if not isinstance(cluster, dict):
+            errors.append(f"Cluster {name} must be a mapping")
+    
+    return errors
+
+
+class ConfigSnapshot:
+    """
+    One validated version of the configuration.
+    
+    Snapshots are never modified after they are published; a change of the
+    configuration file produces a new snapshot with a higher version.
+    """
+    
+    def __init__(self, config: Dict[str, Any], version: int, path: Optional[str] = None,
+                 checksum: Optional[str] = None, mtime: Optional[float] = None):
+        """
+        Initialize the snapshot.
+        
+        Args:
+            config: Validated configuration
+            version: Version number, increasing with every published snapshot
+            path: Path of the configuration file, None for the built-in defaults
+            checksum: SHA-256 of the file content
+            mtime: Modification time of the file when it was read
+        """
+        self.config = config
+        self.version = version
+        self.path = path
+        self.checksum = checksum
+        self.mtime = mtime
+        self.loaded_at = time.time()
+    
+    def describe(self) -> Dict[str, Any]:
+        """
+        Describe the snapshot without its content.
+        
+        Returns:
+            Dict containing version, source file, checksum and load time
+        """
+        return {
+            'version': self.version,
+            'path': self.path,
+            'checksum': self.checksum,
+            'mtime': self.mtime,
+            'loaded_at': self.loaded_at
+        }
+
+
+class ConfigManager:
+    """
+    Loads the configuration file and publishes validated snapshots of it.
+    
+    A background thread polls the file's modification time and size; changed
+    content is parsed and validated on that thread, off the request path.
+    Subscribers registered with `on_change` are called with each new snapshot
+    before it becomes `current`, so derived state is ready when readers see it.
+    """
+    
+    def __init__(self, path: Optional[str] = None, default_config: Optional[Callable[[], Dict[str, Any]]] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        Initialize the manager and load the configuration.
+        
+        Args:
+            path: Path of the configuration file, defaults to GENESIS_CONFIG
+                or configs/builder_config.yml
+            default_config: Callable returning the configuration used when the
+                file cannot be loaded at startup
+            poll_interval: Seconds between checks of the file
+        """
+        self.path = path or os.environ.get('GENESIS_CONFIG', 'configs/builder_config.yml')
+        self.poll_interval = poll_interval
+        self.last_error: Optional[str] = None
+        self._default_config = default_config or dict
+        self._subscribers: List[Callable[[ConfigSnapshot], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stat = self._file_stat()
+        
+        logger.info(f"Loading configuration from {self.path}")
+        config, checksum, error = self._read()
+        if error:
+            logger.error(f"Failed to load configuration: {error}")
+            logger.info("Using default configuration")
+            self.last_error = error
+            config, checksum = self._default_config(), None
+        self._current = ConfigSnapshot(config, 1, self.path if checksum else None, checksum,
+                                       self._stat[0] if self._stat else None)
+    
+    @property
+    def current(self) -> ConfigSnapshot:
+        """The snapshot currently in effect."""
+        return self._current
+    
+    def on_change(self, callback: Callable[[ConfigSnapshot], None]):
+        """
+        Register a callable receiving every new snapshot.
+        
+        Args:
+            callback: Callable invoked with the new snapshot before it is published
+        """
+        self._subscribers.append(callback)
+    
+    def _file_stat(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime, stat.st_size, stat.st_ino
+        except OSError:
+            return None
+    
+    def _read(self) -> tuple:
+        """
+        Read, parse and validate the configuration file.
+        
+        Returns:
+            Tuple of (configuration, content checksum, error message or None)
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                content = f.read()
+            config = yaml.safe_load(content)
+        except Exception as e:
+            return None, None, str(e)
+        
+        errors = validate_config(config)
+        if errors:
+            return None, None, '; '.join(errors)
+        return config, hashlib.sha256(content).hexdigest(), None
+    
+    def reload(self) -> Dict[str, Any]:
+        """
+        Reload the configuration file if its content changed.
+        
+        Returns:
+            Dict containing status (`reloaded`, `unchanged` or `error`) and
+            the snapshot in effect afterwards
+        """
+        with self._lock:
+            self._stat = self._file_stat()
+            config, checksum, error = self._read()
+            if error:
+                if error != self.last_error:
+                    logger.error(f"Rejected configuration {self.path}, keeping version "
+                                 f"{self._current.version}: {error}")
+                self.last_error = error
+                return {'status': 'error', 'message': error, 'config': self._current.describe()}
+            
+            self.last_error = None
+            if checksum == self._current.checksum:
+                return {'status': 'unchanged', 'config': self._current.describe()}
+            
+            snapshot = ConfigSnapshot(config, self._current.version + 1, self.path, checksum,
+                                      self._stat[0] if self._stat else None)
+            try:
+                for callback in self._subscribers:
+                    callback(snapshot)
+            except Exception as e:
+                logger.error(f"Failed to apply configuration version {snapshot.version}: {str(e)}")
+                self.last_error = str(e)
+                return {'status': 'error', 'message': str(e), 'config': self._current.describe()}
+            
+            self._current = snapshot
+            logger.info(f"Loaded configuration version {snapshot.version} from {self.path}")
+            return {'status': 'reloaded', 'config': snapshot.describe()}
+    
+    def check(self) -> Optional[Dict[str, Any]]:
+        """
+        Reload the configuration if the file changed since it was last read.
+        
+        Returns:
+            Reload result, None if the file did not change
+        """
+        stat = self._file_stat()
+        if stat is None or stat == self._stat:
+            return None
+        return self.reload()
+    
+    def start(self):
+        """Start watching the configuration file in a background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._watch, name='genesis-config', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop watching the configuration file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+    
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Error checking configuration {self.path}: {str(e)}")
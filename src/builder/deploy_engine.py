@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Deploy Engine - Incremental Kubernetes deploys for Genesis Builder
+
+This module renders a kustomization once, hashes every rendered object and
+compares the hashes with an index of what was last applied from it to each
+cluster and namespace. Only changed objects are sent through server-side
+apply, in parallel on a bounded pool, and objects that disappeared from the
+rendered manifests can be pruned.
+"""
+
+import os
+import json
+import time
+import yaml
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger('genesis_deploy')
+
+# Field manager recorded by server-side apply for objects applied by Genesis
+FIELD_MANAGER = 'genesis'
+# Kinds applied before everything else, since other objects may depend on them
+FIRST_WAVE_KINDS = ('Namespace', 'CustomResourceDefinition')
+# Separates cluster and kustomization path in last-applied index keys
+INDEX_KEY_SEPARATOR = '|'
+# Index key for objects without a namespace (cluster-scoped or defaulted by kubectl)
+NO_NAMESPACE = '_'
+
+
+def object_key(obj: Dict[str, Any]) -> str:
+    """
+    Build the identity of a rendered object.
+    
+    Args:
+        obj: Kubernetes object
+    
+    Returns:
+        Key of the form `kind.group/name` as accepted by kubectl
+    """
+    group = obj.get('apiVersion', '').rpartition('/')[0]
+    kind = obj.get('kind', '').lower()
+    name = (obj.get('metadata') or {}).get('name', '')
+    return f"{kind}.{group}/{name}" if group else f"{kind}/{name}"
+
+
+def object_hash(obj: Dict[str, Any]) -> str:
+    """
+    Hash a rendered object independently of key order.
+    
+    Args:
+        obj: Kubernetes object
+    
+    Returns:
+        Hex digest of the canonical JSON form
+    """
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+class DeployEngine:
+    """
+    Applies rendered manifests incrementally with server-side apply.
+    
+    The last-applied index is a JSON file mapping (cluster, kustomization)
+    -> namespace -> object key -> hash, so deploying another kustomization to
+    the same cluster never sees the first one's objects as removed. Changes
+    made to the cluster outside Genesis are not visible in the index; a
+    forced deploy re-applies every object.
+    """
+    
+    def __init__(self, run_command: Callable[..., Tuple[int, str, str]], index_path: str, max_workers: int = 4):
+        """
+        Initialize the engine and load its index.
+        
+        Args:
+            run_command: Command runner (see GenesisBuilder._run_command)
+            index_path: Path of the JSON last-applied index
+            max_workers: Maximum number of concurrent kubectl applies
+        """
+        self.run_command = run_command
+        self.index_path = index_path
+        self.max_workers = max(1, int(max_workers))
+        self._lock = threading.Lock()
+        self._index = self._load()
+    
+    @staticmethod
+    def _index_key(cluster: str, kustomize_path: str) -> str:
+        """Key of the index entry of a kustomization deployed to a cluster."""
+        return f"{cluster}{INDEX_KEY_SEPARATOR}{os.path.normpath(kustomize_path)}"
+    
+    def _load(self) -> Dict[str, Any]:
+        """
+        Load the index from disk.
+        
+        Returns:
+            Dict mapping (cluster, kustomization) keys to namespaces to object hashes
+        """
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Failed to load deploy index {self.index_path}: {str(e)}")
+            return {}
+        
+        # Entries keyed by cluster only cannot be attributed to a kustomization; the next
+        # deploy re-applies everything (and prunes nothing) instead
+        legacy = [key for key in index if INDEX_KEY_SEPARATOR not in key]
+        for key in legacy:
+            del index[key]
+        if legacy:
+            logger.info(f"Dropped {len(legacy)} deploy index entries without a kustomization")
+        return index
+    
+    def _save(self):
+        """Write the index to disk atomically. Caller must hold the lock."""
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+    
+    def render(self, kustomize_path: str) -> List[Dict[str, Any]]:
+        """
+        Render a kustomization.
+        
+        Args:
+            kustomize_path: Path of the kustomization directory
+        
+        Returns:
+            List of rendered objects
+        """
+        cmd = ['kubectl', 'kustomize', kustomize_path]
+        returncode, stdout, stderr = self.run_command(cmd, tail_lines=None)
+        if returncode != 0:
+            raise RuntimeError(f"kubectl kustomize failed: {stderr.strip()}")
+        return [obj for obj in yaml.safe_load_all(stdout) if obj]
+    
+    def _apply(self, obj: Dict[str, Any], kube_args: List[str],
+               log_sink: Optional[Callable[[str], None]]) -> Tuple[bool, str]:
+        """
+        Server-side apply a single object.
+        
+        Returns:
+            Tuple of (success, kubectl output)
+        """
+        cmd = ['kubectl', 'apply', '--server-side', f"--field-manager={FIELD_MANAGER}", '--force-conflicts',
+               '-f', '-'] + kube_args
+        returncode, stdout, stderr = self.run_command(cmd, log_sink=log_sink, input_data=json.dumps(obj))
+        return returncode == 0, (stdout if returncode == 0 else stderr).strip()
+    
+    def _delete(self, key: str, namespace: str, kube_args: List[str],
+                log_sink: Optional[Callable[[str], None]]) -> Tuple[bool, str]:
+        """
+        Delete an object that is no longer rendered.
+        
+        Returns:
+            Tuple of (success, kubectl output)
+        """
+        cmd = ['kubectl', 'delete', key, '--ignore-not-found', '--wait=false'] + kube_args
+        if namespace != NO_NAMESPACE:
+            cmd.extend(['-n', namespace])
+        returncode, stdout, stderr = self.run_command(cmd, log_sink=log_sink)
+        return returncode == 0, (stdout if returncode == 0 else stderr).strip()
+    
+    def deploy(self, kustomize_path: str, cluster: str, kube_args: Optional[List[str]] = None,
+               prune: bool = False, force: bool = False,
+               log_sink: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Deploy a kustomization to a cluster, applying only changed objects.
+        
+        Args:
+            kustomize_path: Path of the kustomization directory
+            cluster: Cluster name the index is kept under (with the kustomization)
+            kube_args: Extra kubectl arguments selecting the cluster
+            prune: Delete objects applied earlier that are no longer rendered
+            force: Apply every object regardless of the index
+            log_sink: Optional callable receiving kubectl output line by line
+        
+        Returns:
+            Dict containing applied, unchanged, pruned and failed objects
+        """
+        kube_args = list(kube_args or [])
+        started = time.monotonic()
+        objects = self.render(kustomize_path)
+        render_time = time.monotonic() - started
+        index_key = self._index_key(cluster, kustomize_path)
+        
+        with self._lock:
+            previous = json.loads(json.dumps(self._index.get(index_key, {})))
+        
+        # Compare every rendered object with the index of its namespace
+        rendered: Dict[str, Dict[str, str]] = {}
+        changed: List[Tuple[str, str, str, Dict[str, Any]]] = []
+        unchanged = []
+        for obj in objects:
+            namespace = (obj.get('metadata') or {}).get('namespace') or NO_NAMESPACE
+            key = object_key(obj)
+            digest = object_hash(obj)
+            rendered.setdefault(namespace, {})[key] = digest
+            if force or previous.get(namespace, {}).get(key) != digest:
+                changed.append((namespace, key, digest, obj))
+            else:
+                unchanged.append(self._label(namespace, key))
+        
+        stale = [
+            (namespace, key)
+            for namespace, hashes in previous.items()
+            for key in hashes
+            if key not in rendered.get(namespace, {})
+        ]
+        
+        applied, pruned, failed = [], [], []
+        applied_hashes: Dict[Tuple[str, str], str] = {}
+        apply_started = time.monotonic()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Namespaces and CRDs go first, everything else in parallel afterwards
+            waves = [
+                [item for item in changed if item[3].get('kind') in FIRST_WAVE_KINDS],
+                [item for item in changed if item[3].get('kind') not in FIRST_WAVE_KINDS]
+            ]
+            for wave in waves:
+                futures = {
+                    executor.submit(self._apply, obj, kube_args, log_sink): (namespace, key, digest)
+                    for namespace, key, digest, obj in wave
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    namespace, key, digest = futures[future]
+                    try:
+                        success, output = future.result()
+                    except Exception as e:
+                        success, output = False, str(e)
+                    if success:
+                        applied.append(self._label(namespace, key))
+                        applied_hashes[(namespace, key)] = digest
+                    else:
+                        logger.error(f"Failed to apply {key} in {namespace} on {cluster}: {output}")
+                        failed.append({'object': self._label(namespace, key), 'error': output})
+            
+            if prune and stale:
+                futures = {
+                    executor.submit(self._delete, key, namespace, kube_args, log_sink): (namespace, key)
+                    for namespace, key in stale
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    namespace, key = futures[future]
+                    try:
+                        success, output = future.result()
+                    except Exception as e:
+                        success, output = False, str(e)
+                    if success:
+                        pruned.append(self._label(namespace, key))
+                    else:
+                        failed.append({'object': self._label(namespace, key), 'error': output})
+        apply_time = time.monotonic() - apply_started
+        
+        # Record what is now applied; failed objects stay out of the index so they are retried
+        with self._lock:
+            index = self._index.setdefault(index_key, {})
+            for (namespace, key), digest in applied_hashes.items():
+                index.setdefault(namespace, {})[key] = digest
+            for label in pruned:
+                namespace, key = label.split(':', 1)
+                index.get(namespace, {}).pop(key, None)
+            for failure in failed:
+                namespace, key = failure['object'].split(':', 1)
+                if key in rendered.get(namespace, {}):
+                    index.get(namespace, {}).pop(key, None)
+            for namespace in [namespace for namespace, hashes in index.items() if not hashes]:
+                del index[namespace]
+            try:
+                self._save()
+            except Exception as e:
+                logger.error(f"Failed to save deploy index {self.index_path}: {str(e)}")
+        
+        orphaned = [] if prune else [self._label(namespace, key) for namespace, key in stale]
+        logger.info(f"Deployed {kustomize_path} to {cluster}: {len(applied)} applied, "
+                    f"{len(unchanged)} unchanged, {len(pruned)} pruned, {len(failed)} failed")
+        return {
+            'status': 'error' if failed else 'success',
+            'cluster': cluster,
+            'objects': len(objects),
+            'applied': sorted(applied),
+            'unchanged': sorted(unchanged),
+            'pruned': sorted(pruned),
+            'orphaned': sorted(orphaned),
+            'failed': failed,
+            'render_time': round(render_time, 3),
+            'apply_time': round(apply_time, 3)
+        }
+    
+    @staticmethod
+    def _label(namespace: str, key: str) -> str:
+        """Format an object for results as `namespace:kind.group/name`."""
+        return f"{namespace}:{key}"
+    
+    def forget(self, cluster: str):
+        """
+        Drop the index of a cluster so the next deploy applies everything.
+        
+        Args:
+            cluster: Cluster name
+        """
+        prefix = f"{cluster}{INDEX_KEY_SEPARATOR}"
+        with self._lock:
+            keys = [key for key in self._index if key.startswith(prefix)]
+            for key in keys:
+                del self._index[key]
+            if keys:
+                self._save()
@@ -0,0 +1,789 @@
+#!/usr/bin/env python3
+"""
+Docker Backend - Pluggable access to the Docker daemon for Genesis Builder
+
+This module implements the Docker operations used by Genesis Builder (build,
+push, login, image inspection) behind a common interface. The Engine API
+backend talks to the daemon over its unix socket with pooled keep-alive
+connections and decodes the streamed JSON events, including BuildKit's
+protobuf progress trace; the CLI backend spawns the `docker` executable and
+is kept as a fallback.
+"""
+
+import os
+import json
+import base64
+import datetime
+import queue
+import socket
+import logging
+import contextlib
+import collections
+import http.client
+import urllib.parse
+from typing import Dict, List, Any, Callable, Iterator, Optional, Tuple
+
+from build_context import iter_context_files, iter_context_tar
+
+logger = logging.getLogger('genesis_docker')
+
+DEFAULT_SOCKET = '/var/run/docker.sock'
+# ID of the Engine API events carrying BuildKit progress (a base64 protobuf StatusResponse)
+BUILDKIT_TRACE_ID = 'moby.buildkit.trace'
+
+# Command runner signature used by the CLI backend (see GenesisBuilder._run_command)
+CommandRunner = Callable[..., Tuple[int, str, str]]
+LogSink = Optional[Callable[[str], None]]
+
+
+def _protobuf_fields(data: bytes) -> Dict[int, List[Any]]:
+    """
+    Decode the fields of a protobuf message.
+    
+    Args:
+        data: Serialized message
+    
+    Returns:
+        Dict mapping field numbers to their values (ints, or bytes for
+        length-delimited fields) in order
+    
+    Raises:
+        ValueError: If the message is malformed
+    """
+    def varint(position: int) -> Tuple[int, int]:
+        value = shift = 0
+        while True:
+            if position >= len(data):
+                raise ValueError('Truncated varint')
+            byte = data[position]
+            value |= (byte & 0x7f) << shift
+            position += 1
+            if not byte & 0x80:
+                return value, position
+            shift += 7
+    
+    fields: Dict[int, List[Any]] = {}
+    position = 0
+    while position < len(data):
+        key, position = varint(position)
+        number, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, position = varint(position)
+        elif wire_type == 2:
+            length, position = varint(position)
+            value = data[position:position + length]
+            if len(value) != length:
+                raise ValueError('Truncated field')
+            position += length
+        elif wire_type in (1, 5):
+            size = 8 if wire_type == 1 else 4
+            value = int.from_bytes(data[position:position + size], 'little')
+            position += size
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type}")
+        fields.setdefault(number, []).append(value)
+    return fields
+
+
+def _protobuf_timestamp(data: Optional[bytes]) -> Optional[str]:
+    """Convert a google.protobuf.Timestamp to an RFC 3339 string."""
+    if data is None:
+        return None
+    fields = _protobuf_fields(data)
+    seconds = fields.get(1, [0])[0]
+    nanos = fields.get(2, [0])[0]
+    moment = datetime.datetime.fromtimestamp(seconds, tz=datetime.timezone.utc)
+    return f"{moment.strftime('%Y-%m-%dT%H:%M:%S')}.{nanos:09d}Z"
+
+
+def decode_buildkit_status(data: bytes) -> Dict[str, Any]:
+    """
+    Decode a BuildKit StatusResponse into the `--progress=rawjson` event format.
+    
+    Args:
+        data: Serialized moby.buildkit.v1.StatusResponse
+    
+    Returns:
+        Dict containing vertexes, statuses and logs as printed by rawjson progress
+    
+    Raises:
+        ValueError: If the message is malformed
+    """
+    def text(fields: Dict[int, List[Any]], number: int) -> Optional[str]:
+        values = fields.get(number)
+        return values[0].decode('utf-8', errors='replace') if values else None
+    
+    message = _protobuf_fields(data)
+    vertexes, statuses, logs = [], [], []
+    for raw in message.get(1, []):
+        fields = _protobuf_fields(raw)
+        vertex = {'digest': text(fields, 1), 'name': text(fields, 3)}
+        if fields.get(4, [0])[0]:
+            vertex['cached'] = True
+        for key, number in (('started', 5), ('completed', 6)):
+            if number in fields:
+                vertex[key] = _protobuf_timestamp(fields[number][0])
+        if text(fields, 7):
+            vertex['error'] = text(fields, 7)
+        vertexes.append(vertex)
+    for raw in message.get(2, []):
+        fields = _protobuf_fields(raw)
+        statuses.append({'id': text(fields, 1), 'vertex': text(fields, 2), 'name': text(fields, 3),
+                         'current': fields.get(4, [0])[0], 'total': fields.get(5, [0])[0]})
+    for raw in message.get(3, []):
+        fields = _protobuf_fields(raw)
+        logs.append({'vertex': text(fields, 1), 'stream': fields.get(3, [0])[0],
+                     'data': base64.b64encode(fields.get(4, [b''])[0]).decode('ascii')})
+    return {'vertexes': vertexes, 'statuses': statuses, 'logs': logs}
+
+
+class DockerBackendError(Exception):
+    """Raised when the Docker daemon cannot be reached."""
+
+
+class DockerBackend:
+    """
+    Interface of Docker backends.
+    
+    Long-running operations return `(returncode, stdout tail, stderr tail)`
+    like `GenesisBuilder._run_command`, with output formatted as the docker
+    CLI prints it, so callers can parse results independently of the backend.
+    """
+    
+    name = 'base'
+    
+    def build(self, tags: List[str], dockerfile: str, context: str, build_args: List[str],
+              log_sink: LogSink = None, cache_from: Optional[List[str]] = None,
+              cache_to: Optional[List[str]] = None,
+              context_files: Optional[List[str]] = None) -> Tuple[int, str, str]:
+        """
+        Build an image.
+        
+        Args:
+            tags: Image references to tag the result with
+            dockerfile: Path of the Dockerfile
+            context: Path of the build context
+            build_args: Build arguments in KEY=VALUE form
+            log_sink: Optional callable receiving output line by line
+            cache_from: BuildKit cache import specs, e.g. `type=registry,ref=<image>`
+            cache_to: BuildKit cache export specs, e.g. `type=inline`
+            context_files: Context-relative paths of the files to send, as listed
+                by iter_context_files; backends that pack the context themselves
+                list it if not given
+        
+        Returns:
+            Tuple of (return code, stdout tail, stderr tail)
+        """
+        raise NotImplementedError
+    
+    def push(self, image_ref: str, log_sink: LogSink = None,
+             credentials: Optional[Tuple[str, str, str]] = None) -> Tuple[int, str, str]:
+        """
+        Push an image.
+        
+        Args:
+            image_ref: Image reference including tag
+            log_sink: Optional callable receiving output line by line
+            credentials: Optional (registry, username, password)
+        
+        Returns:
+            Tuple of (return code, stdout tail, stderr tail)
+        """
+        raise NotImplementedError
+    
+    def login(self, registry: str, username: str, password: str) -> Tuple[bool, str]:
+        """
+        Log in to (or validate credentials against) a registry.
+        
+        Args:
+            registry: Registry URL
+            username: Registry username
+            password: Registry password
+        
+        Returns:
+            Tuple of (success, message)
+        """
+        raise NotImplementedError
+    
+    def inspect_image(self, image_ref: str) -> Optional[Dict[str, Any]]:
+        """
+        Inspect a local image.
+        
+        Args:
+            image_ref: Image reference
+        
+        Returns:
+            Image details as returned by `docker image inspect`, or None if missing
+        """
+        raise NotImplementedError
+    
+    def list_images(self) -> Optional[Dict[str, str]]:
+        """
+        List all local image tags with a single daemon call.
+        
+        Returns:
+            Dict mapping image references (`name:tag`) to image IDs, or None on failure
+        """
+        raise NotImplementedError
+
+
+class CLIDockerBackend(DockerBackend):
+    """Docker backend spawning the `docker` CLI for every operation."""
+    
+    name = 'cli'
+    
+    def __init__(self, run_command: CommandRunner, progress: Optional[str] = None,
+                 buildx_builder: Optional[str] = None):
+        """
+        Initialize the backend.
+        
+        Args:
+            run_command: Callable running a command (see GenesisBuilder._run_command)
+            progress: BuildKit progress output type (`plain` or `rawjson`), None for the CLI default
+            buildx_builder: Optional buildx builder instance; exporting the layer cache to a
+                registry or directory needs one using the docker-container driver
+        """
+        self.run_command = run_command
+        self.progress = progress
+        self.buildx_builder = buildx_builder
+    
+    def build(self, tags: List[str], dockerfile: str, context: str, build_args: List[str],
+              log_sink: LogSink = None, cache_from: Optional[List[str]] = None,
+              cache_to: Optional[List[str]] = None,
+              context_files: Optional[List[str]] = None) -> Tuple[int, str, str]:
+        cmd = ['docker', 'build']
+        if self.buildx_builder:
+            # Images built by a docker-container builder must be loaded into the local image store
+            cmd = ['docker', 'buildx', 'build', '--builder', self.buildx_builder, '--load']
+        for tag in tags:
+            cmd.extend(['-t', tag])
+        for arg in build_args:
+            cmd.extend(['--build-arg', arg])
+        for spec in cache_from or []:
+            cmd.extend(['--cache-from', spec])
+        for spec in cache_to or []:
+            cmd.extend(['--cache-to', spec])
+        if self.progress:
+            cmd.append(f"--progress={self.progress}")
+        cmd.extend(['-f', dockerfile, context])
+        
+        logger.debug(f"Build command: {' '.join(cmd)}")
+        return self.run_command(cmd, log_sink=log_sink)
+    
+    def push(self, image_ref: str, log_sink: LogSink = None,
+             credentials: Optional[Tuple[str, str, str]] = None) -> Tuple[int, str, str]:
+        # The CLI uses the credentials stored by `docker login`
+        return self.run_command(['docker', 'push', image_ref], log_sink=log_sink)
+    
+    def login(self, registry: str, username: str, password: str) -> Tuple[bool, str]:
+        login_cmd = ['docker', 'login', registry, '-u', username, '--password-stdin']
+        returncode, _, stderr = self.run_command(login_cmd, input_data=password)
+        if returncode != 0:
+            return False, stderr.strip()
+        return True, 'Login succeeded'
+    
+    def inspect_image(self, image_ref: str) -> Optional[Dict[str, Any]]:
+        returncode, stdout, _ = self.run_command(['docker', 'image', 'inspect', image_ref], tail_lines=None)
+        if returncode != 0:
+            return None
+        try:
+            images = json.loads(stdout)
+        except ValueError:
+            return None
+        return images[0] if images else None
+    
+    def list_images(self) -> Optional[Dict[str, str]]:
+        returncode, stdout, _ = self.run_command(
+            ['docker', 'image', 'ls', '--no-trunc', '--format', '{{.Repository}}:{{.Tag}} {{.ID}}'], tail_lines=None)
+        if returncode != 0:
+            return None
+        images = {}
+        for line in stdout.splitlines():
+            reference, _, image_id = line.strip().partition(' ')
+            if reference and '<none>' not in reference:
+                images[reference] = image_id
+        return images
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a unix domain socket."""
+    
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+    
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class EngineAPIClient:
+    """
+    Minimal Docker Engine API client with a pool of keep-alive connections.
+    """
+    
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, pool_size: int = 8):
+        """
+        Initialize the client.
+        
+        Args:
+            socket_path: Path of the Docker daemon socket
+            pool_size: Maximum number of idle connections kept open
+        """
+        self.socket_path = socket_path
+        self._pool = queue.LifoQueue(maxsize=max(1, pool_size))
+    
+    def _acquire(self) -> UnixHTTPConnection:
+        """Get an idle connection from the pool or open a new one."""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return UnixHTTPConnection(self.socket_path)
+    
+    def _release(self, connection: UnixHTTPConnection):
+        """Return a connection to the pool, closing it if the pool is full."""
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+    
+    @contextlib.contextmanager
+    def request(self, method: str, path: str, params: Optional[Any] = None, body: Any = None,
+                headers: Optional[Dict[str, str]] = None) -> Iterator[http.client.HTTPResponse]:
+        """
+        Send a request and yield the response.
+        
+        The connection returns to the pool if the response was read completely.
+        
+        Args:
+            method: HTTP method
+            path: Request path
+            params: Optional query parameters (dict or list of pairs)
+            body: Optional request body (bytes, file object or iterable of chunks,
+                sent with chunked transfer encoding unless Content-Length is set)
+            headers: Optional request headers
+        
+        Yields:
+            HTTP response
+        """
+        if params:
+            path = f"{path}?{urllib.parse.urlencode(params)}"
+        
+        connection = self._acquire()
+        try:
+            connection.request(method, path, body=body, headers=headers or {})
+            response = connection.getresponse()
+        except (OSError, http.client.HTTPException) as e:
+            connection.close()
+            # A pooled connection may have been closed by the daemon, retry once on a fresh one
+            # (streamed bodies cannot be sent again)
+            if isinstance(e, (http.client.RemoteDisconnected, BrokenPipeError)) and \
+                    (body is None or isinstance(body, (bytes, str))):
+                connection = UnixHTTPConnection(self.socket_path)
+                try:
+                    connection.request(method, path, body=body, headers=headers or {})
+                    response = connection.getresponse()
+                except (OSError, http.client.HTTPException) as retry_error:
+                    connection.close()
+                    raise DockerBackendError(f"Docker daemon unreachable at {self.socket_path}: {retry_error}")
+            else:
+                raise DockerBackendError(f"Docker daemon unreachable at {self.socket_path}: {e}")
+        
+        try:
+            yield response
+        finally:
+            if response.isclosed() and not response.will_close:
+                self._release(connection)
+            else:
+                connection.close()
+    
+    def call(self, method: str, path: str, params: Optional[Any] = None, body: Any = None,
+             headers: Optional[Dict[str, str]] = None) -> Tuple[int, Any]:
+        """
+        Send a request and decode its JSON response.
+        
+        Args:
+            method: HTTP method
+            path: Request path
+            params: Optional query parameters
+            body: Optional request body
+            headers: Optional request headers
+        
+        Returns:
+            Tuple of (status code, decoded body or raw text)
+        """
+        with self.request(method, path, params=params, body=body, headers=headers) as response:
+            data = response.read()
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, data.decode('utf-8', errors='replace')
+    
+    def stream(self, method: str, path: str, params: Optional[Any] = None, body: Any = None,
+               headers: Optional[Dict[str, str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Send a request and decode its streamed JSON events as they arrive.
+        
+        Args:
+            method: HTTP method
+            path: Request path
+            params: Optional query parameters
+            body: Optional request body
+            headers: Optional request headers
+        
+        Yields:
+            Decoded JSON events; a non-2xx response yields a single `error` event
+        """
+        decoder = json.JSONDecoder()
+        with self.request(method, path, params=params, body=body, headers=headers) as response:
+            if response.status >= 300:
+                data = response.read().decode('utf-8', errors='replace')
+                try:
+                    message = json.loads(data).get('message', data)
+                except ValueError:
+                    message = data
+                yield {'error': message.strip() or f"HTTP {response.status}"}
+                return
+            
+            buffer = ''
+            while True:
+                chunk = response.read1(65536) if hasattr(response, 'read1') else response.read(65536)
+                if not chunk:
+                    break
+                buffer += chunk.decode('utf-8', errors='replace')
+                while buffer:
+                    buffer = buffer.lstrip()
+                    try:
+                        event, end = decoder.raw_decode(buffer)
+                    except ValueError:
+                        break
+                    buffer = buffer[end:]
+                    yield event
+
+
+class EngineAPIDockerBackend(DockerBackend):
+    """
+    Docker backend using the Engine API over the daemon socket.
+    
+    Operations that cannot reach the daemon are delegated to the fallback
+    backend, if one is configured.
+    """
+    
+    name = 'engine'
+    
+    def __init__(self, client: EngineAPIClient, fallback: Optional[DockerBackend] = None,
+                 tail_lines: int = 200, buildkit: bool = True):
+        """
+        Initialize the backend.
+        
+        Args:
+            client: Engine API client
+            fallback: Optional backend used when the daemon socket is unreachable
+            tail_lines: Number of trailing output lines kept in results
+            buildkit: Build with BuildKit (`version=2`), whose progress trace has
+                per-step timings, cache status and transfer sizes; builds with a
+                layer cache always use BuildKit
+        """
+        self.client = client
+        self.fallback = fallback
+        self.tail_lines = tail_lines
+        self.buildkit = buildkit
+    
+    def ping(self) -> bool:
+        """
+        Check whether the daemon answers on its socket.
+        
+        Returns:
+            True if the daemon is reachable
+        """
+        try:
+            status, _ = self.client.call('GET', '/_ping')
+            return status == 200
+        except DockerBackendError:
+            return False
+    
+    def _fallback(self, operation: str, error: Exception):
+        """Get the fallback backend after a connection failure, re-raising without one."""
+        if self.fallback is None:
+            raise error
+        logger.warning(f"Engine API {operation} failed ({str(error)}), using {self.fallback.name} backend")
+        return self.fallback
+    
+    def _consume(self, events: Iterator[Dict[str, Any]], log_sink: LogSink) -> Tuple[int, str, str]:
+        """
+        Turn a stream of Engine API events into CLI-style output.
+        
+        Args:
+            events: Decoded JSON events
+            log_sink: Optional callable receiving output line by line
+        
+        Returns:
+            Tuple of (return code, stdout tail, stderr tail)
+        """
+        stdout_tail = collections.deque(maxlen=self.tail_lines)
+        errors = []
+        partial = ''
+        
+        def emit(line: str):
+            stdout_tail.append(line + '\n')
+            if log_sink:
+                try:
+                    log_sink(line)
+                except Exception as e:
+                    logger.debug(f"Log sink failed: {str(e)}")
+        
+        for event in events:
+            if event.get('id') == BUILDKIT_TRACE_ID and isinstance(event.get('aux'), str):
+                # Passed on as a rawjson progress line, which the build profiler understands
+                try:
+                    emit(json.dumps(decode_buildkit_status(base64.b64decode(event['aux']))))
+                except ValueError as e:
+                    logger.debug(f"Failed to decode BuildKit trace event: {str(e)}")
+                continue
+            if 'error' in event or 'errorDetail' in event:
+                message = event.get('error') or event.get('errorDetail', {}).get('message', 'Unknown error')
+                errors.append(message)
+                continue
+            if 'stream' in event:
+                partial += event['stream']
+                *lines, partial = partial.split('\n')
+                for line in lines:
+                    emit(line)
+            elif 'status' in event:
+                # Progress bars are only meaningful on a terminal
+                if 'progressDetail' in event and event.get('progress'):
+                    continue
+                emit(f"{event['id']}: {event['status']}" if event.get('id') else event['status'])
+            elif 'aux' in event and isinstance(event['aux'], dict) and 'ID' in event['aux']:
+                emit(f"Image ID: {event['aux']['ID']}")
+        
+        if partial:
+            emit(partial)
+        if errors:
+            return 1, ''.join(stdout_tail), '\n'.join(errors)
+        return 0, ''.join(stdout_tail), ''
+    
+    @staticmethod
+    def _build_args(build_args: List[str]) -> Dict[str, str]:
+        """Convert KEY=VALUE build arguments (or bare KEY taken from the environment) to a dict."""
+        args = {}
+        for arg in build_args:
+            key, sep, value = arg.partition('=')
+            if sep:
+                args[key] = value
+            elif key in os.environ:
+                args[key] = os.environ[key]
+        return args
+    
+    @staticmethod
+    def _context_members(context: str, dockerfile: str,
+                         context_files: Optional[List[str]] = None) -> Tuple[List[Tuple[str, str]], str]:
+        """
+        List the members of a build context archive.
+        
+        Args:
+            context: Path of the build context
+            dockerfile: Path of the Dockerfile
+            context_files: Context-relative paths of the files to send, listed if not given
+        
+        Returns:
+            Tuple of (list of (archive path, file path), Dockerfile path inside the archive)
+        """
+        dockerfile_abs = os.path.abspath(dockerfile)
+        context_abs = os.path.abspath(context)
+        inside = os.path.commonpath([dockerfile_abs, context_abs]) == context_abs
+        dockerfile_name = os.path.relpath(dockerfile_abs, context_abs).replace(os.sep, '/') if inside \
+            else f".dockerfile.{os.path.basename(dockerfile_abs)}"
+        
+        if context_files is None:
+            context_files = list(iter_context_files(context))
+        members = [(path, os.path.join(context, path)) for path in context_files]
+        # The daemon always needs the Dockerfile, even if .dockerignore excludes it
+        if dockerfile_name not in context_files:
+            members.append((dockerfile_name, dockerfile_abs))
+        return members, dockerfile_name
+    
+    @staticmethod
+    def _auth_header(credentials: Optional[Tuple[str, str, str]]) -> str:
+        """Encode registry credentials for the X-Registry-Auth header."""
+        auth = {}
+        if credentials:
+            registry, username, password = credentials
+            auth = {'username': username, 'password': password, 'serveraddress': registry}
+        return base64.urlsafe_b64encode(json.dumps(auth).encode('utf-8')).decode('ascii')
+    
+    @staticmethod
+    def _cache_specs(cache_from: Optional[List[str]],
+                     cache_to: Optional[List[str]]) -> Tuple[List[str], bool, List[str]]:
+        """
+        Map layer cache specs to what BuildKit behind the daemon's /build endpoint supports.
+        
+        The endpoint imports the cache from registry images (`type=registry,ref=<image>`
+        or `<image>`) and exports it inline in the built image (`type=inline`); every
+        other spec needs a BuildKit client (buildx).
+        
+        Args:
+            cache_from: BuildKit cache import specs
+            cache_to: BuildKit cache export specs
+        
+        Returns:
+            Tuple of (cache source images, whether to export the cache inline, unsupported specs)
+        """
+        images, unsupported = [], []
+        for spec in cache_from or []:
+            fields = dict(field.partition('=')[::2] for field in spec.split(',')) if '=' in spec else {'ref': spec}
+            if fields.get('type', 'registry') == 'registry' and fields.get('ref') and len(fields) <= 2:
+                images.append(fields['ref'])
+            else:
+                unsupported.append(spec)
+        inline = False
+        for spec in cache_to or []:
+            if spec.replace(' ', '') == 'type=inline':
+                inline = True
+            else:
+                unsupported.append(spec)
+        return images, inline, unsupported
+    
+    def build(self, tags: List[str], dockerfile: str, context: str, build_args: List[str],
+              log_sink: LogSink = None, cache_from: Optional[List[str]] = None,
+              cache_to: Optional[List[str]] = None,
+              context_files: Optional[List[str]] = None) -> Tuple[int, str, str]:
+        cache_images, inline_cache, unsupported = self._cache_specs(cache_from, cache_to)
+        if unsupported:
+            if self.fallback is not None:
+                logger.info(f"Engine API builds cannot use layer cache specs {unsupported}, "
+                            f"building with the {self.fallback.name} backend")
+                return self.fallback.build(tags, dockerfile, context, build_args, log_sink,
+                                           cache_from, cache_to, context_files)
+            logger.warning(f"Engine API builds cannot use layer cache specs {unsupported}, ignoring them")
+        
+        members, dockerfile_name = self._context_members(context, dockerfile, context_files)
+        try:
+            params = [('t', tag) for tag in tags]
+            params.append(('dockerfile', dockerfile_name))
+            args = self._build_args(build_args)
+            if inline_cache:
+                # How BuildKit behind the Engine API embeds cache metadata in the image
+                args.setdefault('BUILDKIT_INLINE_CACHE', '1')
+            params.append(('buildargs', json.dumps(args)))
+            if self.buildkit or cache_images or inline_cache:
+                # The classic builder only uses cache images that are already local and reports
+                # no per-step timings; BuildKit imports the cache from the registry
+                params.append(('version', '2'))
+            if cache_images:
+                params.append(('cachefrom', json.dumps(cache_images)))
+            headers = {'Content-Type': 'application/x-tar'}
+            
+            # The archive is generated while it is uploaded (chunked), never staged
+            events = self.client.stream('POST', '/build', params=params, body=iter_context_tar(members),
+                                        headers=headers)
+            return self._consume(events, log_sink)
+        except DockerBackendError as e:
+            return self._fallback('build', e).build(tags, dockerfile, context, build_args, log_sink,
+                                                    cache_from, cache_to, context_files)
+    
+    def push(self, image_ref: str, log_sink: LogSink = None,
+             credentials: Optional[Tuple[str, str, str]] = None) -> Tuple[int, str, str]:
+        name, tag = split_image_ref(image_ref)
+        try:
+            events = self.client.stream(
+                'POST', f"/images/{urllib.parse.quote(name, safe='/:')}/push",
+                params={'tag': tag} if tag else None,
+                headers={'X-Registry-Auth': self._auth_header(credentials)}
+            )
+            return self._consume(events, log_sink)
+        except DockerBackendError as e:
+            return self._fallback('push', e).push(image_ref, log_sink, credentials)
+    
+    def login(self, registry: str, username: str, password: str) -> Tuple[bool, str]:
+        # The daemon validates the credentials; pushes send them with X-Registry-Auth
+        body = json.dumps({'username': username, 'password': password, 'serveraddress': registry})
+        try:
+            status, data = self.client.call('POST', '/auth', body=body.encode('utf-8'),
+                                            headers={'Content-Type': 'application/json'})
+        except DockerBackendError as e:
+            return self._fallback('login', e).login(registry, username, password)
+        if status != 200:
+            message = data.get('message') if isinstance(data, dict) else str(data)
+            return False, message or f"HTTP {status}"
+        return True, (data or {}).get('Status', 'Login succeeded')
+    
+    def inspect_image(self, image_ref: str) -> Optional[Dict[str, Any]]:
+        try:
+            status, data = self.client.call('GET', f"/images/{urllib.parse.quote(image_ref, safe='/:@')}/json")
+        except DockerBackendError as e:
+            return self._fallback('inspect', e).inspect_image(image_ref)
+        return data if status == 200 and isinstance(data, dict) else None
+    
+    def list_images(self) -> Optional[Dict[str, str]]:
+        try:
+            status, data = self.client.call('GET', '/images/json')
+        except DockerBackendError as e:
+            return self._fallback('image list', e).list_images()
+        if status != 200 or not isinstance(data, list):
+            return None
+        images = {}
+        for image in data:
+            for reference in image.get('RepoTags') or []:
+                if '<none>' not in reference:
+                    images[reference] = image.get('Id')
+        return images
+
+
+def split_image_ref(image_ref: str) -> Tuple[str, Optional[str]]:
+    """
+    Split an image reference into name and tag.
+    
+    Args:
+        image_ref: Image reference, e.g. `registry:5000/repo:tag`
+    
+    Returns:
+        Tuple of (name, tag or None)
+    """
+    name, sep, tag = image_ref.rpartition(':')
+    if not sep or '/' in tag:
+        return image_ref, None
+    return name, tag
+
+
+def create_docker_backend(settings: Dict[str, Any], run_command: CommandRunner,
+                          tail_lines: int = 200) -> DockerBackend:
+    """
+    Create the Docker backend selected in the builder settings.
+    
+    `docker_backend` may be `cli`, `engine` or `auto` (the default), which
+    uses the Engine API when the daemon socket answers and the CLI otherwise.
+    
+    Args:
+        settings: The `builder` section of the configuration
+        run_command: Command runner for the CLI backend
+        tail_lines: Number of trailing output lines kept in results
+    
+    Returns:
+        Docker backend instance
+    """
+    mode = settings.get('docker_backend', 'auto')
+    cli = CLIDockerBackend(run_command, progress=settings.get('build_progress', 'plain'),
+                           buildx_builder=settings.get('buildx_builder'))
+    if mode == 'cli':
+        return cli
+    
+    socket_path = settings.get('docker_socket')
+    if not socket_path:
+        docker_host = os.environ.get('DOCKER_HOST', '')
+        socket_path = docker_host[len('unix://'):] if docker_host.startswith('unix://') else DEFAULT_SOCKET
+    
+    engine = EngineAPIDockerBackend(
+        EngineAPIClient(socket_path, pool_size=int(settings.get('docker_pool_size', 8))),
+        fallback=cli,
+        tail_lines=tail_lines,
+        buildkit=bool(settings.get('engine_buildkit', True))
+    )
+    if mode == 'engine' or engine.ping():
+        logger.info(f"Using Docker Engine API backend at {socket_path}")
+        return engine
+    
+    logger.info(f"Docker socket {socket_path} not available, using docker CLI backend")
+    return cli
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Event Bus - In-process operation event feed for Genesis API
+
+This module keeps a bounded history of operation events (state transitions
+and progress updates) with increasing event IDs. Subscribers do not register
+queues; they keep the ID of the last event they saw and wait for newer ones,
+so long-poll requests and event streams can resume after reconnecting.
+"""
+
+import time
+import logging
+import threading
+import collections
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger('genesis_events')
+
+
+class EventBus:
+    """
+    Bounded ring buffer of events with absolute, increasing event IDs.
+    
+    Subscribers that fall further behind than `max_events` events skip the
+    dropped events and continue from the oldest event still held.
+    """
+    
+    def __init__(self, max_events: int = 1000):
+        """
+        Initialize the bus.
+        
+        Args:
+            max_events: Maximum number of events held
+        """
+        self._events = collections.deque(maxlen=max(1, int(max_events)))
+        # ID of the most recently published event
+        self._last_id = 0
+        self._condition = threading.Condition()
+    
+    @property
+    def last_id(self) -> int:
+        """ID of the most recently published event, 0 if none."""
+        return self._last_id
+    
+    def publish(self, event_type: str, **data: Any) -> Dict[str, Any]:
+        """
+        Publish an event and wake up waiting subscribers.
+        
+        Args:
+            event_type: Event type, e.g. `state` or `progress`
+            **data: Event payload
+        
+        Returns:
+            Published event including its ID
+        """
+        with self._condition:
+            self._last_id += 1
+            event = dict(data, id=self._last_id, event=event_type, time=time.time())
+            self._events.append(event)
+            self._condition.notify_all()
+        return event
+    
+    def read(self, after: int = 0,
+             predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read events published after an event ID.
+        
+        Args:
+            after: ID of the last event already seen
+            predicate: Optional filter applied to events
+        
+        Returns:
+            Tuple of (matching events, ID to pass as `after` on the next read)
+        """
+        with self._condition:
+            events = [event for event in self._events if event['id'] > after]
+            last_id = self._last_id
+        if predicate is not None:
+            events = [event for event in events if predicate(event)]
+        return events, max(after, last_id)
+    
+    def wait(self, after: int, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until an event newer than an event ID is published.
+        
+        Args:
+            after: ID of the last event already seen
+            timeout: Maximum number of seconds to wait
+        
+        Returns:
+            True if newer events are available
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._last_id > after, timeout)
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Fake Docker Engine - In-process Docker Engine API server for tests and benchmarks
+
+This module serves the subset of the Docker Engine API used by the Engine API
+backend (ping, build, push, auth, image inspect and list) on a unix socket.
+Builds and pushes only emit the event streams a real daemon would, with
+configurable latency and output size, and images are kept in memory. Builds
+requested with `version=2` report BuildKit progress trace events instead of
+classic builder output.
+"""
+
+import os
+import io
+import json
+import time
+import base64
+import hashlib
+import tarfile
+import tempfile
+import threading
+import socketserver
+import urllib.parse
+from http.server import BaseHTTPRequestHandler
+from typing import Dict, Any, List, Optional
+
+
+def _protobuf_varint(value: int) -> bytes:
+    data = b''
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            data += bytes([byte | 0x80])
+        else:
+            return data + bytes([byte])
+
+
+def _protobuf_field(number: int, value: Any) -> bytes:
+    """Serialize one protobuf field (ints as varints, str/bytes length-delimited)."""
+    if isinstance(value, int):
+        return _protobuf_varint(number << 3) + _protobuf_varint(value)
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return _protobuf_varint(number << 3 | 2) + _protobuf_varint(len(value)) + value
+
+
+def _protobuf_timestamp(moment: float) -> bytes:
+    return _protobuf_field(1, int(moment)) + _protobuf_field(2, int((moment % 1) * 1e9))
+
+
+def _buildkit_trace(vertexes: List[bytes] = (), statuses: List[bytes] = (), logs: List[bytes] = ()) -> Dict[str, Any]:
+    """Build an Engine API BuildKit trace event from serialized Vertex/VertexStatus/VertexLog messages."""
+    message = b''.join(
+        [_protobuf_field(1, vertex) for vertex in vertexes] +
+        [_protobuf_field(2, status) for status in statuses] +
+        [_protobuf_field(3, log) for log in logs]
+    )
+    return {'id': 'moby.buildkit.trace', 'aux': base64.b64encode(message).decode('ascii')}
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class FakeDockerEngine:
+    """
+    Fake Docker daemon listening on a unix socket.
+    
+    Usage:
+        with FakeDockerEngine() as engine:
+            backend = EngineAPIDockerBackend(EngineAPIClient(engine.socket_path))
+    """
+    
+    def __init__(self, socket_path: Optional[str] = None, latency: float = 0.0, output_lines: int = 10,
+                 credentials: Optional[Dict[str, str]] = None, layers: int = 3):
+        """
+        Initialize the fake daemon.
+        
+        Args:
+            socket_path: Socket path, a temporary one is used if not given
+            latency: Seconds every build and push takes
+            output_lines: Number of output lines emitted per build
+            credentials: Optional username -> password map; if set, auth and pushes are checked
+            layers: Number of layers of built images
+        """
+        if socket_path is None:
+            socket_path = os.path.join(tempfile.mkdtemp(prefix='genesis-fake-docker-'), 'docker.sock')
+        self.socket_path = socket_path
+        self.latency = latency
+        self.output_lines = output_lines
+        self.credentials = credentials
+        self.layers = layers
+        self.images: Dict[str, Dict[str, Any]] = {}
+        self.pushed_layers = set()
+        self.requests: List[str] = []
+        self.connections = 0
+        self.fail_builds = False
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+    
+    def __enter__(self) -> 'FakeDockerEngine':
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def start(self):
+        """Start serving in a background thread."""
+        engine = self
+        
+        class Handler(_EngineHandler):
+            pass
+        Handler.engine = engine
+        
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = _Server(self.socket_path, Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop serving and remove the socket."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+    
+    def add_image(self, reference: str, layers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Register a local image, as if it had been built or pulled.
+        
+        Args:
+            reference: Image reference including tag
+            layers: Number of layers, defaults to the engine setting
+        
+        Returns:
+            Image details as served by the inspect endpoint
+        """
+        seed = hashlib.sha256(reference.encode('utf-8')).hexdigest()
+        return self._store_image([reference], seed, layers)
+    
+    def _store_image(self, tags: List[str], seed: str, layers: Optional[int] = None) -> Dict[str, Any]:
+        layer_ids = [
+            'sha256:' + hashlib.sha256(f"{seed}:{index}".encode('utf-8')).hexdigest()
+            for index in range(self.layers if layers is None else layers)
+        ]
+        image = {
+            'Id': 'sha256:' + hashlib.sha256(seed.encode('utf-8')).hexdigest(),
+            'RepoTags': list(tags),
+            'Created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'Size': 1024 * len(layer_ids),
+            'RootFS': {'Type': 'layers', 'Layers': layer_ids}
+        }
+        with self._lock:
+            for tag in tags:
+                self.images[tag] = image
+        return image
+
+
+class _EngineHandler(BaseHTTPRequestHandler):
+    """Request handler serving the fake Engine API."""
+    
+    protocol_version = 'HTTP/1.1'
+    engine: FakeDockerEngine = None
+    
+    def setup(self):
+        super().setup()
+        with self.engine._lock:
+            self.engine.connections += 1
+    
+    def log_message(self, format, *args):
+        pass
+    
+    # Request helpers
+    
+    def _body(self) -> bytes:
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            data = b''
+            while True:
+                size = int(self.rfile.readline().strip() or b'0', 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return data
+                data += self.rfile.read(size)
+                self.rfile.readline()
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length) if length else b''
+    
+    def _send_json(self, status: int, data: Any):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+    
+    def _event(self, event: Dict[str, Any]):
+        data = (json.dumps(event) + '\r\n').encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+    
+    def _end_stream(self):
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+    
+    def _authorized(self, username: Optional[str], password: Optional[str]) -> bool:
+        credentials = self.engine.credentials
+        return credentials is None or (username in credentials and credentials[username] == password)
+    
+    # Routes
+    
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        path = parsed.path
+        self.engine.requests.append(f"GET {path}")
+        
+        if path == '/_ping':
+            body = b'OK'
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif path == '/version':
+            self._send_json(200, {'Version': '24.0.0-fake', 'ApiVersion': '1.43'})
+        elif path == '/images/json':
+            with self.engine._lock:
+                images = {image['Id']: image for image in self.engine.images.values()}
+            self._send_json(200, [
+                {'Id': image['Id'], 'RepoTags': image['RepoTags'], 'Size': image['Size'], 'Created': 0}
+                for image in images.values()
+            ])
+        elif path.startswith('/images/') and path.endswith('/json'):
+            name = urllib.parse.unquote(path[len('/images/'):-len('/json')])
+            with self.engine._lock:
+                image = self.engine.images.get(name) or self.engine.images.get(f"{name}:latest")
+            if image:
+                self._send_json(200, image)
+            else:
+                self._send_json(404, {'message': f"No such image: {name}"})
+        else:
+            self._send_json(404, {'message': 'page not found'})
+    
+    def do_POST(self):
+        parsed = urllib.parse.urlparse(self.path)
+        path = parsed.path
+        params = urllib.parse.parse_qs(parsed.query)
+        self.engine.requests.append(f"POST {path}")
+        body = self._body()
+        
+        if path == '/auth':
+            data = json.loads(body or b'{}')
+            if self._authorized(data.get('username'), data.get('password')):
+                self._send_json(200, {'Status': 'Login Succeeded'})
+            else:
+                self._send_json(401, {'message': 'unauthorized: incorrect username or password'})
+        elif path == '/build':
+            self._build(params, body)
+        elif path.startswith('/images/') and path.endswith('/push'):
+            name = urllib.parse.unquote(path[len('/images/'):-len('/push')])
+            self._push(name, params.get('tag', ['latest'])[0])
+        else:
+            self._send_json(404, {'message': 'page not found'})
+    
+    def _build(self, params: Dict[str, List[str]], body: bytes):
+        engine = self.engine
+        dockerfile_name = params.get('dockerfile', ['Dockerfile'])[0]
+        try:
+            with tarfile.open(fileobj=io.BytesIO(body), mode='r:*') as tar:
+                names = tar.getnames()
+                member = tar.extractfile(dockerfile_name) if dockerfile_name in names else None
+                dockerfile = member.read().decode('utf-8', errors='replace') if member else None
+        except tarfile.TarError as e:
+            self._send_json(400, {'message': f"invalid build context: {str(e)}"})
+            return
+        if dockerfile is None:
+            self._send_json(400, {'message': f"Cannot locate specified Dockerfile: {dockerfile_name}"})
+            return
+        
+        self._start_stream()
+        instructions = [line for line in dockerfile.splitlines() if line.strip() and not line.startswith('#')]
+        if params.get('version') == ['2']:
+            self._build_buildkit(params, body, instructions)
+            return
+        self._event({'stream': f"Sending build context to Docker daemon  {len(body)}B\n"})
+        for index, line in enumerate(instructions):
+            self._event({'stream': f"Step {index + 1}/{len(instructions)} : {line}\n"})
+        for index in range(engine.output_lines):
+            self._event({'stream': f" ---> output line {index}\n"})
+        if engine.latency:
+            time.sleep(engine.latency)
+        
+        if engine.fail_builds:
+            self._event({'errorDetail': {'message': 'build failed'}, 'error': 'build failed'})
+            self._end_stream()
+            return
+        
+        tags = params.get('t', [])
+        seed = hashlib.sha256(body + json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+        image = engine._store_image(tags, seed)
+        self._event({'aux': {'ID': image['Id']}})
+        self._event({'stream': f"Successfully built {image['Id'].split(':')[1][:12]}\n"})
+        for tag in tags:
+            self._event({'stream': f"Successfully tagged {tag}\n"})
+        self._end_stream()
+    
+    def _build_buildkit(self, params: Dict[str, List[str]], body: bytes, instructions: List[str]):
+        engine = self.engine
+        delay = engine.latency / max(len(instructions), 1)
+        for index, line in enumerate(instructions):
+            digest = 'sha256:' + hashlib.sha256(f"{index}:{line}".encode('utf-8')).hexdigest()
+            name = f"[{index + 1}/{len(instructions)}] {line}"
+            started = time.time()
+            vertex = _protobuf_field(1, digest) + _protobuf_field(3, name)
+            self._event(_buildkit_trace(vertexes=[vertex + _protobuf_field(5, _protobuf_timestamp(started))]))
+            if index == 0:
+                status = (_protobuf_field(1, 'transferring context') + _protobuf_field(2, digest) +
+                          _protobuf_field(4, len(body)) + _protobuf_field(5, len(body)))
+                self._event(_buildkit_trace(statuses=[status]))
+            for output in range(engine.output_lines if index == len(instructions) - 1 else 0):
+                log = (_protobuf_field(1, digest) + _protobuf_field(3, 1) +
+                       _protobuf_field(4, f"output line {output}\n"))
+                self._event(_buildkit_trace(logs=[log]))
+            if delay:
+                time.sleep(delay)
+            completed = vertex + _protobuf_field(5, _protobuf_timestamp(started))
+            completed += _protobuf_field(6, _protobuf_timestamp(time.time()))
+            if engine.fail_builds and index == len(instructions) - 1:
+                completed += _protobuf_field(7, 'build failed')
+            self._event(_buildkit_trace(vertexes=[completed]))
+        
+        if engine.fail_builds:
+            self._event({'errorDetail': {'message': 'build failed'}, 'error': 'build failed'})
+            self._end_stream()
+            return
+        
+        tags = params.get('t', [])
+        seed = hashlib.sha256(body + json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+        image = engine._store_image(tags, seed)
+        self._event({'id': 'moby.image.id', 'aux': {'ID': image['Id']}})
+        self._end_stream()
+    
+    def _push(self, name: str, tag: str):
+        engine = self.engine
+        reference = f"{name}:{tag}"
+        with engine._lock:
+            image = engine.images.get(reference)
+        
+        if engine.credentials is not None:
+            try:
+                auth = json.loads(base64.urlsafe_b64decode(self.headers.get('X-Registry-Auth', '')) or b'{}')
+            except ValueError:
+                auth = {}
+            if not self._authorized(auth.get('username'), auth.get('password')):
+                self._start_stream()
+                self._event({'status': f"The push refers to repository [{name}]"})
+                self._event({'errorDetail': {'message': 'unauthorized: authentication required'},
+                             'error': 'unauthorized: authentication required'})
+                self._end_stream()
+                return
+        
+        self._start_stream()
+        self._event({'status': f"The push refers to repository [{name}]"})
+        if image is None:
+            self._event({'errorDetail': {'message': f"An image does not exist locally with the tag: {name}"},
+                         'error': f"An image does not exist locally with the tag: {name}"})
+            self._end_stream()
+            return
+        
+        if engine.latency:
+            time.sleep(engine.latency)
+        for layer in reversed(image['RootFS']['Layers']):
+            short_id = layer.split(':')[1][:12]
+            self._event({'status': 'Preparing', 'progressDetail': {}, 'id': short_id})
+            with engine._lock:
+                exists = (name, layer) in engine.pushed_layers
+                engine.pushed_layers.add((name, layer))
+            if exists:
+                self._event({'status': 'Layer already exists', 'progressDetail': {}, 'id': short_id})
+            else:
+                self._event({'status': 'Pushing', 'progressDetail': {'current': 512, 'total': 1024},
+                             'progress': '[=====>     ]', 'id': short_id})
+                self._event({'status': 'Pushed', 'progressDetail': {}, 'id': short_id})
+        
+        digest = 'sha256:' + hashlib.sha256(f"{image['Id']}:{name}".encode('utf-8')).hexdigest()
+        self._event({'status': f"{tag}: digest: {digest} size: 528"})
+        self._event({'progressDetail': {}, 'aux': {'Tag': tag, 'Digest': digest, 'Size': 528}})
+        self._end_stream()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Fake Kubernetes API - In-process Kubernetes API server for tests and benchmarks
+
+This module serves namespaces, deployments and services over HTTP the way
+the Kubernetes API server does, including list resource versions and
+`?watch=true` event streams, so the informer cache can be exercised without
+a cluster.
+"""
+
+import json
+import queue
+import threading
+import socketserver
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+# API paths of the served resource kinds
+RESOURCE_PATHS = {
+    'Deployment': ('/apis/apps/v1', 'deployments'),
+    'Service': ('/api/v1', 'services')
+}
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FakeKubeAPI:
+    """
+    Fake Kubernetes API server on a local TCP port.
+    
+    Usage:
+        with FakeKubeAPI() as api:
+            api.put('Deployment', 'singularity-system', deployment)
+            # point a kubeconfig or client Configuration at api.url
+    """
+    
+    def __init__(self, namespaces: Optional[List[str]] = None):
+        """
+        Initialize the fake API server.
+        
+        Args:
+            namespaces: Namespaces that exist initially
+        """
+        self.namespaces = set(namespaces or ['default'])
+        self.objects: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.resource_version = 1
+        self.requests: List[str] = []
+        self._watchers: List[Tuple[str, str, queue.Queue]] = []
+        self._lock = threading.Lock()
+        self._server = None
+        self.url = None
+    
+    def __enter__(self) -> 'FakeKubeAPI':
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def start(self):
+        """Start serving on an ephemeral port in a background thread."""
+        class Handler(_KubeHandler):
+            pass
+        Handler.api = self
+        
+        self._server = _Server(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+    
+    def stop(self):
+        """Stop serving and end open watches."""
+        with self._lock:
+            for _, _, events in self._watchers:
+                events.put(None)
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def _notify(self, event_type: str, kind: str, namespace: str, obj: Dict[str, Any]):
+        for watch_kind, watch_namespace, events in self._watchers:
+            if watch_kind == kind and watch_namespace == namespace:
+                events.put({'type': event_type, 'object': obj})
+    
+    def put(self, kind: str, namespace: str, obj: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create or replace an object, notifying watchers.
+        
+        Args:
+            kind: Resource kind (Deployment or Service)
+            namespace: Namespace of the object
+            obj: Object with at least metadata.name
+        
+        Returns:
+            Stored object including its new resource version
+        """
+        with self._lock:
+            self.namespaces.add(namespace)
+            self.resource_version += 1
+            obj = json.loads(json.dumps(obj))
+            obj['kind'] = kind
+            metadata = obj.setdefault('metadata', {})
+            metadata['namespace'] = namespace
+            metadata['resourceVersion'] = str(self.resource_version)
+            key = (kind, namespace, metadata['name'])
+            event_type = 'MODIFIED' if key in self.objects else 'ADDED'
+            self.objects[key] = obj
+            self._notify(event_type, kind, namespace, obj)
+            return obj
+    
+    def delete(self, kind: str, namespace: str, name: str) -> bool:
+        """
+        Delete an object, notifying watchers.
+        
+        Args:
+            kind: Resource kind
+            namespace: Namespace of the object
+            name: Object name
+        
+        Returns:
+            True if the object existed
+        """
+        with self._lock:
+            obj = self.objects.pop((kind, namespace, name), None)
+            if obj is None:
+                return False
+            self.resource_version += 1
+            obj['metadata']['resourceVersion'] = str(self.resource_version)
+            self._notify('DELETED', kind, namespace, obj)
+            return True
+    
+    def disconnect_watches(self):
+        """End open watches as if the connection had been dropped, without an error event."""
+        with self._lock:
+            for _, _, events in self._watchers:
+                events.put(None)
+    
+    def watch_count(self) -> int:
+        """Number of open watch requests."""
+        with self._lock:
+            return len(self._watchers)
+    
+    def expire_watches(self):
+        """End open watches with a 410 Gone error, forcing clients to relist."""
+        with self._lock:
+            for _, _, events in self._watchers:
+                events.put({'type': 'ERROR', 'object': {
+                    'kind': 'Status', 'status': 'Failure', 'code': 410, 'reason': 'Expired',
+                    'message': 'too old resource version'
+                }})
+
+
+class _KubeHandler(BaseHTTPRequestHandler):
+    """Request handler serving the fake Kubernetes API."""
+    
+    protocol_version = 'HTTP/1.1'
+    api: FakeKubeAPI = None
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send_json(self, status: int, data: Any):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _not_found(self, message: str):
+        self._send_json(404, {'kind': 'Status', 'apiVersion': 'v1', 'status': 'Failure',
+                              'reason': 'NotFound', 'code': 404, 'message': message})
+    
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        params = urllib.parse.parse_qs(parsed.query)
+        parts = parsed.path.strip('/').split('/')
+        self.api.requests.append(f"GET {parsed.path}{'?watch' if 'watch' in params else ''}")
+        
+        # /api/v1/namespaces/<name>
+        if len(parts) == 4 and parts[:3] == ['api', 'v1', 'namespaces']:
+            if parts[3] in self.api.namespaces:
+                self._send_json(200, {'kind': 'Namespace', 'apiVersion': 'v1', 'metadata': {'name': parts[3]}})
+            else:
+                self._not_found(f'namespaces "{parts[3]}" not found')
+            return
+        
+        for kind, (prefix, plural) in RESOURCE_PATHS.items():
+            prefix_parts = prefix.strip('/').split('/')
+            if parts[:-3] == prefix_parts and parts[-3] == 'namespaces' and parts[-1] == plural:
+                namespace = parts[-2]
+                if params.get('watch', ['false'])[0] in ('true', '1'):
+                    self._watch(kind, namespace, params)
+                else:
+                    self._list(kind, namespace)
+                return
+        
+        self._not_found('the server could not find the requested resource')
+    
+    def _list(self, kind: str, namespace: str):
+        with self.api._lock:
+            items = [obj for (obj_kind, obj_namespace, _), obj in sorted(self.api.objects.items())
+                     if obj_kind == kind and obj_namespace == namespace]
+            resource_version = str(self.api.resource_version)
+        self._send_json(200, {
+            'kind': f"{kind}List",
+            'apiVersion': 'v1',
+            'metadata': {'resourceVersion': resource_version},
+            'items': items
+        })
+    
+    def _watch(self, kind: str, namespace: str, params: Dict[str, List[str]]):
+        timeout = float(params.get('timeoutSeconds', ['300'])[0])
+        events = queue.Queue()
+        with self.api._lock:
+            since = int(params.get('resourceVersion', ['0'])[0] or 0)
+            # Replay objects changed after the requested version (deletions are not replayed)
+            for (obj_kind, obj_namespace, _), obj in sorted(self.api.objects.items()):
+                if obj_kind == kind and obj_namespace == namespace and \
+                        int(obj['metadata']['resourceVersion']) > since:
+                    events.put({'type': 'MODIFIED', 'object': obj})
+            watcher = (kind, namespace, events)
+            self.api._watchers.append(watcher)
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if event is None:
+                    break
+                data = (json.dumps(event) + '\n').encode('utf-8')
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+                self.wfile.flush()
+                if event['type'] == 'ERROR':
+                    break
+            self.wfile.write(b'0\r\n\r\n')
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self.api._lock:
+                self.api._watchers.remove(watcher)
@@ -10,16 +10,28 @@ import os
 import sys
 import json
 import uuid
+import time
 import logging
 import datetime
 import threading
 import http.server
 import socketserver
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 
 # Import Genesis Builder
 from genesis_builder import GenesisBuilder
+from build_scheduler import SUCCESS_STATUSES
+from config_manager import ConfigManager, ConfigSnapshot
+from keyed_lock import KeyedLock
+from job_queue import (JobQueue, QueueFullError, PRIORITY_BUILD,
+                       PRIORITY_DEPLOY, PRIORITY_BUILD_AND_DEPLOY)
+from operation_store import create_operation_store, FINISHED_STATES
+from log_stream import LogBuffer, LogBufferRegistry
+from event_bus import EventBus
+from singleflight import SingleFlight, InFlightRegistry
+import metrics
+from async_server import run_async_server
 
 # Configure logging
 logging.basicConfig(
@@ -31,12 +43,207 @@ logging.basicConfig(
 )
 logger = logging.getLogger('genesis_api')
 
-# Global instance of Genesis Builder
-genesis_builder = GenesisBuilder()
-# Lock for thread safety during operations
-builder_lock = threading.Lock()
-# Store ongoing operations
-operations = {}
+# Configuration, reloaded while the server runs when the file changes
+config_manager = ConfigManager(default_config=GenesisBuilder._default_config,
+                               poll_interval=float(os.environ.get('GENESIS_CONFIG_POLL_INTERVAL', 2)))
+# Global instance of Genesis Builder, created on first use (see _get_builder) and replaced
+# on configuration changes; operations bind the instance once when they start
+genesis_builder: Optional[GenesisBuilder] = None
+_builder_lock = threading.Lock()
+# Per-component locks for builds; status reads take no lock. Only configured
+# components are locked, so their names are safe as metric labels
+component_locks = KeyedLock('component')
+# Per-cloud-provider locks for deploys (one kustomize tree per provider)
+deploy_locks = KeyedLock('deploy', label_keys=False)
+# Store ongoing operations (bounded, persisted per GENESIS_OPERATION_STORE)
+operations = create_operation_store()
+# Live output of running and recently finished operations
+log_buffers = LogBufferRegistry(max_lines=int(os.environ.get('GENESIS_LOG_BUFFER_LINES', 5000)))
+# Seconds between keep-alive comments on idle log streams
+LOG_STREAM_HEARTBEAT = 15
+# Stored log holding the offset of the first line of the stored output
+LOG_OFFSET_KEY = 'output_offset'
+# Operation state transitions and progress updates for long-poll and event stream clients
+events = EventBus(max_events=int(os.environ.get('GENESIS_EVENT_HISTORY', 1000)))
+# Upper bound for `?wait=` on operation status requests, in seconds
+MAX_LONG_POLL = 60
+# Concurrent identical status queries share one backend call
+status_flights = SingleFlight('status')
+# Queued build operations by (component, force); duplicate build requests attach to them
+build_flights = InFlightRegistry('build')
+
+
+def _update_operation(operation_id: str, **fields: Any) -> bool:
+    """
+    Update an operation and publish the change on the event bus.
+    
+    Updates setting `status` are published as `state` events, all other
+    updates as `progress` events.
+    
+    Args:
+        operation_id: ID of operation
+        **fields: Fields to set
+    
+    Returns:
+        True if the operation exists
+    """
+    if not operations.update(operation_id, **fields):
+        return False
+    operation = operations.get(operation_id) or {}
+    events.publish(
+        'state' if 'status' in fields else 'progress',
+        operation_id=operation_id,
+        operation_type=operation.get('type'),
+        status=operation.get('status'),
+        changed=sorted(fields)
+    )
+    return True
+
+
+def _parse_time(value: str) -> float:
+    """
+    Parse a query time given as seconds since the epoch or ISO 8601 timestamp.
+    
+    Args:
+        value: Query parameter value
+    
+    Returns:
+        Seconds since the epoch
+    
+    Raises:
+        ValueError: If the value is neither
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def _get_builder() -> GenesisBuilder:
+    """
+    Get the Genesis Builder, creating it on first use.
+    
+    Returns:
+        Builder using the configuration in effect
+    """
+    global genesis_builder
+    builder = genesis_builder
+    if builder is None:
+        with _builder_lock:
+            if genesis_builder is None:
+                genesis_builder = GenesisBuilder(config=config_manager.current.config)
+            builder = genesis_builder
+    return builder
+
+
+# Set once the builder and its clients are created; until then /ready answers 503
+_ready = threading.Event()
+_warm_up_started = threading.Event()
+_warm_up_error: Optional[str] = None
+
+
+def _warm_up():
+    """Create the builder and its clients, then mark the API ready."""
+    global _warm_up_error
+    started = time.monotonic()
+    try:
+        _get_builder().warm_up()
+    except Exception as e:
+        logger.error(f"Warm-up failed: {str(e)}")
+        _warm_up_error = str(e)
+        # The next readiness request retries
+        _warm_up_started.clear()
+        return
+    _warm_up_error = None
+    _ready.set()
+    logger.info(f"Genesis API ready after {time.monotonic() - started:.3f}s warm-up")
+
+
+def _start_warm_up():
+    """Start warming up in a background thread, once."""
+    if not _warm_up_started.is_set():
+        _warm_up_started.set()
+        threading.Thread(target=_warm_up, name='genesis-warm-up', daemon=True).start()
+
+
+def _apply_config(snapshot: ConfigSnapshot):
+    """
+    Switch to a builder using a new configuration snapshot.
+    
+    Args:
+        snapshot: Validated configuration snapshot
+    """
+    global genesis_builder
+    with _builder_lock:
+        if genesis_builder is None:
+            genesis_builder = GenesisBuilder(config=snapshot.config)
+        else:
+            genesis_builder = genesis_builder.with_config(snapshot.config)
+
+
+config_manager.on_change(_apply_config)
+
+
+def _operation_active(operation_id: str) -> bool:
+    """
+    Check whether an operation exists and has not finished.
+    
+    Args:
+        operation_id: ID of operation
+    
+    Returns:
+        True if the operation is queued or running
+    """
+    operation = operations.get(operation_id)
+    return operation is not None and operation.get('status') not in FINISHED_STATES
+
+
+def _set_operation_state(operation_id: str, state: str):
+    """
+    Record a job state transition reported by the job queue.
+    
+    Args:
+        operation_id: ID of operation
+        state: New state of the operation
+    """
+    _update_operation(operation_id, status=state)
+
+
+# Bounded worker pool executing build and deploy operations
+job_queue = JobQueue(
+    workers=int(os.environ.get('GENESIS_API_WORKERS', 4)),
+    max_size=int(os.environ.get('GENESIS_API_QUEUE_SIZE', 32)),
+    on_state=_set_operation_state
+)
+metrics.QUEUE_DEPTH.set_function(job_queue.depth)
+metrics.RUNNING_OPERATIONS.set_function(job_queue.running)
+metrics.OPERATIONS_STORED.set_function(lambda: len(operations))
+
+
+def _route_label(path: str) -> str:
+    """
+    Map a request path to its route, replacing operation IDs with a placeholder.
+    
+    Args:
+        path: Request path without query string
+    
+    Returns:
+        Route used as metrics label
+    """
+    if path.startswith('/api/operations/'):
+        for suffix in ('/logs', '/profile'):
+            if path.endswith(suffix):
+                return '/api/operations/{id}' + suffix
+        return '/api/operations/{id}'
+    if path.startswith('/api/components/') and path.endswith('/profiles'):
+        return '/api/components/{name}/profiles'
+    if path.startswith('/api/builds/'):
+        return '/api/builds/{id}'
+    if path in ('/health', '/ready', '/api/status', '/api/events', '/api/components', '/api/kubernetes',
+                '/metrics', '/api/config', '/api/builds',
+                '/api/build', '/api/deploy', '/api/build-and-deploy', '/api/rollback', '/api/config/reload'):
+        return path
+    return 'unknown'
 
 
 class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
@@ -46,15 +253,77 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
     Provides endpoints for build and deploy operations.
     """
     
+    def is_long_lived(self) -> bool:
+        """
+        Check whether the request may stay open for long (event and log streams, long polls).
+        
+        The asyncio server runs such requests outside its request pool.
+        
+        Returns:
+            True for streaming and long-poll requests
+        """
+        if self.command != 'GET':
+            return False
+        parsed_url = urlparse(self.path)
+        path, query = parsed_url.path, parse_qs(parsed_url.query)
+        if path == '/api/events':
+            return True
+        if path.startswith('/api/operations/') and path.endswith('/logs'):
+            return query.get('follow', ['false'])[0].lower() in ('1', 'true', 'yes') or \
+                'text/event-stream' in self.headers.get('Accept', '')
+        if path.startswith('/api/operations/') and 'wait' in query:
+            try:
+                return float(query['wait'][0]) > 0
+            except ValueError:
+                return False
+        return False
+    
+    def send_response(self, code: int, message: Optional[str] = None):
+        """Send the response status line, remembering the status for metrics."""
+        self._response_status = code
+        super().send_response(code, message)
+    
+    def _observe_request(self, started: float):
+        """
+        Record the duration of the current request.
+        
+        Args:
+            started: Monotonic time the request started at
+        """
+        metrics.HTTP_REQUEST_DURATION.labels(
+            self.command, _route_label(urlparse(self.path).path), str(getattr(self, '_response_status', 0))
+        ).observe(time.monotonic() - started)
+    
     def do_GET(self):
         """Handle GET requests for status checks."""
+        started = time.monotonic()
         try:
             parsed_url = urlparse(self.path)
             path = parsed_url.path
             
+            # Liveness endpoint
+            if path == '/health':
+                self._send_json_response(200, {'status': 'alive'})
+            # Readiness endpoint
+            elif path == '/ready':
+                self._handle_ready()
             # Status endpoint
-            if path == '/api/status':
+            elif path == '/api/status':
                 self._handle_status()
+            # Prometheus metrics endpoint
+            elif path == '/metrics':
+                self._handle_metrics()
+            # Operation event stream endpoint
+            elif path == '/api/events':
+                self._handle_events()
+            # Operation logs endpoint
+            elif path.startswith('/api/operations/') and path.endswith('/logs'):
+                operation_id = path.split('/')[-2]
+                self._handle_operation_logs(operation_id)
+            # Operation build profile endpoint
+            elif path.startswith('/api/operations/') and path.endswith('/profile'):
+                operation_id = path.split('/')[-2]
+                self._handle_operation_profile(operation_id)
             # Operation status endpoint
             elif path.startswith('/api/operations/'):
                 operation_id = path.split('/')[-1]
@@ -62,18 +331,33 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
             # Component status endpoint
             elif path == '/api/components':
                 self._handle_component_status()
+            # Component build profiles endpoint
+            elif path.startswith('/api/components/') and path.endswith('/profiles'):
+                component_name = path.split('/')[-2]
+                self._handle_build_profiles(component_name)
+            # Build history endpoints
+            elif path == '/api/builds':
+                self._handle_builds()
+            elif path.startswith('/api/builds/'):
+                self._handle_build_entry(path.split('/')[-1])
             # Kubernetes status endpoint
             elif path == '/api/kubernetes':
                 self._handle_kubernetes_status()
+            # Configuration version endpoint
+            elif path == '/api/config':
+                self._handle_config()
             # Unknown endpoint
             else:
                 self._send_error(404, "Not Found")
         except Exception as e:
             logger.error(f"Error handling GET request: {str(e)}")
             self._send_error(500, f"Internal Server Error: {str(e)}")
+        finally:
+            self._observe_request(started)
     
     def do_POST(self):
         """Handle POST requests for operations."""
+        started = time.monotonic()
         try:
             parsed_url = urlparse(self.path)
             path = parsed_url.path
@@ -93,6 +377,12 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
             # Build and deploy endpoint
             elif path == '/api/build-and-deploy':
                 self._handle_build_and_deploy(request_data)
+            # Rollback endpoint
+            elif path == '/api/rollback':
+                self._handle_rollback(request_data)
+            # Configuration reload endpoint
+            elif path == '/api/config/reload':
+                self._handle_config_reload()
             # Unknown endpoint
             else:
                 self._send_error(404, "Not Found")
@@ -101,6 +391,8 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
         except Exception as e:
             logger.error(f"Error handling POST request: {str(e)}")
             self._send_error(500, f"Internal Server Error: {str(e)}")
+        finally:
+            self._observe_request(started)
     
     def _handle_status(self):
         """Handle status request."""
@@ -108,43 +400,361 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
             'status': 'running',
             'version': '0.1.0',
             'timestamp': datetime.datetime.now().isoformat(),
-            'operations': len(operations)
+            'operations': len(operations),
+            'queue': job_queue.stats()
         }
         self._send_json_response(200, status)
     
+    def _handle_ready(self):
+        """
+        Handle readiness request.
+        
+        Answers 503 until the builder and its clients are created; the first
+        request starts the warm-up if the server did not.
+        """
+        _start_warm_up()
+        if not _ready.is_set():
+            self._send_json_response(503, {'status': 'starting', 'error': _warm_up_error})
+            return
+        self._send_json_response(200, {
+            'status': 'ready',
+            'config_version': config_manager.current.version,
+            'queue': job_queue.stats()
+        })
+    
+    def _handle_config(self):
+        """Handle configuration request, describing the configuration version in effect."""
+        self._send_json_response(200, dict(config_manager.current.describe(), last_error=config_manager.last_error))
+    
+    def _handle_config_reload(self):
+        """Handle configuration reload request, answering 400 if the file is rejected."""
+        result = config_manager.reload()
+        self._send_json_response(400 if result['status'] == 'error' else 200, result)
+    
+    def _handle_metrics(self):
+        """Handle Prometheus metrics request."""
+        if not metrics.PROMETHEUS_AVAILABLE:
+            self._send_error(503, "Metrics unavailable: prometheus_client is not installed")
+            return
+        
+        body = metrics.render()
+        self.send_response(200)
+        self.send_header('Content-Type', metrics.CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
     def _handle_operation_status(self, operation_id: str):
         """
         Handle operation status request.
         
+        With `?wait=<seconds>` the request is held until the operation's
+        status differs from the status at request time (or from `?status=`,
+        the status the client saw last) or the wait times out, and the
+        operation is returned either way.
+        
         Args:
             operation_id: ID of operation to check
         """
-        if operation_id in operations:
-            self._send_json_response(200, operations[operation_id])
-        else:
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            wait = min(max(float(query.get('wait', ['0'])[0]), 0), MAX_LONG_POLL)
+        except ValueError:
+            self._send_error(400, "Invalid wait time")
+            return
+        
+        # Take the event cursor before reading the operation so no transition is missed
+        cursor = events.last_id
+        operation = operations.get(operation_id)
+        if operation is None:
             self._send_error(404, f"Operation {operation_id} not found")
+            return
+        
+        seen_status = query.get('status', [operation.get('status')])[0]
+        if wait and operation.get('status') == seen_status and seen_status not in FINISHED_STATES:
+            deadline = time.monotonic() + wait
+            changed = False
+            while not changed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not events.wait(cursor, timeout=remaining):
+                    break
+                new_events, cursor = events.read(
+                    cursor, lambda event: event['operation_id'] == operation_id and event['event'] == 'state'
+                )
+                changed = any(event['status'] != seen_status for event in new_events)
+            operation = operations.get(operation_id) or operation
+        
+        self._send_json_response(200, operation)
+    
+    def _handle_events(self):
+        """
+        Handle operation event stream request.
+        
+        Streams operation events as Server-Sent Events. The stream can be
+        narrowed with `?operations=<id>,<id>`, `?type=<operation type>` and
+        `?events=state` (state transitions only). When specific operations
+        are requested the stream ends once all of them have finished.
+        Clients resume with the standard `Last-Event-ID` header.
+        """
+        query = parse_qs(urlparse(self.path).query)
+        operation_ids = {op_id for value in query.get('operations', []) for op_id in value.split(',') if op_id}
+        operation_types = {op_type for value in query.get('type', []) for op_type in value.split(',') if op_type}
+        event_types = {event for value in query.get('events', []) for event in value.split(',') if event}
+        try:
+            cursor = int(self.headers['Last-Event-ID']) if self.headers.get('Last-Event-ID') else events.last_id
+        except ValueError:
+            self._send_error(400, "Invalid Last-Event-ID")
+            return
+        
+        def matches(event: Dict[str, Any]) -> bool:
+            return (not operation_ids or event['operation_id'] in operation_ids) and \
+                (not operation_types or event['operation_type'] in operation_types) and \
+                (not event_types or event['event'] in event_types)
+        
+        # Operations that already finished (or do not exist) will not produce more events
+        pending = set()
+        for operation_id in operation_ids:
+            operation = operations.get(operation_id)
+            if operation is not None and operation.get('status') not in FINISHED_STATES:
+                pending.add(operation_id)
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        # The stream has no length, so it ends with the connection
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        
+        try:
+            while not operation_ids or pending:
+                if not events.wait(cursor, timeout=LOG_STREAM_HEARTBEAT):
+                    self.wfile.write(b': keep-alive\n\n')
+                    self.wfile.flush()
+                    continue
+                new_events, cursor = events.read(cursor, matches)
+                for event in new_events:
+                    if event['event'] == 'state' and event['status'] in FINISHED_STATES:
+                        pending.discard(event['operation_id'])
+                if new_events:
+                    self.wfile.write(''.join(
+                        f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+                        for event in new_events
+                    ).encode('utf-8'))
+                    self.wfile.flush()
+            
+            self.wfile.write(f"event: end\ndata: {json.dumps({'last_event_id': cursor})}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Event stream client disconnected")
+    
+    def _handle_operation_logs(self, operation_id: str):
+        """
+        Handle operation logs request.
+        
+        Returns buffered output lines starting at `?offset=` as JSON, or
+        streams them as Server-Sent Events when the client accepts
+        `text/event-stream` or passes `?follow=true`. SSE clients resume with
+        the standard `Last-Event-ID` header.
+        
+        Args:
+            operation_id: ID of operation whose logs to return
+        """
+        if operation_id not in operations:
+            self._send_error(404, f"Operation {operation_id} not found")
+            return
+        
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            if 'offset' in query:
+                offset = int(query['offset'][0])
+            elif self.headers.get('Last-Event-ID'):
+                offset = int(self.headers['Last-Event-ID']) + 1
+            else:
+                offset = 0
+        except ValueError:
+            self._send_error(400, "Invalid log offset")
+            return
+        
+        stored_logs = None
+        log_buffer = log_buffers.get(operation_id)
+        if log_buffer is None:
+            # Operation finished a while ago (or before a restart), serve stored output
+            stored_logs = operations.get_logs(operation_id)
+            try:
+                start = int(stored_logs.pop(LOG_OFFSET_KEY, 0))
+            except ValueError:
+                start = 0
+            log_buffer = LogBuffer.from_text(stored_logs.pop('output', ''), log_buffers.max_lines, start)
+        
+        follow = query.get('follow', ['false'])[0].lower() in ('1', 'true', 'yes')
+        if follow or 'text/event-stream' in self.headers.get('Accept', ''):
+            self._stream_logs(log_buffer, offset)
+            return
+        
+        if stored_logs is None:
+            stored_logs = operations.get_logs(operation_id)
+            stored_logs.pop('output', None)
+            stored_logs.pop(LOG_OFFSET_KEY, None)
+        
+        offset, lines, next_offset = log_buffer.read(offset)
+        self._send_json_response(200, {
+            'operation_id': operation_id,
+            'offset': offset,
+            'next_offset': next_offset,
+            'complete': log_buffer.closed,
+            'lines': lines,
+            'logs': stored_logs
+        })
+    
+    def _stream_logs(self, log_buffer: LogBuffer, offset: int):
+        """
+        Stream log lines as Server-Sent Events until the operation finishes.
+        
+        Args:
+            log_buffer: Log buffer to stream
+            offset: Offset of the first line to send
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        # The stream has no length, so it ends with the connection
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        
+        try:
+            while True:
+                # Check for completion before reading so no final lines are missed
+                closed = log_buffer.closed
+                first, lines, offset = log_buffer.read(offset)
+                events = [f"id: {first + index}\ndata: {line}\n\n" for index, line in enumerate(lines)]
+                if events:
+                    self.wfile.write(''.join(events).encode('utf-8'))
+                    self.wfile.flush()
+                elif closed:
+                    break
+                elif not log_buffer.wait(offset, timeout=LOG_STREAM_HEARTBEAT):
+                    self.wfile.write(b': keep-alive\n\n')
+                    self.wfile.flush()
+            
+            self.wfile.write(f"event: end\ndata: {json.dumps({'next_offset': offset})}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Log stream client disconnected")
     
     def _handle_component_status(self):
         """Handle component status request."""
-        with builder_lock:
-            status = genesis_builder.get_component_status()
+        status, _ = status_flights.do('components', _get_builder().get_component_status)
         self._send_json_response(200, status)
     
+    def _handle_build_profiles(self, component_name: str):
+        """
+        Handle build profiles request.
+        
+        Returns recent per-step build timelines of a component (`?limit=`,
+        default 10), with the latest compared to the build before it.
+        
+        Args:
+            component_name: Name of component
+        """
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            limit = int(query.get('limit', ['10'])[0])
+        except ValueError:
+            self._send_error(400, "Invalid limit")
+            return
+        
+        result = _get_builder().get_build_profiles(component_name, limit=max(1, limit))
+        if result.get('status') != 'success':
+            self._send_error(404, result.get('message', 'Not Found'))
+            return
+        self._send_json_response(200, result)
+    
+    def _handle_builds(self):
+        """
+        Handle build history request.
+        
+        Returns ledger entries, most recent first, filtered by the query
+        parameters `component`, `status`, `digest`, `since` and `until`
+        (seconds since the epoch or ISO 8601), limited by `limit` (default 50).
+        """
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            limit = int(query.get('limit', ['50'])[0])
+            since, until = (_parse_time(query[key][0]) if key in query else None for key in ('since', 'until'))
+        except ValueError as e:
+            self._send_error(400, f"Invalid query: {str(e)}")
+            return
+        
+        result = _get_builder().get_builds(
+            query.get('component', [None])[0], status=query.get('status', [None])[0], since=since, until=until,
+            digest=query.get('digest', [None])[0], limit=max(1, limit)
+        )
+        self._send_json_response(200, result)
+    
+    def _handle_build_entry(self, build_id: str):
+        """
+        Handle build ledger entry request.
+        
+        Args:
+            build_id: Ledger ID of the build
+        """
+        build = _get_builder().build_ledger.get(int(build_id)) if build_id.isdigit() else None
+        if build is None:
+            self._send_error(404, f"Build {build_id} not found")
+            return
+        self._send_json_response(200, build)
+    
+    def _handle_operation_profile(self, operation_id: str):
+        """
+        Handle operation build profile request.
+        
+        Returns the build timeline of every component built by the operation,
+        each compared to the previous build of that component.
+        
+        Args:
+            operation_id: ID of operation
+        """
+        operation = operations.get(operation_id)
+        if operation is None:
+            self._send_error(404, f"Operation {operation_id} not found")
+            return
+        
+        if operation.get('type') == 'build':
+            results = {operation.get('component'): operation.get('result') or {}}
+        else:
+            results = operation.get('build_results') or {}
+        
+        profiles = {}
+        for component_name, result in results.items():
+            profile = result.get('profile') if isinstance(result, dict) else None
+            if profile:
+                profiles[component_name] = {
+                    'profile': profile,
+                    'comparison': _get_builder().compare_build_profile(component_name, profile)
+                }
+        self._send_json_response(200, {'operation_id': operation_id, 'profiles': profiles})
+    
     def _handle_kubernetes_status(self):
         """Handle Kubernetes status request."""
         query = parse_qs(urlparse(self.path).query)
         namespace = query.get('namespace', [None])[0]
         
-        with builder_lock:
-            status = genesis_builder.get_kubernetes_status(namespace)
+        status, _ = status_flights.do(('kubernetes', namespace),
+                                      lambda: _get_builder().get_kubernetes_status(namespace))
         self._send_json_response(200, status)
     
     def _handle_build(self, request_data: Dict[str, Any]):
         """
         Handle build request.
         
+        A request for a component whose build (with the same `force` flag) is
+        queued and has not started yet attaches to that operation and gets its
+        ID. Builds of unchanged inputs are not repeated either way, see
+        GenesisBuilder.build_component.
+        
         Args:
-            request_data: Request data containing component to build
+            request_data: Request data containing component to build and
+                optional `force` flag to rebuild unchanged components
         """
         # Check if component specified
         if 'component' not in request_data:
@@ -152,24 +762,43 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
             return
         
         component_name = request_data['component']
+        force = bool(request_data.get('force', False))
+        if not isinstance(component_name, str) or component_name not in _get_builder().components:
+            self._send_error(400, f"Unknown component: {component_name}")
+            return
         operation_id = str(uuid.uuid4())
+        flight_key = (component_name, force)
         
         # Create operation entry
-        operations[operation_id] = {
+        operations.create({
             'id': operation_id,
             'type': 'build',
             'component': component_name,
-            'status': 'pending',
+            'force': force,
             'timestamp': datetime.datetime.now().isoformat()
-        }
+        })
         
-        # Start build in background thread
-        thread = threading.Thread(
-            target=self._run_build,
-            args=(operation_id, component_name)
-        )
-        thread.daemon = True
-        thread.start()
+        # Attach to a queued build of the component instead of queueing another one
+        owner = build_flights.claim(flight_key, operation_id, is_active=_operation_active)
+        if owner is not None:
+            operations.delete(operation_id)
+            logger.info(f"Build request for {component_name} attached to operation {owner}")
+            self._send_json_response(
+                202,
+                {
+                    'operation_id': owner,
+                    'status': (operations.get(owner) or {}).get('status', 'pending'),
+                    'attached': True,
+                    'message': f'Build of component {component_name} already in progress'
+                }
+            )
+            return
+        
+        # Queue build for the worker pool
+        if not self._submit_operation(operation_id, self._run_build, operation_id, component_name, force,
+                                      flight_key, priority=PRIORITY_BUILD):
+            build_flights.release(flight_key, operation_id)
+            return
         
         # Return operation ID
         self._send_json_response(
@@ -181,58 +810,81 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
             }
         )
     
-    def _run_build(self, operation_id: str, component_name: str):
+    def _run_build(self, operation_id: str, component_name: str, force: bool = False,
+                   flight_key: Optional[Tuple[str, bool]] = None):
         """
         Run build operation in background.
         
         Args:
             operation_id: ID of operation
             component_name: Name of component to build
+            force: Rebuild even if the build inputs are unchanged
+            flight_key: Key the operation claimed in build_flights, released when the build starts
         """
+        builder = _get_builder()
+        log_buffer = log_buffers.create(operation_id)
         try:
-            operations[operation_id]['status'] = 'running'
-            
             # Build component
-            with builder_lock:
-                result = genesis_builder.build_component(component_name)
+            with component_locks.lock(component_name):
+                # Later requests get a new operation, as they may see changed build inputs
+                if flight_key is not None:
+                    build_flights.release(flight_key, operation_id)
+                result = builder.build_component(component_name, log_sink=log_buffer.append, force=force)
             
             # Update operation with result
-            operations[operation_id]['status'] = 'completed' if result.get('status') == 'success' else 'failed'
-            operations[operation_id]['result'] = result
-            operations[operation_id]['completed_at'] = datetime.datetime.now().isoformat()
+            _update_operation(
+                operation_id,
+                status='completed' if result.get('status') in SUCCESS_STATUSES else 'failed',
+                result=result,
+                completed_at=datetime.datetime.now().isoformat()
+            )
         except Exception as e:
             logger.error(f"Error in build operation {operation_id}: {str(e)}")
-            operations[operation_id]['status'] = 'failed'
-            operations[operation_id]['error'] = str(e)
-            operations[operation_id]['completed_at'] = datetime.datetime.now().isoformat()
+            _update_operation(
+                operation_id,
+                status='failed',
+                error=str(e),
+                completed_at=datetime.datetime.now().isoformat()
+            )
+        finally:
+            self._finish_log(operation_id, log_buffer)
+            if flight_key is not None:
+                build_flights.release(flight_key, operation_id)
     
     def _handle_deploy(self, request_data: Dict[str, Any]):
         """
         Handle deploy request.
         
         Args:
-            request_data: Request data containing cloud provider
+            request_data: Request data containing cloud provider, optional list of
+                clusters with rollout strategy, and optional prune/force flags
         """
         # Get cloud provider with default
         cloud_provider = request_data.get('cloud_provider', 'vultr')
+        clusters = request_data.get('clusters')
+        strategy = request_data.get('strategy')
+        prune = request_data.get('prune')
+        force = bool(request_data.get('force', False))
+        if clusters is not None and (not isinstance(clusters, list) or not clusters):
+            self._send_error(400, "Field clusters must be a non-empty list")
+            return
         operation_id = str(uuid.uuid4())
         
         # Create operation entry
-        operations[operation_id] = {
+        operation = {
             'id': operation_id,
             'type': 'deploy',
             'cloud_provider': cloud_provider,
-            'status': 'pending',
             'timestamp': datetime.datetime.now().isoformat()
         }
+        if clusters:
+            operation.update(clusters=clusters, strategy=strategy)
+        operations.create(operation)
         
-        # Start deploy in background thread
-        thread = threading.Thread(
-            target=self._run_deploy,
-            args=(operation_id, cloud_provider)
-        )
-        thread.daemon = True
-        thread.start()
+        # Queue deploy for the worker pool
+        if not self._submit_operation(operation_id, self._run_deploy, operation_id, cloud_provider, prune, force,
+                                      clusters, strategy, priority=PRIORITY_DEPLOY):
+            return
         
         # Return operation ID
         self._send_json_response(
@@ -240,41 +892,62 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
             {
                 'operation_id': operation_id,
                 'status': 'pending',
-                'message': f'Deploying to {cloud_provider}'
+                'message': f"Deploying to {', '.join(clusters) if clusters else cloud_provider}"
             }
         )
     
-    def _run_deploy(self, operation_id: str, cloud_provider: str):
+    def _run_deploy(self, operation_id: str, cloud_provider: str, prune: Optional[bool] = None,
+                    force: bool = False, clusters: Optional[List[str]] = None, strategy: Optional[str] = None):
         """
         Run deploy operation in background.
         
         Args:
             operation_id: ID of operation
             cloud_provider: Cloud provider to deploy to
+            prune: Delete objects no longer rendered (None uses the configured default)
+            force: Apply all objects even if unchanged
+            clusters: Optional clusters to deploy to concurrently instead of the default one
+            strategy: Rollout strategy for multi-cluster deploys
         """
+        builder = _get_builder()
+        log_buffer = log_buffers.create(operation_id)
         try:
-            operations[operation_id]['status'] = 'running'
-            
-            # Deploy to Kubernetes
-            with builder_lock:
-                result = genesis_builder.deploy_to_kubernetes(cloud_provider)
+            if clusters:
+                result = self._deploy_clusters(builder, operation_id, clusters, cloud_provider, strategy,
+                                               log_buffer, prune=prune, force=force)
+            else:
+                # Deploy to Kubernetes
+                with deploy_locks.lock(cloud_provider):
+                    result = builder.deploy_to_kubernetes(cloud_provider, log_sink=log_buffer.append,
+                                                          prune=prune, force=force)
             
             # Update operation with result
-            operations[operation_id]['status'] = 'completed' if result.get('status') == 'success' else 'failed'
-            operations[operation_id]['result'] = result
-            operations[operation_id]['completed_at'] = datetime.datetime.now().isoformat()
+            _update_operation(
+                operation_id,
+                status='completed' if result.get('status') == 'success' else 'failed',
+                result=result,
+                completed_at=datetime.datetime.now().isoformat()
+            )
         except Exception as e:
             logger.error(f"Error in deploy operation {operation_id}: {str(e)}")
-            operations[operation_id]['status'] = 'failed'
-            operations[operation_id]['error'] = str(e)
-            operations[operation_id]['completed_at'] = datetime.datetime.now().isoformat()
+            _update_operation(
+                operation_id,
+                status='failed',
+                error=str(e),
+                completed_at=datetime.datetime.now().isoformat()
+            )
+        finally:
+            self._finish_log(operation_id, log_buffer)
     
     def _handle_build_and_deploy(self, request_data: Dict[str, Any]):
         """
         Handle build and deploy request.
         
         Args:
-            request_data: Request data containing components and cloud provider
+            request_data: Request data containing components, cloud provider or
+                clusters with rollout strategy, optional `force` flag to
+                rebuild unchanged components, and optional `mode` (`sequential`
+                or `pipelined`) with `on_failure` (`abort` or `continue`)
         """
         # Check if components specified
         if 'components' not in request_data:
@@ -283,25 +956,120 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
         
         components = request_data['components']
         cloud_provider = request_data.get('cloud_provider', 'vultr')
+        clusters = request_data.get('clusters')
+        strategy = request_data.get('strategy')
+        force = bool(request_data.get('force', False))
+        pipeline_config = _get_builder().config.get('pipeline') or {}
+        mode = request_data.get('mode') or pipeline_config.get('mode', 'sequential')
+        on_failure = request_data.get('on_failure') or pipeline_config.get('on_failure', 'abort')
+        if clusters is not None and (not isinstance(clusters, list) or not clusters):
+            self._send_error(400, "Field clusters must be a non-empty list")
+            return
+        if not isinstance(components, list) or not all(isinstance(name, str) for name in components):
+            self._send_error(400, "Field components must be a list of component names")
+            return
+        unknown = [name for name in components if name not in _get_builder().components]
+        if unknown:
+            self._send_error(400, f"Unknown components: {', '.join(unknown)}")
+            return
+        if mode not in ('sequential', 'pipelined'):
+            self._send_error(400, f"Unknown mode: {mode}")
+            return
+        if on_failure not in ('abort', 'continue'):
+            self._send_error(400, f"Unknown on_failure mode: {on_failure}")
+            return
         operation_id = str(uuid.uuid4())
         
         # Create operation entry
-        operations[operation_id] = {
+        operation = {
             'id': operation_id,
             'type': 'build_and_deploy',
             'components': components,
             'cloud_provider': cloud_provider,
-            'status': 'pending',
+            'force': force,
+            'mode': mode,
             'timestamp': datetime.datetime.now().isoformat()
         }
+        if clusters:
+            operation.update(clusters=clusters, strategy=strategy)
+        if mode == 'pipelined':
+            operation['on_failure'] = on_failure
+        operations.create(operation)
         
-        # Start build and deploy in background thread
-        thread = threading.Thread(
-            target=self._run_build_and_deploy,
-            args=(operation_id, components, cloud_provider)
+        # Queue build and deploy for the worker pool
+        if mode == 'pipelined':
+            submitted = self._submit_operation(operation_id, self._run_pipelined_build_and_deploy, operation_id,
+                                               components, force, clusters, on_failure,
+                                               priority=PRIORITY_BUILD_AND_DEPLOY)
+        else:
+            submitted = self._submit_operation(operation_id, self._run_build_and_deploy, operation_id, components,
+                                               cloud_provider, force, clusters, strategy,
+                                               priority=PRIORITY_BUILD_AND_DEPLOY)
+        if not submitted:
+            return
+        
+        # Return operation ID
+        target = ', '.join(clusters) if clusters else cloud_provider
+        self._send_json_response(
+            202,
+            {
+                'operation_id': operation_id,
+                'status': 'pending',
+                'message': f'Building {len(components)} components and deploying to {target}'
+            }
         )
-        thread.daemon = True
-        thread.start()
+    
+    def _handle_rollback(self, request_data: Dict[str, Any]):
+        """
+        Handle rollback request.
+        
+        The target build is resolved from the build ledger when the request
+        is received; the rollout itself is queued like a deploy.
+        
+        Args:
+            request_data: Request data containing component, optional `digest`
+                or `build_id` (defaults to the published build before the deployed one) and
+                optional list of clusters
+        """
+        if 'component' not in request_data:
+            self._send_error(400, "Missing required field: component")
+            return
+        
+        component_name = request_data['component']
+        clusters = request_data.get('clusters')
+        build_id = request_data.get('build_id')
+        if clusters is not None and (not isinstance(clusters, list) or not clusters):
+            self._send_error(400, "Field clusters must be a non-empty list")
+            return
+        if build_id is not None and (isinstance(build_id, bool) or not isinstance(build_id, int)):
+            self._send_error(400, "Field build_id must be an integer")
+            return
+        
+        target = _get_builder().resolve_rollback(component_name, digest=request_data.get('digest'),
+                                                 build_id=build_id, clusters=clusters)
+        if target.get('status') != 'success':
+            self._send_error(404, target.get('message', 'Not Found'))
+            return
+        build = target['build']
+        operation_id = str(uuid.uuid4())
+        
+        # Create operation entry
+        operation = {
+            'id': operation_id,
+            'type': 'rollback',
+            'component': component_name,
+            'build_id': build['id'],
+            'digest': build['digest'],
+            'timestamp': datetime.datetime.now().isoformat()
+        }
+        if clusters:
+            operation['clusters'] = clusters
+        operations.create(operation)
+        
+        # Queue rollout for the worker pool
+        if not self._submit_operation(operation_id, self._run_rollback, operation_id, component_name, build['id'],
+                                      clusters, priority=PRIORITY_DEPLOY):
+            return
         
         # Return operation ID
         self._send_json_response(
@@ -309,11 +1077,47 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
             {
                 'operation_id': operation_id,
                 'status': 'pending',
-                'message': f'Building {len(components)} components and deploying to {cloud_provider}'
+                'build': build,
+                'message': f"Rolling back {component_name} to {build['image']}@{build['digest']}"
             }
         )
     
-    def _run_build_and_deploy(self, operation_id: str, components: List[str], cloud_provider: str):
+    def _run_rollback(self, operation_id: str, component_name: str, build_id: int,
+                      clusters: Optional[List[str]] = None):
+        """
+        Run rollback operation in background.
+        
+        Args:
+            operation_id: ID of operation
+            component_name: Name of component to roll back
+            build_id: Ledger ID of the build to roll back to
+            clusters: Optional clusters to roll out to, defaults to the configured context
+        """
+        builder = _get_builder()
+        log_buffer = log_buffers.create(operation_id)
+        try:
+            result = builder.roll_back_component(component_name, build_id=build_id, clusters=clusters,
+                                                 log_sink=log_buffer.append)
+            
+            # Update operation with result
+            update = {'status': 'completed' if result.get('status') == 'success' else 'failed', 'result': result}
+            if result.get('status') != 'success':
+                update['error'] = result.get('message') or f"Failed to roll back {component_name}"
+            _update_operation(operation_id, completed_at=datetime.datetime.now().isoformat(), **update)
+        except Exception as e:
+            logger.error(f"Error in rollback operation {operation_id}: {str(e)}")
+            _update_operation(
+                operation_id,
+                status='failed',
+                error=str(e),
+                completed_at=datetime.datetime.now().isoformat()
+            )
+        finally:
+            self._finish_log(operation_id, log_buffer)
+    
+    def _run_build_and_deploy(self, operation_id: str, components: List[str], cloud_provider: str,
+                              force: bool = False, clusters: Optional[List[str]] = None,
+                              strategy: Optional[str] = None):
         """
         Run build and deploy operation in background.
         
@@ -321,47 +1125,179 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
             operation_id: ID of operation
             components: List of components to build
             cloud_provider: Cloud provider to deploy to
+            force: Rebuild components even if their build inputs are unchanged
+            clusters: Optional clusters to deploy to concurrently instead of the default one
+            strategy: Rollout strategy for multi-cluster deploys
         """
+        builder = _get_builder()
+        log_buffer = log_buffers.create(operation_id)
         try:
-            operations[operation_id]['status'] = 'running'
-            operations[operation_id]['build_results'] = {}
+            build_results = {}
+            _update_operation(operation_id, build_results={})
             
             # Build each component
             for component in components:
-                operations[operation_id]['current_component'] = component
+                _update_operation(operation_id, current_component=component)
                 
                 # Build component
-                with builder_lock:
-                    result = genesis_builder.build_component(component)
+                with component_locks.lock(component):
+                    result = builder.build_component(component, log_sink=log_buffer.append, force=force)
                 
-                operations[operation_id]['build_results'][component] = result
+                build_results[component] = result
+                _update_operation(operation_id, build_results=dict(build_results))
                 
                 # If build failed, abort
-                if result.get('status') != 'success':
-                    operations[operation_id]['status'] = 'failed'
-                    operations[operation_id]['error'] = f"Failed to build component {component}"
-                    operations[operation_id]['completed_at'] = datetime.datetime.now().isoformat()
+                if result.get('status') not in SUCCESS_STATUSES:
+                    _update_operation(
+                        operation_id,
+                        status='failed',
+                        error=f"Failed to build component {component}",
+                        completed_at=datetime.datetime.now().isoformat()
+                    )
                     return
             
             # Deploy to Kubernetes
-            operations[operation_id]['current_action'] = 'deploying'
-            
-            with builder_lock:
-                deploy_result = genesis_builder.deploy_to_kubernetes(cloud_provider)
+            _update_operation(operation_id, current_action='deploying')
             
-            operations[operation_id]['deploy_result'] = deploy_result
+            if clusters:
+                deploy_result = self._deploy_clusters(builder, operation_id, clusters, cloud_provider, strategy,
+                                                      log_buffer)
+            else:
+                with deploy_locks.lock(cloud_provider):
+                    deploy_result = builder.deploy_to_kubernetes(cloud_provider, log_sink=log_buffer.append)
             
             # Update operation status
-            operations[operation_id]['status'] = 'completed' if deploy_result.get('status') == 'success' else 'failed'
+            update = {
+                'deploy_result': deploy_result,
+                'status': 'completed' if deploy_result.get('status') == 'success' else 'failed'
+            }
             if deploy_result.get('status') != 'success':
-                operations[operation_id]['error'] = f"Failed to deploy to {cloud_provider}"
+                failed_targets = deploy_result.get('failed') if clusters else None
+                update['error'] = f"Failed to deploy to {', '.join(failed_targets or clusters or [cloud_provider])}"
             
-            operations[operation_id]['completed_at'] = datetime.datetime.now().isoformat()
+            _update_operation(operation_id, completed_at=datetime.datetime.now().isoformat(), **update)
         except Exception as e:
             logger.error(f"Error in build and deploy operation {operation_id}: {str(e)}")
-            operations[operation_id]['status'] = 'failed'
-            operations[operation_id]['error'] = str(e)
-            operations[operation_id]['completed_at'] = datetime.datetime.now().isoformat()
+            _update_operation(
+                operation_id,
+                status='failed',
+                error=str(e),
+                completed_at=datetime.datetime.now().isoformat()
+            )
+        finally:
+            self._finish_log(operation_id, log_buffer)
+    
+    def _run_pipelined_build_and_deploy(self, operation_id: str, components: List[str], force: bool = False,
+                                        clusters: Optional[List[str]] = None, on_failure: str = 'abort'):
+        """
+        Run pipelined build and deploy operation in background.
+        
+        Each component is rolled out (image patch of its Deployment) as soon
+        as its image is pushed, while the other builds are still running.
+        
+        Args:
+            operation_id: ID of operation
+            components: List of components to build and roll out
+            force: Rebuild components even if their build inputs are unchanged
+            clusters: Optional clusters to roll out to, defaults to the configured context
+            on_failure: `abort` stops the pipeline at the first failure, `continue` keeps going
+        """
+        builder = _get_builder()
+        log_buffer = log_buffers.create(operation_id)
+        try:
+            def build(component: str) -> Dict[str, Any]:
+                with component_locks.lock(component):
+                    return builder.build_component(component, log_sink=log_buffer.append, force=force)
+            
+            result = builder.build_and_deploy_pipelined(
+                components, clusters=clusters, on_failure=on_failure, force=force,
+                log_sink=log_buffer.append, build_fn=build,
+                on_update=lambda stages: _update_operation(operation_id, stages=stages)
+            )
+            
+            update = {
+                'status': 'completed' if result.get('status') == 'success' else 'failed',
+                'build_results': result.get('build_results'),
+                'rollout_results': result.get('rollout_results'),
+                'stages': result.get('stages'),
+                'duration': result.get('duration')
+            }
+            if result.get('status') != 'success':
+                update['error'] = result.get('message') or \
+                    ('Pipeline aborted after a failure' if result.get('aborted') else 'Some components failed')
+            _update_operation(operation_id, completed_at=datetime.datetime.now().isoformat(), **update)
+        except Exception as e:
+            logger.error(f"Error in pipelined build and deploy operation {operation_id}: {str(e)}")
+            _update_operation(
+                operation_id,
+                status='failed',
+                error=str(e),
+                completed_at=datetime.datetime.now().isoformat()
+            )
+        finally:
+            self._finish_log(operation_id, log_buffer)
+    
+    def _deploy_clusters(self, builder: GenesisBuilder, operation_id: str, clusters: List[str],
+                         cloud_provider: str, strategy: Optional[str], log_buffer: LogBuffer,
+                         prune: Optional[bool] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Deploy to several clusters, recording each cluster result as it completes.
+        
+        Args:
+            builder: Builder (configuration snapshot) of the operation
+            operation_id: ID of operation
+            clusters: Cluster names or kube contexts
+            cloud_provider: Cloud provider for clusters that do not set one
+            strategy: Rollout strategy, None for the configured default
+            log_buffer: Log buffer of the operation
+            prune: Delete objects no longer rendered
+            force: Apply all objects even if unchanged
+            
+        Returns:
+            Dict containing overall status and per-cluster results
+        """
+        cluster_results = {}
+        
+        def on_result(cluster: str, result: Dict[str, Any]):
+            cluster_results[cluster] = result
+            _update_operation(operation_id, cluster_results=dict(cluster_results))
+        
+        return builder.deploy_to_clusters(clusters, cloud_provider, strategy=strategy,
+                                          log_sink=log_buffer.append, prune=prune, force=force,
+                                          on_result=on_result)
+    
+    def _finish_log(self, operation_id: str, log_buffer: LogBuffer):
+        """
+        Close an operation's live log and persist its output.
+        
+        Args:
+            operation_id: ID of operation
+            log_buffer: Log buffer of the operation
+        """
+        log_buffer.close()
+        # The offset of the first kept line is stored too, so offsets stay valid after eviction
+        operations.save_logs(operation_id, {'output': log_buffer.text(), LOG_OFFSET_KEY: str(log_buffer.start)})
+    
+    def _submit_operation(self, operation_id: str, fn, *args, priority: int) -> bool:
+        """
+        Queue an operation, answering with 503 if the queue is full.
+        
+        Args:
+            operation_id: ID of operation
+            fn: Operation runner
+            *args: Arguments passed to the runner
+            priority: Job priority, lower values run first
+            
+        Returns:
+            True if the operation was queued
+        """
+        try:
+            job_queue.submit(operation_id, fn, *args, priority=priority)
+            return True
+        except QueueFullError as e:
+            operations.delete(operation_id)
+            self._send_error(503, f"Service busy: {str(e)}", headers={'Retry-After': str(e.retry_after)})
+            return False
     
     def _send_json_response(self, status_code: int, data: Any):
         """
@@ -371,44 +1307,79 @@ class GenesisAPIHandler(http.server.BaseHTTPRequestHandler):
             status_code: HTTP status code
             data: Data to send as JSON
         """
+        body = json.dumps(data).encode('utf-8')
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(body)
     
-    def _send_error(self, status_code: int, message: str):
+    def _send_error(self, status_code: int, message: str, headers: Optional[Dict[str, str]] = None):
         """
         Send error response.
         
         Args:
             status_code: HTTP status code
             message: Error message
+            headers: Optional additional response headers
         """
+        body = json.dumps({
+            'error': message
+        }).encode('utf-8')
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(json.dumps({
-            'error': message
-        }).encode('utf-8'))
+        self.wfile.write(body)
 
 
-def start_api_server(port: int = 8080):
+def start_api_server(port: int = 8080, server_type: Optional[str] = None):
     """
     Start API server.
     
+    The asyncio server keeps connections alive and bounds the number of
+    requests handled at once (GENESIS_API_MAX_CONCURRENCY) and, separately,
+    the number of open event/log streams and long polls
+    (GENESIS_API_MAX_STREAMS); the threaded server starts one thread per
+    connection and closes it after each request.
+    The server listens right away; the builder and its clients are created in
+    the background and /ready answers 503 until they are.
+    
     Args:
         port: Port to listen on
+        server_type: `async` or `threaded`, defaults to GENESIS_API_SERVER or `async`
     """
+    server_type = server_type or os.environ.get('GENESIS_API_SERVER', 'async')
+    if config_manager.poll_interval > 0:
+        config_manager.start()
+    _start_warm_up()
     try:
+        if server_type == 'async':
+            logger.info(f"Genesis API server starting on port {port}")
+            run_async_server(
+                GenesisAPIHandler, '0.0.0.0', port,
+                max_concurrency=int(os.environ.get('GENESIS_API_MAX_CONCURRENCY', 64)),
+                keepalive_timeout=float(os.environ.get('GENESIS_API_KEEPALIVE_TIMEOUT', 15)),
+                max_streams=int(os.environ.get('GENESIS_API_MAX_STREAMS', 256))
+            )
+            return
+        
         # Create server
         server = socketserver.ThreadingTCPServer(('0.0.0.0', port), GenesisAPIHandler)
-        logger.info(f"Genesis API server starting on port {port}")
+        logger.info(f"Genesis API server (threaded) starting on port {port}")
         
         # Start server
         server.serve_forever()
     except Exception as e:
         logger.error(f"Error starting API server: {str(e)}")
         sys.exit(1)
+    finally:
+        config_manager.stop()
+        with _builder_lock:
+            if genesis_builder is not None:
+                genesis_builder.close()
 
 
 if __name__ == "__main__":
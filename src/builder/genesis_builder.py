@@ -7,13 +7,36 @@ Docker containers for the Singularity Engine ecosystem.
 """
 
 import os
+import re
 import sys
+import json
+import time
 import uuid
+import copy
 import yaml
 import logging
+import sqlite3
 import datetime
+import threading
 import subprocess
-from typing import Dict, List, Any, Optional
+import collections
+import concurrent.futures
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+from build_cache import BuildCache, ContextIndex
+from build_ledger import BuildLedger, STATUS_SUCCESS, STATUS_PUSH_ERROR, STATUS_ERROR, MAX_QUERY_LIMIT
+from build_profile import BuildProfiler, BuildProfileStore, compare_profiles
+from build_pipeline import BuildDeployPipeline
+from build_scheduler import BuildScheduler
+from cluster_rollout import run_rollout
+from config_manager import ConfigManager
+from deploy_engine import DeployEngine
+from docker_backend import create_docker_backend
+from k8s_cache import KubernetesStatusCache
+from keyed_lock import KeyedLock
+import metrics
+from registry_client import RegistryClient, RegistryError
+from registry_session import RegistrySessionManager, is_auth_error
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +48,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger('genesis_builder')
 
+# Number of trailing output lines of a command kept in results
+OUTPUT_TAIL_LINES = 200
+
+# Layer status lines and final digest line printed by `docker push`
+PUSH_LAYER_PATTERN = re.compile(r'^([0-9a-f]{12}): (Pushed|Layer already exists|Mounted from .*)$', re.MULTILINE)
+PUSH_DIGEST_PATTERN = re.compile(r'digest: (sha256:[0-9a-f]{64}) size: (\d+)')
+
 class GenesisBuilder:
     """
     Main builder class for Singularity Engine containers.
@@ -33,24 +63,148 @@ class GenesisBuilder:
     for all Singularity Engine components.
     """
     
-    def __init__(self, config_path: str = None):
+    def __init__(self, config_path: str = None, config: Optional[Dict[str, Any]] = None):
         """
         Initialize the Genesis Builder.
         
         Args:
             config_path: Path to configuration file
+            config: Already loaded configuration, used instead of reading config_path
         """
         self.builder_id = str(uuid.uuid4())
         logger.info(f"Initializing Genesis Builder instance {self.builder_id}")
         
         # Load configuration
-        self.config = self._load_config(config_path)
+        self.config = config if config is not None else self._load_config(config_path)
         
         # Initialize component definitions
         self.components = self._init_component_definitions()
         
+        # Docker daemon access (Engine API socket, or the docker CLI as fallback), created on first use
+        self._docker = None
+        self._docker_lock = threading.Lock()
+        
+        # Index of build-input fingerprints of successful builds
+        self.build_cache = BuildCache(os.path.join(self._state_dir(), 'build-cache.json'))
+        
+        # Per-file (mtime, size, hash) index of build contexts, so unchanged files are not re-read
+        self.context_index = ContextIndex(os.path.join(self._state_dir(), 'context-index'))
+        
+        # Indexed history of all builds with their pushed digests
+        ledger_path = os.path.join(self._state_dir(), 'builds.db')
+        try:
+            self.build_ledger = BuildLedger(ledger_path)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Failed to open build ledger at {ledger_path}: {str(e)}")
+            logger.info("Falling back to in-memory build ledger")
+            self.build_ledger = BuildLedger(':memory:')
+        
+        # Per-step timelines of recent builds for comparison
+        self.build_profiles = BuildProfileStore(
+            os.path.join(self._state_dir(), 'build-profiles.json'),
+            max_per_component=(self.config.get('builder') or {}).get('profile_history', 20)
+        )
+        
+        # Registry logins shared by all pushes of this builder
+        session_ttl = (self.config.get('builder') or {}).get('registry_session_ttl', 3600)
+        self.registry_sessions = RegistrySessionManager(self._registry_login, ttl=session_ttl)
+        
+        # Bound the number of concurrent image pushes across components
+        max_pushes = (self.config.get('builder') or {}).get('max_parallel_pushes', 2)
+        self._push_slots = threading.BoundedSemaphore(max(1, int(max_pushes)))
+        self._registry_client = None
+        
+        # Short-lived per-component status, refreshed with one image list call
+        self._status_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._status_lock = threading.Lock()
+        # Bumped by every invalidation; a status check started before one does not cache its result
+        self._status_generation = 0
+        self._k8s_status = None
+        
+        # Incremental deploys with a last-applied index per cluster
+        max_applies = (self.config.get('kubernetes') or {}).get('max_parallel_applies', 4)
+        self.deploy_engine = DeployEngine(self._run_command, os.path.join(self._state_dir(), 'deploy-index.json'),
+                                          max_workers=max_applies)
+        self._cluster_locks = KeyedLock('cluster', label_keys=False)
+        
         logger.info(f"Genesis Builder initialized with {len(self.components)} component definitions")
     
+    @property
+    def docker(self):
+        """
+        Docker backend, created on first use.
+        
+        Selecting the `auto` backend probes the daemon socket, so it is kept
+        off the startup path.
+        """
+        with self._docker_lock:
+            if self._docker is None:
+                self._docker = create_docker_backend(self.config.get('builder') or {}, self._run_command,
+                                                     tail_lines=OUTPUT_TAIL_LINES)
+            return self._docker
+    
+    def warm_up(self):
+        """
+        Create the clients that are otherwise created on first use.
+        
+        Selects the Docker backend and sets up Kubernetes status access, so the
+        first requests do not pay for it.
+        """
+        logger.info(f"Warming up Genesis Builder ({self.docker.name} backend)")
+        self._get_k8s_status_cache()
+    
+    def with_config(self, config: Dict[str, Any]) -> 'GenesisBuilder':
+        """
+        Create a builder using another configuration.
+        
+        The new builder shares the state of this one (build cache, build
+        profiles, deploy index, registry logins, cluster locks) and only
+        recreates what is derived from changed settings. This builder keeps
+        its configuration, so operations running on it are unaffected, except
+        that the shared deploy engine and registry sessions pick up changed
+        `max_parallel_applies` and `registry_session_ttl` right away.
+        
+        Args:
+            config: Validated configuration
+            
+        Returns:
+            Builder using the configuration
+        """
+        builder = copy.copy(self)
+        builder.config = config
+        builder.components = builder._init_component_definitions()
+        
+        old_settings = self.config.get('builder') or {}
+        new_settings = config.get('builder') or {}
+        if new_settings != old_settings:
+            builder._docker = None
+            builder._docker_lock = threading.Lock()
+        if new_settings.get('max_parallel_pushes', 2) != old_settings.get('max_parallel_pushes', 2):
+            builder._push_slots = threading.BoundedSemaphore(max(1, int(new_settings.get('max_parallel_pushes', 2))))
+        if new_settings.get('registry_session_ttl', 3600) != old_settings.get('registry_session_ttl', 3600):
+            # Applies to sessions opened from now on
+            self.registry_sessions.ttl = new_settings.get('registry_session_ttl', 3600)
+        max_applies = (config.get('kubernetes') or {}).get('max_parallel_applies', 4)
+        if max_applies != (self.config.get('kubernetes') or {}).get('max_parallel_applies', 4):
+            # Applies to deploys started from now on
+            self.deploy_engine.max_workers = max(1, int(max_applies))
+        if builder._state_dir() != self._state_dir():
+            logger.warning(f"Changed state_dir takes effect after a restart, keeping {self._state_dir()}")
+        if config.get('registry') != self.config.get('registry'):
+            builder._registry_client = None
+        if config.get('kubernetes') != self.config.get('kubernetes'):
+            builder._k8s_status = None
+            # The watches of the replaced cache would otherwise keep running
+            self.close()
+        
+        # Status is derived from components and registry; start with an empty cache
+        builder._status_cache = {}
+        builder._status_lock = threading.Lock()
+        builder._status_generation = 0
+        
+        logger.info(f"Genesis Builder reconfigured with {len(builder.components)} component definitions")
+        return builder
+    
     def _load_config(self, config_path: Optional[str] = None) -> Dict[str, Any]:
         """
         Load configuration from file or use defaults.
@@ -61,20 +215,10 @@ class GenesisBuilder:
         Returns:
             Dict containing configuration settings
         """
-        if not config_path:
-            config_path = os.environ.get('GENESIS_CONFIG', 'configs/builder_config.yml')
-            
-        try:
-            logger.info(f"Loading configuration from {config_path}")
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            return config
-        except Exception as e:
-            logger.error(f"Failed to load configuration: {str(e)}")
-            logger.info("Using default configuration")
-            return self._default_config()
+        return ConfigManager(config_path, default_config=self._default_config).current.config
     
-    def _default_config(self) -> Dict[str, Any]:
+    @staticmethod
+    def _default_config() -> Dict[str, Any]:
         """
         Create default configuration when no config file is found.
         
@@ -87,6 +231,9 @@ class GenesisBuilder:
                 'username': os.environ.get('REGISTRY_USERNAME', ''),
                 'password': os.environ.get('REGISTRY_PASSWORD', ''),
             },
+            'builder': {
+                'max_parallel_builds': 4
+            },
             'kubernetes': {
                 'namespace': 'singularity-system',
                 'service_account': 'singularity-sa',
@@ -111,6 +258,16 @@ class GenesisBuilder:
             }
         }
     
+    def _state_dir(self) -> str:
+        """
+        Get the directory holding local builder state (caches and indexes).
+        
+        Returns:
+            Path of the state directory
+        """
+        default = os.environ.get('GENESIS_STATE_DIR', '.genesis')
+        return (self.config.get('builder') or {}).get('state_dir', default)
+    
     def _init_component_definitions(self) -> Dict[str, Any]:
         """
         Initialize component definitions from configuration.
@@ -118,7 +275,7 @@ class GenesisBuilder:
         Returns:
             Dict containing component definitions
         """
-        components = self.config.get('components', {})
+        components = dict(self.config.get('components') or {})
         
         # Add default components if not in config
         default_components = {
@@ -142,36 +299,44 @@ class GenesisBuilder:
         
         return components
     
-    def build_all_components(self) -> Dict[str, Any]:
+    def build_all_components(self, max_workers: Optional[int] = None, force: bool = False) -> Dict[str, Any]:
         """
         Build all components defined in configuration.
         
+        Components are built in dependency order (see `depends_on` in the
+        component configuration), with independent components built in parallel.
+        
+        Args:
+            max_workers: Maximum number of concurrent builds, defaults to
+                `builder.max_parallel_builds` from configuration
+            force: Rebuild components even if their build inputs are unchanged
+        
         Returns:
             Dict containing build results for each component
         """
         logger.info(f"Building all components: {', '.join(self.components.keys())}")
         
-        results = {}
-        for name, definition in self.components.items():
-            # Skip external components (pulled from public registry)
-            if definition.get('external', False):
-                logger.info(f"Skipping build for external component: {name}")
-                results[name] = {'status': 'skipped', 'external': True}
-                continue
-            
-            # Build component
-            logger.info(f"Building component: {name}")
-            result = self.build_component(name)
-            results[name] = result
+        if max_workers is None:
+            max_workers = (self.config.get('builder') or {}).get('max_parallel_builds', 4)
         
-        return results
+        scheduler = BuildScheduler(self.components, lambda name: self.build_component(name, force=force),
+                                   max_workers=max_workers)
+        return scheduler.run()
     
-    def build_component(self, component_name: str) -> Dict[str, Any]:
+    def build_component(self, component_name: str,
+                        log_sink: Optional[Callable[[str], None]] = None,
+                        force: bool = False) -> Dict[str, Any]:
         """
         Build a single component.
         
+        If the component's build inputs are unchanged since its last successful
+        build, the cached image reference is returned with status `cached`.
+        A build whose image could not be pushed has status `error`.
+        
         Args:
             component_name: Name of the component to build
+            log_sink: Optional callable receiving build and push output line by line
+            force: Rebuild even if the build inputs are unchanged
             
         Returns:
             Dict containing build result
@@ -201,65 +366,298 @@ class GenesisBuilder:
         registry_url = self.config.get('registry', {}).get('url', 'localhost:5000')
         image_name = f"{registry_url}/{repository}"
         
-        # Construct docker build command
-        cmd = ['docker', 'build', '-t', f"{image_name}:{date_tag}", '-t', f"{image_name}:{tag}"]
+        # List the context once, re-hashing only files changed since the last scan
+        scan = None
+        try:
+            scan = self.context_index.scan(context)
+            metrics.CONTEXT_BYTES.labels(component_name).observe(scan['bytes'])
+            metrics.CONTEXT_PREP_DURATION.labels(component_name).observe(scan['seconds'])
+            logger.debug(f"Prepared context of {component_name}: {len(scan['files'])} files, "
+                         f"{scan['bytes']} bytes, {scan['hashed']} hashed in {scan['seconds']:.3f}s")
+        except Exception as e:
+            logger.warning(f"Failed to index the context of {component_name}: {str(e)}")
+        context_stats = {
+            'files': len(scan['files']),
+            'bytes': scan['bytes'],
+            'hashed': scan['hashed'],
+            'prep_seconds': round(scan['seconds'], 3)
+        } if scan else None
         
-        # Add build arguments
-        for arg in build_args:
-            cmd.extend(['--build-arg', arg])
+        # Skip the build if nothing that goes into it has changed
+        fingerprint = None
+        if self._cache_enabled():
+            try:
+                fingerprint = self.build_cache.fingerprint(context, dockerfile, build_args, image_name,
+                                                           self._image_digest,
+                                                           files=scan['files'] if scan else None, tag=tag)
+            except Exception as e:
+                logger.warning(f"Failed to fingerprint {component_name}, building without cache: {str(e)}")
         
-        # Add Dockerfile and context
-        cmd.extend(['-f', dockerfile, context])
+        if fingerprint and not force:
+            cached = self.build_cache.lookup(component_name, fingerprint)
+            if cached:
+                logger.info(f"Build inputs of {component_name} unchanged, using cached image {cached['image']}")
+                return {
+                    'status': 'cached',
+                    'image': cached['image'],
+                    'latest_image': cached['latest_image'],
+                    'build_time': cached['build_time'],
+                    'fingerprint': fingerprint,
+                    'context': context_stats
+                }
         
-        logger.info(f"Building image {image_name}:{date_tag}")
-        logger.debug(f"Build command: {' '.join(cmd)}")
+        logger.info(f"Building image {image_name}:{date_tag} ({self.docker.name} backend)")
         
+        # Time every build step from the progress output while passing it on to the log
+        profiler = BuildProfiler()
+        
+        def build_sink(line: str):
+            for output_line in profiler.feed(line):
+                if log_sink:
+                    log_sink(output_line)
+        
+        started_at = time.time()
         try:
-            # Execute build command
-            process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
+            # Build and tag the image, importing (and exporting) the shared layer cache
+            cache_from, cache_to = self._layer_cache(component_name, component, registry_url, repository, tag)
+            build_started = time.monotonic()
+            returncode, stdout, stderr = self.docker.build([f"{image_name}:{date_tag}", f"{image_name}:{tag}"],
+                                                           dockerfile, context, build_args, log_sink=build_sink,
+                                                           cache_from=cache_from, cache_to=cache_to,
+                                                           context_files=[path for path, _, _ in scan['files']]
+                                                           if scan else None)
+            metrics.BUILD_DURATION.labels(component_name, 'success' if returncode == 0 else 'error') \
+                .observe(time.monotonic() - build_started)
+            profile = dict(profiler.profile(), image=f"{image_name}:{date_tag}",
+                           recorded_at=datetime.datetime.now().isoformat())
             
-            stdout, stderr = process.communicate()
-            
-            if process.returncode != 0:
+            if returncode != 0:
                 logger.error(f"Failed to build {component_name}: {stderr}")
+                self._record_build(component_name, STATUS_ERROR, started_at, image_name,
+                                   fingerprint=fingerprint, details={'returncode': returncode})
                 return {
                     'status': 'error',
-                    'returncode': process.returncode,
+                    'returncode': returncode,
                     'stdout': stdout,
-                    'stderr': stderr
+                    'stderr': stderr,
+                    'profile': profile,
+                    'context': context_stats
                 }
             
             logger.info(f"Successfully built {component_name}")
+            self.invalidate_component_status(component_name)
+            self.build_profiles.record(component_name, profile)
             
-            # Push image to registry
-            push_result = self._push_image(f"{image_name}:{date_tag}")
-            push_result_latest = self._push_image(f"{image_name}:{tag}")
+            # Push image to registry, uploading layers once for both tags
+            push_started = time.monotonic()
+            push_result, push_result_latest = self._publish_image(registry_url, repository, [date_tag, tag],
+                                                                  log_sink=log_sink)
+            push_succeeded = push_result.get('status') == 'success' and push_result_latest.get('status') == 'success'
+            metrics.PUSH_DURATION.labels(component_name, 'success' if push_succeeded else 'error') \
+                .observe(time.monotonic() - push_started)
             
-            return {
-                'status': 'success',
+            # An image that is not in the registry cannot be rolled out, so a failed push fails the build
+            result = {
+                'status': 'success' if push_succeeded else 'error',
                 'image': f"{image_name}:{date_tag}",
                 'latest_image': f"{image_name}:{tag}",
                 'build_time': datetime.datetime.now().isoformat(),
+                'fingerprint': fingerprint,
+                'push_time': round(time.monotonic() - push_started, 3),
+                'profile': profile,
+                'cache_hit_rate': profile['cache_hit_rate'],
+                'context': context_stats,
+                'layer_cache': {'from': cache_from, 'to': cache_to},
                 'push_results': {
                     'versioned': push_result,
                     'latest': push_result_latest
                 }
             }
+            if not push_succeeded:
+                logger.error(f"Built {component_name} but failed to push it")
+                result['message'] = f"Failed to push {image_name}"
+            
+            self._record_build(component_name, STATUS_SUCCESS if push_succeeded else STATUS_PUSH_ERROR,
+                               started_at, image_name, tags=[date_tag, tag], digest=push_result.get('digest'),
+                               fingerprint=fingerprint,
+                               details={'push_time': result['push_time'], 'context': context_stats})
+            
+            # Only published images can be served from the cache
+            if fingerprint and push_succeeded:
+                self.build_cache.record(component_name, fingerprint, {
+                    'image': result['image'],
+                    'latest_image': result['latest_image'],
+                    'build_time': result['build_time']
+                })
+            
+            return result
         except Exception as e:
             logger.error(f"Error building {component_name}: {str(e)}")
+            self._record_build(component_name, STATUS_ERROR, started_at, image_name,
+                               fingerprint=fingerprint, details={'message': str(e)})
             return {'status': 'error', 'message': str(e)}
     
-    def _push_image(self, image_name: str) -> Dict[str, Any]:
+    def _record_build(self, component_name: str, status: str, started_at: float, image_name: str,
+                      tags: Optional[List[str]] = None, digest: Optional[str] = None,
+                      fingerprint: Optional[str] = None, details: Optional[Dict[str, Any]] = None):
+        """
+        Record a build in the build ledger.
+        
+        Failures to record are logged and never fail the build.
+        
+        Args:
+            component_name: Name of the component
+            status: Ledger status of the build
+            started_at: Time the build started (seconds since the epoch)
+            image_name: Image name without tag
+            tags: Tags the image was published under
+            digest: Manifest digest of the pushed image
+            fingerprint: Build-input fingerprint
+            details: Optional additional information
+        """
+        try:
+            self.build_ledger.record(component_name, status, started_at, duration=round(time.time() - started_at, 3),
+                                     image=image_name, tags=tags, digest=digest, fingerprint=fingerprint,
+                                     details=details)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.error(f"Failed to record build of {component_name} in the build ledger: {str(e)}")
+    
+    def _layer_cache(self, component_name: str, component: Dict[str, Any], registry_url: str,
+                     repository: str, tag: str) -> Tuple[List[str], List[str]]:
+        """
+        Get the layer cache import and export specs of a component build.
+        
+        `cache_from` and `cache_to` of the component override the defaults in
+        the `builder` section. Specs may use the placeholders `{registry}`,
+        `{repository}`, `{tag}` and `{component}`.
+        
+        Args:
+            component_name: Name of the component
+            component: Component definition
+            registry_url: Registry the component is pushed to
+            repository: Repository of the component image
+            tag: Base tag of the component image
+            
+        Returns:
+            Tuple of (cache import specs, cache export specs)
+        """
+        builder_config = self.config.get('builder') or {}
+        placeholders = {'registry': registry_url, 'repository': repository, 'tag': tag, 'component': component_name}
+        
+        def specs(key: str) -> List[str]:
+            value = component.get(key, builder_config.get(key))
+            if not value:
+                return []
+            if isinstance(value, str):
+                value = [value]
+            return [str(spec).format(**placeholders) for spec in value]
+        
+        return specs('cache_from'), specs('cache_to')
+    
+    def _cache_enabled(self) -> bool:
+        """
+        Check whether build caching is enabled in configuration.
+        
+        Returns:
+            True unless `builder.cache` is set to false
+        """
+        return bool((self.config.get('builder') or {}).get('cache', True))
+    
+    def _image_digest(self, image: str) -> Optional[str]:
+        """
+        Get the digest of a locally available image.
+        
+        Args:
+            image: Image reference
+            
+        Returns:
+            Image ID digest, or None if the image is not available locally
+        """
+        details = self.docker.inspect_image(image)
+        if not details:
+            return None
+        return details.get('Id') or None
+    
+    def _run_command(self, cmd: List[str], log_sink: Optional[Callable[[str], None]] = None,
+                     tail_lines: Optional[int] = OUTPUT_TAIL_LINES,
+                     input_data: Optional[str] = None) -> Tuple[int, str, str]:
+        """
+        Run a command, streaming its output line by line as it is produced.
+        
+        Args:
+            cmd: Command to run
+            log_sink: Optional callable receiving each stdout/stderr line
+            tail_lines: Number of trailing lines kept per stream, None to keep everything
+            input_data: Optional data written to the command's stdin
+            
+        Returns:
+            Tuple of (return code, stdout tail, stderr tail)
+        """
+        spawn_started = time.monotonic()
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if input_data is not None else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            bufsize=1
+        )
+        metrics.SUBPROCESS_SPAWN.labels(metrics.command_label(cmd)).observe(time.monotonic() - spawn_started)
+        
+        if input_data is not None:
+            process.stdin.write(input_data)
+            process.stdin.close()
+        
+        def pump(stream, tail):
+            for line in stream:
+                tail.append(line)
+                if log_sink:
+                    try:
+                        log_sink(line.rstrip('\n'))
+                    except Exception as e:
+                        logger.debug(f"Log sink failed: {str(e)}")
+            stream.close()
+        
+        stdout_tail = collections.deque(maxlen=tail_lines)
+        stderr_tail = collections.deque(maxlen=tail_lines)
+        
+        # Drain stderr on a helper thread so neither pipe can fill up and block
+        stderr_thread = threading.Thread(target=pump, args=(process.stderr, stderr_tail))
+        stderr_thread.daemon = True
+        stderr_thread.start()
+        
+        pump(process.stdout, stdout_tail)
+        stderr_thread.join()
+        process.wait()
+        
+        return process.returncode, ''.join(stdout_tail), ''.join(stderr_tail)
+    
+    def _registry_login(self, registry_url: str, username: str, password: str) -> Tuple[bool, str]:
+        """
+        Log in to a registry.
+        
+        Args:
+            registry_url: Registry URL
+            username: Registry username
+            password: Registry password
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        success, message = self.docker.login(registry_url, username, password)
+        
+        if not success:
+            logger.error(f"Failed to login to registry: {message}")
+        return success, message
+    
+    def _push_image(self, image_name: str,
+                    log_sink: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Push an image to the registry.
         
         Args:
             image_name: Name of the image to push
+            log_sink: Optional callable receiving push output line by line
             
         Returns:
             Dict containing push result
@@ -267,105 +665,641 @@ class GenesisBuilder:
         logger.info(f"Pushing image: {image_name}")
         
         try:
-            # Login to registry if credentials provided
+            # Reuse the registry session if credentials provided
             registry = self.config.get('registry', {})
+            credentials = None
             if registry.get('username') and registry.get('password'):
-                login_cmd = [
-                    'docker', 'login',
-                    registry.get('url', 'localhost:5000'),
-                    '-u', registry.get('username'),
-                    '-p', registry.get('password')
-                ]
-                
-                login_process = subprocess.Popen(
-                    login_cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    universal_newlines=True
-                )
-                login_stdout, login_stderr = login_process.communicate()
-                
-                if login_process.returncode != 0:
-                    logger.error(f"Failed to login to registry: {login_stderr}")
+                credentials = (registry.get('url', 'localhost:5000'), registry.get('username'), registry.get('password'))
+                login_ok, _ = self.registry_sessions.ensure(*credentials)
+                if not login_ok:
                     return {'status': 'error', 'message': 'Registry login failed'}
             
             # Push image
-            push_cmd = ['docker', 'push', image_name]
+            push_returncode, push_stdout, push_stderr = self.docker.push(image_name, log_sink=log_sink,
+                                                                         credentials=credentials)
             
-            push_process = subprocess.Popen(
-                push_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-            push_stdout, push_stderr = push_process.communicate()
+            # The session may have expired on the registry side, log in again once
+            if push_returncode != 0 and credentials and is_auth_error(push_stderr + push_stdout):
+                logger.warning(f"Registry rejected credentials while pushing {image_name}, re-authenticating")
+                self.registry_sessions.invalidate(*credentials)
+                login_ok, _ = self.registry_sessions.ensure(*credentials)
+                if not login_ok:
+                    return {'status': 'error', 'message': 'Registry login failed'}
+                push_returncode, push_stdout, push_stderr = self.docker.push(image_name, log_sink=log_sink,
+                                                                             credentials=credentials)
             
-            if push_process.returncode != 0:
+            if push_returncode != 0:
                 logger.error(f"Failed to push image {image_name}: {push_stderr}")
                 return {
                     'status': 'error',
-                    'returncode': push_process.returncode,
+                    'returncode': push_returncode,
                     'stdout': push_stdout,
                     'stderr': push_stderr
                 }
             
             logger.info(f"Successfully pushed image {image_name}")
-            return {'status': 'success', 'image': image_name}
+            result = {'status': 'success', 'image': image_name}
+            result.update(self._parse_push_output(push_stdout))
+            return result
         except Exception as e:
             logger.error(f"Error pushing image {image_name}: {str(e)}")
             return {'status': 'error', 'message': str(e)}
     
-    def deploy_to_kubernetes(self, cloud_provider: str = 'vultr') -> Dict[str, Any]:
+    @staticmethod
+    def _parse_push_output(output: str) -> Dict[str, Any]:
+        """
+        Extract layer statistics and the manifest digest from `docker push` output.
+        
+        Args:
+            output: stdout of docker push
+            
+        Returns:
+            Dict containing pushed/skipped layer IDs and the manifest digest
+        """
+        pushed, skipped = [], []
+        for layer_id, status in PUSH_LAYER_PATTERN.findall(output):
+            (pushed if status == 'Pushed' else skipped).append(layer_id)
+        
+        digest_match = PUSH_DIGEST_PATTERN.search(output)
+        return {
+            'digest': digest_match.group(1) if digest_match else None,
+            'layers_pushed': len(pushed),
+            'layers_skipped': len(skipped),
+            'pushed_layers': pushed
+        }
+    
+    def _get_registry_client(self) -> RegistryClient:
+        """
+        Get the registry API client for the configured registry.
+        
+        Returns:
+            Registry client instance
+        """
+        if self._registry_client is None:
+            registry = self.config.get('registry', {})
+            self._registry_client = RegistryClient(
+                registry.get('url', 'localhost:5000'),
+                username=registry.get('username') or None,
+                password=registry.get('password') or None,
+                insecure=registry.get('insecure')
+            )
+        return self._registry_client
+    
+    def _publish_image(self, registry_url: str, repository: str, tags: List[str],
+                       log_sink: Optional[Callable[[str], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Publish all tags of a built image.
+        
+        The first tag is pushed with `docker push`; every further tag is added
+        by copying the pushed manifest through the registry API, so layers are
+        uploaded (and checked) only once. If the registry API is unavailable
+        the remaining tags fall back to `docker push`.
+        
+        Args:
+            registry_url: Registry URL
+            repository: Repository name
+            tags: Tags to publish, all pointing at the same local image
+            log_sink: Optional callable receiving push output line by line
+            
+        Returns:
+            List of push results, one per tag
+        """
+        image_name = f"{registry_url}/{repository}"
+        
+        with self._push_slots:
+            first = self._push_image(f"{image_name}:{tags[0]}", log_sink=log_sink)
+            results = [first]
+            manifest = None
+            
+            for tag in tags[1:]:
+                if first.get('status') != 'success':
+                    results.append({'status': 'error', 'image': f"{image_name}:{tag}",
+                                    'message': f"Push of {image_name}:{tags[0]} failed"})
+                    continue
+                try:
+                    tagged = self._get_registry_client().tag(repository, tags[0], tag)
+                    manifest = tagged['manifest']
+                    if log_sink:
+                        log_sink(f"{tag}: tagged from {tags[0]} digest: {tagged['digest']}")
+                    results.append({'status': 'success', 'image': f"{image_name}:{tag}",
+                                    'method': 'manifest', 'digest': tagged['digest']})
+                except RegistryError as e:
+                    logger.warning(f"Registry API tagging failed, pushing {image_name}:{tag} instead: {str(e)}")
+                    results.append(self._push_image(f"{image_name}:{tag}", log_sink=log_sink))
+        
+        if first.get('status') == 'success':
+            first.update(self._layer_bytes(f"{image_name}:{tags[0]}", repository, tags[0],
+                                           first.pop('pushed_layers', []), manifest))
+        return results
+    
+    def _layer_bytes(self, image_ref: str, repository: str, tag: str, pushed_layers: List[str],
+                     manifest: Optional[Dict[str, Any]] = None) -> Dict[str, Optional[int]]:
+        """
+        Work out how many compressed bytes a push uploaded and skipped.
+        
+        `docker push` reports layers by their short diff ID, while the manifest
+        lists compressed layer sizes in the same order as the image's diff IDs.
+        
+        Args:
+            image_ref: Local image reference
+            repository: Repository name
+            tag: Pushed tag
+            pushed_layers: Short diff IDs of layers reported as pushed
+            manifest: Pushed manifest, fetched from the registry if not given
+            
+        Returns:
+            Dict containing bytes_uploaded and bytes_skipped (None if unknown)
+        """
+        unknown = {'bytes_uploaded': None, 'bytes_skipped': None}
+        try:
+            if manifest is None:
+                raw, _, _ = self._get_registry_client().get_manifest(repository, tag)
+                manifest = json.loads(raw)
+            details = self.docker.inspect_image(image_ref)
+            if not details:
+                return unknown
+            diff_ids = details.get('RootFS', {}).get('Layers') or []
+        except (RegistryError, ValueError) as e:
+            logger.debug(f"Could not determine pushed bytes for {image_ref}: {str(e)}")
+            return unknown
+        
+        layers = manifest.get('layers')
+        if not layers or len(layers) != len(diff_ids):
+            return unknown
+        
+        uploaded = skipped = 0
+        for diff_id, layer in zip(diff_ids, layers):
+            if diff_id.split(':')[-1][:12] in pushed_layers:
+                uploaded += layer.get('size', 0)
+            else:
+                skipped += layer.get('size', 0)
+        return {'bytes_uploaded': uploaded, 'bytes_skipped': skipped}
+    
+    def deploy_to_kubernetes(self, cloud_provider: str = 'vultr',
+                             log_sink: Optional[Callable[[str], None]] = None,
+                             prune: Optional[bool] = None, force: bool = False) -> Dict[str, Any]:
         """
         Deploy components to Kubernetes.
         
+        Only objects whose rendered manifests changed since the last deploy to
+        the cluster are applied (server-side apply).
+        
         Args:
             cloud_provider: Cloud provider to deploy to
+            log_sink: Optional callable receiving kubectl output line by line
+            prune: Delete objects no longer rendered, defaults to `kubernetes.prune`
+            force: Apply all objects even if unchanged
             
         Returns:
             Dict containing deployment results
         """
         logger.info(f"Deploying to Kubernetes on {cloud_provider}")
         
+        kubernetes_config = self.config.get('kubernetes', {})
+        target = {
+            'cloud_provider': cloud_provider,
+            'context': kubernetes_config.get('context'),
+            'kubeconfig': kubernetes_config.get('kubeconfig')
+        }
+        return self._deploy_target(kubernetes_config.get('context') or cloud_provider, target,
+                                   log_sink=log_sink, prune=prune, force=force)
+    
+    def _resolve_cluster(self, name: str, cloud_provider: str = 'vultr') -> Dict[str, Any]:
+        """
+        Resolve a cluster name to its deploy target.
+        
+        Names not listed under `clusters` in configuration are used as kube
+        contexts directly.
+        
+        Args:
+            name: Cluster name or kube context
+            cloud_provider: Cloud provider for clusters that do not set one
+            
+        Returns:
+            Dict containing context, kubeconfig, cloud_provider and kustomize_path
+        """
+        cluster_config = (self.config.get('clusters') or {}).get(name) or {}
+        return {
+            'context': cluster_config.get('context', name),
+            'kubeconfig': cluster_config.get('kubeconfig', self.config.get('kubernetes', {}).get('kubeconfig')),
+            'cloud_provider': cluster_config.get('cloud_provider', cloud_provider),
+            'kustomize_path': cluster_config.get('kustomize_path')
+        }
+    
+    def _deploy_target(self, cluster: str, target: Dict[str, Any],
+                       log_sink: Optional[Callable[[str], None]] = None,
+                       prune: Optional[bool] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Deploy the manifests of a target to one cluster.
+        
+        Args:
+            cluster: Cluster name the last-applied index is kept under
+            target: Deploy target (see _resolve_cluster)
+            log_sink: Optional callable receiving kubectl output line by line
+            prune: Delete objects no longer rendered, defaults to `kubernetes.prune`
+            force: Apply all objects even if unchanged
+            
+        Returns:
+            Dict containing deployment results
+        """
+        cloud_provider = target.get('cloud_provider', 'vultr')
         try:
             # Apply Kubernetes configuration
-            kustomize_path = f"kubernetes/cloud-providers/{cloud_provider}/"
+            kustomize_path = target.get('kustomize_path') or f"kubernetes/cloud-providers/{cloud_provider}/"
             
             # Check if kustomize path exists
             if not os.path.exists(kustomize_path):
                 logger.error(f"Kustomize path not found: {kustomize_path}")
                 return {'status': 'error', 'message': f"Kustomize path not found: {kustomize_path}"}
             
-            # Run kubectl apply
-            cmd = ['kubectl', 'apply', '-k', kustomize_path]
+            if prune is None:
+                prune = bool(self.config.get('kubernetes', {}).get('prune', False))
+            kube_args = []
+            if target.get('kubeconfig'):
+                kube_args.extend(['--kubeconfig', target['kubeconfig']])
+            if target.get('context'):
+                kube_args.extend(['--context', target['context']])
             
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-            stdout, stderr = process.communicate()
+            # Apply changed objects only, one deploy per cluster at a time
+            with self._cluster_locks.lock(cluster):
+                deploy_started = time.monotonic()
+                result = self.deploy_engine.deploy(kustomize_path, cluster, kube_args=kube_args,
+                                                   prune=prune, force=force, log_sink=log_sink)
+                metrics.DEPLOY_DURATION.labels(cluster, result['status']).observe(time.monotonic() - deploy_started)
             
-            if process.returncode != 0:
-                logger.error(f"Failed to deploy to Kubernetes: {stderr}")
-                return {
-                    'status': 'error',
-                    'returncode': process.returncode,
-                    'stdout': stdout,
-                    'stderr': stderr
-                }
+            if result['status'] != 'success':
+                logger.error(f"Failed to deploy to {cluster}: {len(result['failed'])} objects failed")
+                return dict(result, cloud_provider=cloud_provider)
             
-            logger.info(f"Successfully deployed to Kubernetes on {cloud_provider}")
-            return {
-                'status': 'success',
-                'cloud_provider': cloud_provider,
-                'deployment_time': datetime.datetime.now().isoformat(),
-                'kubectl_output': stdout
-            }
+            logger.info(f"Successfully deployed to {cluster} on {cloud_provider}")
+            return dict(
+                result,
+                cloud_provider=cloud_provider,
+                deployment_time=datetime.datetime.now().isoformat()
+            )
         except Exception as e:
-            logger.error(f"Error deploying to Kubernetes: {str(e)}")
+            logger.error(f"Error deploying to {cluster}: {str(e)}")
+            return {'status': 'error', 'message': str(e)}
+    
+    def deploy_to_clusters(self, clusters: List[str], cloud_provider: str = 'vultr',
+                           strategy: Optional[str] = None,
+                           log_sink: Optional[Callable[[str], None]] = None,
+                           prune: Optional[bool] = None, force: bool = False,
+                           on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Deploy to several clusters concurrently.
+        
+        Args:
+            clusters: Cluster names (from `clusters` configuration) or kube contexts
+            cloud_provider: Cloud provider for clusters that do not set one
+            strategy: parallel, rolling or canary, defaults to `rollout.strategy`
+            log_sink: Optional callable receiving kubectl output, prefixed with the cluster name
+            prune: Delete objects no longer rendered, defaults to `kubernetes.prune`
+            force: Apply all objects even if unchanged
+            on_result: Optional callable invoked with each cluster result as it completes
+            
+        Returns:
+            Dict containing overall status, per-cluster results and timings
+        """
+        clusters = list(dict.fromkeys(clusters))
+        rollout_config = self.config.get('rollout') or {}
+        strategy = strategy or rollout_config.get('strategy', 'parallel')
+        logger.info(f"Deploying to clusters {', '.join(clusters)} ({strategy})")
+        
+        def deploy(cluster: str) -> Dict[str, Any]:
+            cluster_sink = None
+            if log_sink:
+                cluster_sink = lambda line: log_sink(f"[{cluster}] {line}")
+            return self._deploy_target(cluster, self._resolve_cluster(cluster, cloud_provider),
+                                       log_sink=cluster_sink, prune=prune, force=force)
+        
+        try:
+            return run_rollout(
+                clusters, deploy, strategy=strategy,
+                canary=rollout_config.get('canary'),
+                wave_size=rollout_config.get('wave_size', 1),
+                max_workers=rollout_config.get('max_parallel_clusters'),
+                on_result=on_result
+            )
+        except ValueError as e:
+            return {'status': 'error', 'message': str(e)}
+    
+    def roll_out_component(self, component_name: str, image: str, clusters: Optional[List[str]] = None,
+                           log_sink: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Roll out a new image of a component by patching its Deployment.
+        
+        The Deployment defaults to the component name and can be set with
+        `deployment` (and `container`, `namespace`) in the component config.
+        
+        Args:
+            component_name: Name of the component
+            image: Image reference to roll out
+            clusters: Optional clusters to roll out to, defaults to the configured context
+            log_sink: Optional callable receiving kubectl output line by line
+            
+        Returns:
+            Dict containing rollout result per cluster
+        """
+        component = self.components.get(component_name, {})
+        pipeline_config = self.config.get('pipeline') or {}
+        deployment = component.get('deployment', component_name)
+        container = component.get('container', '*')
+        namespace = self._component_namespace(component_name)
+        targets = self._rollout_targets(clusters)
+        
+        def roll_out(cluster: str, target: Dict[str, Any]) -> Dict[str, Any]:
+            kube_args = self._kube_args(namespace, target)
+            cmd = ['kubectl', 'set', 'image', f"deployment/{deployment}", f"{container}={image}"] + kube_args
+            # Serialized with deploys and other rollouts to the cluster, so the last one wins
+            with self._cluster_locks.lock(cluster):
+                returncode, stdout, stderr = self._run_command(cmd, log_sink=log_sink)
+            if returncode == 0 and pipeline_config.get('wait_for_rollout', False):
+                timeout = pipeline_config.get('rollout_timeout', 300)
+                cmd = ['kubectl', 'rollout', 'status', f"deployment/{deployment}", f"--timeout={timeout}s"] + kube_args
+                returncode, stdout, stderr = self._run_command(cmd, log_sink=log_sink)
+            
+            if returncode != 0:
+                logger.error(f"Failed to roll out {component_name} to {cluster}: {stderr}")
+                return {'status': 'error', 'returncode': returncode, 'stderr': stderr}
+            return {'status': 'success', 'output': stdout}
+        
+        logger.info(f"Rolling out {image} to deployment/{deployment} on {', '.join(targets)}")
+        if len(targets) == 1:
+            results = {cluster: roll_out(cluster, target) for cluster, target in targets.items()}
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(targets)) as executor:
+                futures = {cluster: executor.submit(roll_out, cluster, target) for cluster, target in targets.items()}
+                results = {cluster: future.result() for cluster, future in futures.items()}
+        
+        failed = [cluster for cluster, result in results.items() if result['status'] != 'success']
+        return {
+            'status': 'error' if failed else 'success',
+            'image': image,
+            'deployment': deployment,
+            'namespace': namespace,
+            'clusters': results
+        }
+    
+    def _rollout_targets(self, clusters: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve the clusters a component rollout goes to.
+        
+        Args:
+            clusters: Optional cluster names, defaults to the configured context
+            
+        Returns:
+            Dict mapping cluster names to their context and kubeconfig
+        """
+        if clusters:
+            return {cluster: self._resolve_cluster(cluster) for cluster in clusters}
+        kubernetes_config = self.config.get('kubernetes', {})
+        return {kubernetes_config.get('context') or 'default': {
+            'context': kubernetes_config.get('context'),
+            'kubeconfig': kubernetes_config.get('kubeconfig')
+        }}
+    
+    def _component_namespace(self, component_name: str) -> str:
+        """Get the namespace of a component's Deployment."""
+        namespace = self.config.get('kubernetes', {}).get('namespace', 'singularity-system')
+        return self.components.get(component_name, {}).get('namespace', namespace)
+    
+    @staticmethod
+    def _kube_args(namespace: str, target: Dict[str, Any]) -> List[str]:
+        """Get the kubectl namespace, kubeconfig and context arguments for a rollout target."""
+        kube_args = ['-n', namespace]
+        if target.get('kubeconfig'):
+            kube_args.extend(['--kubeconfig', target['kubeconfig']])
+        if target.get('context'):
+            kube_args.extend(['--context', target['context']])
+        return kube_args
+    
+    def deployed_build(self, component_name: str, cluster: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the build a component's Deployment currently runs.
+        
+        The image is read from the live Deployment. A digest reference is
+        looked up in the build ledger directly; a tag reference resolves to the
+        most recent published build carrying that tag.
+        
+        Args:
+            component_name: Name of the component
+            cluster: Cluster to read the Deployment from, defaults to the configured context
+            
+        Returns:
+            Ledger entry of the deployed build, or None if it cannot be determined
+        """
+        component = self.components.get(component_name, {})
+        deployment = component.get('deployment', component_name)
+        container = component.get('container', '*')
+        registry_url = self.config.get('registry', {}).get('url', 'localhost:5000')
+        image_name = f"{registry_url}/{component.get('repository', component_name)}"
+        target = next(iter(self._rollout_targets([cluster] if cluster else None).values()))
+        
+        cmd = ['kubectl', 'get', f"deployment/{deployment}", '-o',
+               'jsonpath={range .spec.template.spec.containers[*]}{.name}{"\\t"}{.image}{"\\n"}{end}']
+        cmd += self._kube_args(self._component_namespace(component_name), target)
+        returncode, stdout, stderr = self._run_command(cmd)
+        if returncode != 0:
+            logger.warning(f"Failed to read the image of deployment/{deployment}: {stderr.strip()}")
+            return None
+        
+        for line in stdout.splitlines():
+            name, _, image = line.partition('\t')
+            reference, _, digest = image.strip().partition('@')
+            if container != '*' and name != container:
+                continue
+            if reference != image_name and not reference.startswith(f"{image_name}:"):
+                continue
+            if digest:
+                builds = self.build_ledger.query(component=component_name, status=STATUS_SUCCESS, digest=digest,
+                                                 limit=1)
+                return builds[0] if builds else None
+            tag = reference[len(image_name) + 1:] or 'latest'
+            for build in self.build_ledger.query(component=component_name, status=STATUS_SUCCESS,
+                                                 limit=MAX_QUERY_LIMIT):
+                if tag in build['tags'] and build['digest']:
+                    return build
+            return None
+        logger.warning(f"No container of deployment/{deployment} runs an image of {image_name}")
+        return None
+    
+    def build_and_deploy_pipelined(self, component_names: List[str], clusters: Optional[List[str]] = None,
+                                   on_failure: Optional[str] = None, force: bool = False,
+                                   log_sink: Optional[Callable[[str], None]] = None,
+                                   build_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+                                   on_update: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Build components and roll each one out as soon as its image is pushed.
+        
+        Args:
+            component_names: Components to build and roll out
+            clusters: Optional clusters to roll out to, defaults to the configured context
+            on_failure: `abort` or `continue`, defaults to `pipeline.on_failure`
+            force: Rebuild components even if their build inputs are unchanged
+            log_sink: Optional callable receiving build and kubectl output line by line
+            build_fn: Optional callable replacing build_component, e.g. to add locking
+            on_update: Optional callable receiving per-component stage timings as they change
+            
+        Returns:
+            Dict containing build and rollout results and per-stage timings
+        """
+        pipeline_config = self.config.get('pipeline') or {}
+        if build_fn is None:
+            build_fn = lambda name: self.build_component(name, log_sink=log_sink, force=force)
+        
+        def rollout(name: str, build_result: Dict[str, Any]) -> Dict[str, Any]:
+            return self.roll_out_component(name, build_result['image'], clusters=clusters, log_sink=log_sink)
+        
+        try:
+            pipeline = BuildDeployPipeline(
+                self.components, build_fn, rollout,
+                max_builds=(self.config.get('builder') or {}).get('max_parallel_builds', 4),
+                max_rollouts=pipeline_config.get('max_parallel_rollouts', 2),
+                on_failure=on_failure or pipeline_config.get('on_failure', 'abort'),
+                on_update=on_update
+            )
+        except ValueError as e:
             return {'status': 'error', 'message': str(e)}
+        return pipeline.run(component_names)
+    
+    def compare_build_profile(self, component_name: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compare a build profile with the profile of the build before it.
+        
+        Args:
+            component_name: Name of the component
+            profile: Build profile (see BuildProfiler.profile)
+            
+        Returns:
+            Comparison as returned by compare_profiles
+        """
+        recorded_at = profile.get('recorded_at') or ''
+        previous = next((entry for entry in self.build_profiles.history(component_name)
+                         if (entry.get('recorded_at') or '') < recorded_at), None)
+        return compare_profiles(profile, previous)
+    
+    def get_build_profiles(self, component_name: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get the recorded build profiles of a component.
+        
+        The latest profile is compared with the build before it.
+        
+        Args:
+            component_name: Name of the component
+            limit: Maximum number of profiles to return
+            
+        Returns:
+            Dict containing profiles (most recent first) and the comparison
+        """
+        if component_name not in self.components:
+            return {'status': 'error', 'message': f"Component not found: {component_name}"}
+        
+        profiles = self.build_profiles.history(component_name, limit=limit)
+        if not profiles:
+            return {'status': 'error', 'message': f"No build profile recorded for {component_name}"}
+        return {
+            'status': 'success',
+            'component': component_name,
+            'profiles': profiles,
+            'comparison': self.compare_build_profile(component_name, profiles[0])
+        }
+    
+    def get_builds(self, component_name: Optional[str] = None, status: Optional[str] = None,
+                   since: Optional[float] = None, until: Optional[float] = None,
+                   digest: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        """
+        Query the build ledger.
+        
+        Args:
+            component_name: Only builds of this component
+            status: Only builds with this ledger status
+            since: Only builds started at or after this time (seconds since the epoch)
+            until: Only builds started before this time (seconds since the epoch)
+            digest: Only builds that produced this manifest digest
+            limit: Maximum number of builds to return
+            
+        Returns:
+            Dict containing builds (most recent first)
+        """
+        builds = self.build_ledger.query(component=component_name, status=status, since=since, until=until,
+                                         digest=digest, limit=limit)
+        return {'status': 'success', 'builds': builds, 'count': len(builds)}
+    
+    def resolve_rollback(self, component_name: str, digest: Optional[str] = None,
+                         build_id: Optional[int] = None, clusters: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Find the published build a component should be rolled back to.
+        
+        Without a digest or build ID the target is the most recent published
+        build preceding the deployed one (see deployed_build) with a different
+        digest. If the deployed build cannot be determined, the latest
+        published build is assumed to be deployed.
+        
+        Args:
+            component_name: Name of the component
+            digest: Manifest digest to roll back to
+            build_id: Ledger ID of the build to roll back to
+            clusters: Clusters the rollback goes to; the deployed build is read
+                from the first one, defaulting to the configured context
+            
+        Returns:
+            Dict containing the ledger entry of the target build
+        """
+        if component_name not in self.components:
+            return {'status': 'error', 'message': f"Component not found: {component_name}"}
+        
+        if build_id is not None:
+            build = self.build_ledger.get(build_id)
+            if build is None or build['component'] != component_name:
+                return {'status': 'error', 'message': f"Build {build_id} of {component_name} not found"}
+        elif digest:
+            builds = self.build_ledger.query(component=component_name, status=STATUS_SUCCESS, digest=digest, limit=1)
+            build = builds[0] if builds else None
+            if build is None:
+                return {'status': 'error', 'message': f"No published build of {component_name} with digest {digest}"}
+        else:
+            deployed = self.deployed_build(component_name, clusters[0] if clusters else None)
+            if deployed is None:
+                deployed = self.build_ledger.last_good(component_name)
+            build = deployed and self.build_ledger.last_good(component_name, exclude_digest=deployed['digest'],
+                                                            before=deployed['started_at'])
+            if build is None:
+                return {'status': 'error', 'message': f"No previous published build of {component_name}"}
+        
+        if build['status'] != STATUS_SUCCESS or not build['digest'] or not build['image']:
+            return {'status': 'error', 'message': f"Build {build['id']} of {component_name} was not published"}
+        return {'status': 'success', 'build': build}
+    
+    def roll_back_component(self, component_name: str, digest: Optional[str] = None,
+                            build_id: Optional[int] = None, clusters: Optional[List[str]] = None,
+                            log_sink: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Re-point a component's Deployment to a previously built image, without rebuilding.
+        
+        The image is referenced by digest, so the rollout is immune to tags
+        having moved since the build.
+        
+        Args:
+            component_name: Name of the component
+            digest: Manifest digest to roll back to
+            build_id: Ledger ID of the build to roll back to
+            clusters: Optional clusters to roll out to, defaults to the configured context
+            log_sink: Optional callable receiving kubectl output line by line
+            
+        Returns:
+            Dict containing the target build and the rollout result per cluster
+        """
+        target = self.resolve_rollback(component_name, digest=digest, build_id=build_id, clusters=clusters)
+        if target['status'] != 'success':
+            return target
+        
+        build = target['build']
+        image = f"{build['image']}@{build['digest']}"
+        logger.info(f"Rolling back {component_name} to build {build['id']} ({image})")
+        result = self.roll_out_component(component_name, image, clusters=clusters, log_sink=log_sink)
+        result['build'] = build
+        return result
     
     def get_component_status(self, component_name: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -382,44 +1316,73 @@ class GenesisBuilder:
             return {'status': 'error', 'message': f"Component not found: {component_name}"}
         
         try:
-            # Check Docker images
-            components_to_check = [component_name] if component_name else self.components.keys()
+            components_to_check = [component_name] if component_name else list(self.components.keys())
+            ttl = float((self.config.get('builder') or {}).get('status_cache_ttl', 5))
+            now = time.monotonic()
             
             status = {}
-            for name in components_to_check:
-                component = self.components.get(name, {})
-                
-                # Skip status check for external components
-                if component.get('external', False):
-                    status[name] = {'status': 'external', 'message': 'External component'}
-                    continue
-                
-                repository = component.get('repository', name)
-                tag = component.get('tag', 'latest')
+            stale = []
+            with self._status_lock:
+                generation = self._status_generation
+                for name in components_to_check:
+                    cached = self._status_cache.get(name)
+                    if cached and cached[0] > now:
+                        status[name] = dict(cached[1])
+                    else:
+                        stale.append(name)
+            
+            if stale:
+                # One image list call covers every component, however many there are
+                local_images = None
                 registry_url = self.config.get('registry', {}).get('url', 'localhost:5000')
-                image_name = f"{registry_url}/{repository}:{tag}"
-                
-                # Check if image exists
-                cmd = ['docker', 'image', 'inspect', image_name]
-                
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    universal_newlines=True
-                )
-                process.communicate()
+                for name in stale:
+                    component = self.components.get(name, {})
+                    
+                    # Skip status check for external components
+                    if component.get('external', False):
+                        status[name] = {'status': 'external', 'message': 'External component'}
+                        continue
+                    
+                    if local_images is None:
+                        local_images = self.docker.list_images()
+                        if local_images is None:
+                            return {'status': 'error', 'message': 'Failed to list local images'}
+                    
+                    repository = component.get('repository', name)
+                    tag = component.get('tag', 'latest')
+                    image_name = f"{registry_url}/{repository}:{tag}"
+                    
+                    if image_name in local_images:
+                        status[name] = {'status': 'available', 'image': image_name}
+                    else:
+                        status[name] = {'status': 'not_built', 'image': image_name}
                 
-                if process.returncode == 0:
-                    status[name] = {'status': 'available', 'image': image_name}
-                else:
-                    status[name] = {'status': 'not_built', 'image': image_name}
+                expires_at = time.monotonic() + ttl
+                with self._status_lock:
+                    # Images listed before a build finished must not outlive its invalidation
+                    if generation == self._status_generation:
+                        for name in stale:
+                            self._status_cache[name] = (expires_at, dict(status[name]))
             
-            return status
+            return {name: status[name] for name in components_to_check}
         except Exception as e:
             logger.error(f"Error checking component status: {str(e)}")
             return {'status': 'error', 'message': str(e)}
     
+    def invalidate_component_status(self, component_name: Optional[str] = None):
+        """
+        Drop cached component status so the next status check queries Docker.
+        
+        Args:
+            component_name: Component to invalidate, all components if not given
+        """
+        with self._status_lock:
+            self._status_generation += 1
+            if component_name:
+                self._status_cache.pop(component_name, None)
+            else:
+                self._status_cache.clear()
+    
     def get_kubernetes_status(self, namespace: Optional[str] = None) -> Dict[str, Any]:
         """
         Get status of Kubernetes deployments.
@@ -434,69 +1397,35 @@ class GenesisBuilder:
             namespace = self.config.get('kubernetes', {}).get('namespace', 'singularity-system')
         
         try:
-            # Check if namespace exists
-            ns_cmd = ['kubectl', 'get', 'namespace', namespace]
-            
-            ns_process = subprocess.Popen(
-                ns_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-            ns_process.communicate()
-            
-            if ns_process.returncode != 0:
-                logger.error(f"Namespace not found: {namespace}")
-                return {'status': 'error', 'message': f"Namespace not found: {namespace}"}
-            
-            # Get deployments
-            deploy_cmd = ['kubectl', 'get', 'deployments', '-n', namespace, '-o', 'json']
-            
-            deploy_process = subprocess.Popen(
-                deploy_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-            deploy_stdout, deploy_stderr = deploy_process.communicate()
-            
-            if deploy_process.returncode != 0:
-                logger.error(f"Failed to get deployments: {deploy_stderr}")
-                return {
-                    'status': 'error',
-                    'returncode': deploy_process.returncode,
-                    'stderr': deploy_stderr
-                }
-            
-            # Get services
-            svc_cmd = ['kubectl', 'get', 'services', '-n', namespace, '-o', 'json']
-            
-            svc_process = subprocess.Popen(
-                svc_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-            svc_stdout, svc_stderr = svc_process.communicate()
-            
-            if svc_process.returncode != 0:
-                logger.error(f"Failed to get services: {svc_stderr}")
-                return {
-                    'status': 'error',
-                    'returncode': svc_process.returncode,
-                    'stderr': svc_stderr
-                }
-            
-            # Return raw output for now, would parse JSON in production
-            return {
-                'status': 'success',
-                'namespace': namespace,
-                'deployments': deploy_stdout,
-                'services': svc_stdout
-            }
+            return self._get_k8s_status_cache().get_status(namespace)
         except Exception as e:
             logger.error(f"Error checking Kubernetes status: {str(e)}")
             return {'status': 'error', 'message': str(e)}
+    
+    def close(self):
+        """Stop the background watches of the Kubernetes status cache."""
+        with self._status_lock:
+            k8s_status, self._k8s_status = self._k8s_status, None
+        if k8s_status is not None:
+            k8s_status.stop()
+    
+    def _get_k8s_status_cache(self) -> KubernetesStatusCache:
+        """
+        Get the Kubernetes status cache, creating it on first use.
+        
+        Returns:
+            Status cache watching namespaces as they are requested
+        """
+        with self._status_lock:
+            if self._k8s_status is None:
+                kubernetes_config = self.config.get('kubernetes', {})
+                self._k8s_status = KubernetesStatusCache(
+                    self._run_command,
+                    kubeconfig=kubernetes_config.get('kubeconfig'),
+                    context=kubernetes_config.get('context'),
+                    use_informers=kubernetes_config.get('watch_status', True)
+                )
+            return self._k8s_status
 
 
 # Example usage when run directly
@@ -513,7 +1442,7 @@ if __name__ == "__main__":
     if command == "build":
         # Build all components
         logger.info("Building all components")
-        results = builder.build_all_components()
+        results = builder.build_all_components(force='--force' in sys.argv[2:])
         print(yaml.dump(results, default_flow_style=False))
     elif command == "deploy":
         # Deploy to Kubernetes
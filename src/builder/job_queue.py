@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Job Queue - Bounded, prioritized execution of Genesis API operations
+
+This module implements a fixed-size worker pool fed by a bounded priority
+queue. When the queue is full, submissions are rejected so the API can apply
+backpressure instead of starting unbounded work on the host.
+"""
+
+import queue
+import logging
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger('genesis_queue')
+
+# Job priorities, lower values run first
+PRIORITY_DEPLOY = 0
+PRIORITY_BUILD_AND_DEPLOY = 1
+PRIORITY_BUILD = 2
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted to a full queue."""
+    
+    def __init__(self, message: str, retry_after: int):
+        """
+        Initialize the error.
+        
+        Args:
+            message: Error message
+            retry_after: Suggested number of seconds before retrying
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """
+    Bounded priority queue with a fixed pool of worker threads.
+    
+    Job state transitions are reported through the `on_state` callback with
+    the states `pending` (queued) and `running` (picked up by a worker).
+    """
+    
+    def __init__(self, workers: int = 4, max_size: int = 32,
+                 on_state: Optional[Callable[[str, str], None]] = None):
+        """
+        Initialize the job queue and start its workers.
+        
+        Args:
+            workers: Number of worker threads
+            max_size: Maximum number of queued (not yet running) jobs
+            on_state: Optional callback invoked with (job_id, state)
+        """
+        self.workers = max(1, int(workers))
+        self.max_size = max(1, int(max_size))
+        self.on_state = on_state
+        
+        self._queue = queue.PriorityQueue(maxsize=self.max_size)
+        self._sequence = itertools.count()
+        self._running = 0
+        self._running_lock = threading.Lock()
+        # Moving average of job duration, used to estimate Retry-After
+        self._avg_duration = 30.0
+        
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"genesis-worker-{index}")
+            thread.daemon = True
+            thread.start()
+        
+        logger.info(f"Job queue started with {self.workers} workers and capacity {self.max_size}")
+    
+    def submit(self, job_id: str, fn: Callable[..., Any], *args: Any, priority: int = PRIORITY_BUILD):
+        """
+        Queue a job for execution.
+        
+        Args:
+            job_id: ID of the job (operation ID)
+            fn: Callable to run
+            *args: Arguments passed to the callable
+            priority: Job priority, lower values run first
+        
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        # Only accepted jobs become pending; workers wait for that report so it never follows 'running'
+        reported = threading.Event()
+        try:
+            self._queue.put_nowait((priority, next(self._sequence), job_id, fn, args, reported))
+        except queue.Full:
+            retry_after = self.retry_after()
+            logger.warning(f"Job queue full, rejecting job {job_id} (retry after {retry_after}s)")
+            raise QueueFullError('Job queue is full', retry_after)
+        try:
+            self._notify(job_id, 'pending')
+        finally:
+            reported.set()
+    
+    def depth(self) -> int:
+        """
+        Get the number of queued jobs waiting for a worker.
+        
+        Returns:
+            Number of pending jobs
+        """
+        return self._queue.qsize()
+    
+    def running(self) -> int:
+        """
+        Get the number of jobs currently being executed.
+        
+        Returns:
+            Number of running jobs
+        """
+        with self._running_lock:
+            return self._running
+    
+    def retry_after(self) -> int:
+        """
+        Estimate how long a rejected client should wait before retrying.
+        
+        Returns:
+            Number of seconds until a queue slot is likely to free up
+        """
+        return max(1, int(self._avg_duration / self.workers))
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get queue statistics.
+        
+        Returns:
+            Dict containing queue depth, capacity and worker usage
+        """
+        return {
+            'depth': self.depth(),
+            'capacity': self.max_size,
+            'running': self.running(),
+            'workers': self.workers
+        }
+    
+    def _notify(self, job_id: str, state: str):
+        """
+        Report a job state transition.
+        
+        Args:
+            job_id: ID of the job
+            state: New state of the job
+        """
+        if self.on_state:
+            try:
+                self.on_state(job_id, state)
+            except Exception as e:
+                logger.error(f"Error reporting state {state} for job {job_id}: {str(e)}")
+    
+    def _worker(self):
+        """Worker loop executing queued jobs."""
+        while True:
+            _, _, job_id, fn, args, reported = self._queue.get()
+            reported.wait()
+            with self._running_lock:
+                self._running += 1
+            started = time.monotonic()
+            try:
+                self._notify(job_id, 'running')
+                fn(*args)
+            except Exception as e:
+                logger.error(f"Error in job {job_id}: {str(e)}")
+            finally:
+                duration = time.monotonic() - started
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+                with self._running_lock:
+                    self._running -= 1
+                self._queue.task_done()
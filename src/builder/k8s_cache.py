@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Kubernetes Status Cache - Watch-based Kubernetes status for Genesis Builder
+
+This module keeps trimmed summaries of the deployments and services of each
+watched namespace in memory. Informers list the resources once and then
+follow a watch, so status requests are answered from memory instead of
+spawning kubectl. Without the kubernetes client, status falls back to a
+single parsed `kubectl get deployments,services` call.
+"""
+
+import json
+import time
+import random
+import logging
+import threading
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+# The kubernetes package takes long to import; it is imported on first use (see _import_kubernetes)
+k8s_client = k8s_config = k8s_watch = ApiException = None
+
+logger = logging.getLogger('genesis_k8s')
+
+# Seconds a watch request stays open before it is renewed from the last resource version
+WATCH_TIMEOUT = 300
+# Seconds a status request waits for the initial list of a new namespace
+SYNC_TIMEOUT = 5
+# Maximum delay between reconnect attempts after watch errors
+MAX_BACKOFF = 30
+
+
+def _import_kubernetes() -> bool:
+    """
+    Import the kubernetes package on first use.
+    
+    Returns:
+        True if the package is installed
+    """
+    global k8s_client, k8s_config, k8s_watch, ApiException
+    if k8s_client is None:
+        try:
+            from kubernetes import client, config, watch
+            from kubernetes.client.rest import ApiException as api_exception
+        except ImportError:
+            return False
+        k8s_client, k8s_config, k8s_watch, ApiException = client, config, watch, api_exception
+    return True
+
+
+def summarize_deployment(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Trim a Deployment to the fields shown in status.
+    
+    Args:
+        obj: Deployment as returned by the API server (camelCase JSON)
+    
+    Returns:
+        Dict containing replica counts, images and conditions
+    """
+    metadata = obj.get('metadata') or {}
+    spec = obj.get('spec') or {}
+    status = obj.get('status') or {}
+    containers = ((spec.get('template') or {}).get('spec') or {}).get('containers') or []
+    return {
+        'name': metadata.get('name'),
+        'replicas': {
+            'desired': spec.get('replicas', 1),
+            'ready': status.get('readyReplicas', 0),
+            'updated': status.get('updatedReplicas', 0),
+            'available': status.get('availableReplicas', 0)
+        },
+        'images': [container.get('image') for container in containers],
+        'generation': metadata.get('generation'),
+        'observed_generation': status.get('observedGeneration'),
+        'conditions': [
+            {
+                'type': condition.get('type'),
+                'status': condition.get('status'),
+                'reason': condition.get('reason'),
+                'message': condition.get('message')
+            }
+            for condition in status.get('conditions') or []
+        ]
+    }
+
+
+def summarize_service(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Trim a Service to the fields shown in status.
+    
+    Args:
+        obj: Service as returned by the API server (camelCase JSON)
+    
+    Returns:
+        Dict containing type, addresses and ports
+    """
+    metadata = obj.get('metadata') or {}
+    spec = obj.get('spec') or {}
+    ingress = ((obj.get('status') or {}).get('loadBalancer') or {}).get('ingress') or []
+    return {
+        'name': metadata.get('name'),
+        'type': spec.get('type', 'ClusterIP'),
+        'cluster_ip': spec.get('clusterIP'),
+        'external': [entry.get('ip') or entry.get('hostname') for entry in ingress],
+        'ports': [
+            {
+                'name': port.get('name'),
+                'port': port.get('port'),
+                'target_port': port.get('targetPort'),
+                'node_port': port.get('nodePort'),
+                'protocol': port.get('protocol', 'TCP')
+            }
+            for port in spec.get('ports') or []
+        ]
+    }
+
+
+SUMMARIZERS = {
+    'Deployment': summarize_deployment,
+    'Service': summarize_service
+}
+
+
+class Informer:
+    """
+    Keeps the summaries of one resource kind in one namespace current.
+    
+    The informer lists the resources, then watches from the list's resource
+    version. Expired resource versions (410 Gone) trigger a relist; other
+    errors are retried with exponential backoff.
+    """
+    
+    def __init__(self, kind: str, namespace: str, list_fn: Callable, on_change: Callable[[], None]):
+        """
+        Initialize the informer.
+        
+        Args:
+            kind: Resource kind (a key of SUMMARIZERS)
+            namespace: Namespace to watch
+            list_fn: Namespaced list function of the kubernetes client
+            on_change: Callable invoked after every change
+        """
+        self.kind = kind
+        self.namespace = namespace
+        self.list_fn = list_fn
+        self.on_change = on_change
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.synced = threading.Event()
+        self.last_error: Optional[str] = None
+        self._resource_version: Optional[str] = None
+        self._stop = threading.Event()
+        self._watch = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"informer-{namespace}-{kind}", daemon=True)
+    
+    def start(self):
+        """Start listing and watching in a background thread."""
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop watching and wait for the background thread to exit.
+        
+        Args:
+            timeout: Maximum number of seconds to wait for the thread
+        """
+        self._stop.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # Closed again on every pass, as a watch may have been opened right after the previous one
+            self._close_watch()
+            if not self._thread.is_alive() or self._thread is threading.current_thread():
+                return
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return
+            self._thread.join(0.1 if remaining is None else min(0.1, remaining))
+    
+    def _close_watch(self):
+        """Unblock a watch waiting for its next event instead of waiting for WATCH_TIMEOUT."""
+        watch = self._watch
+        if watch is None:
+            return
+        watch.stop()
+        response = getattr(watch, '_resp', None)
+        shutdown = getattr(response, 'shutdown', None) or getattr(response, 'close', None)
+        if shutdown is not None:
+            try:
+                shutdown()
+            except Exception as e:
+                logger.debug(f"Failed to close watch of {self.kind} in {self.namespace}: {str(e)}")
+    
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is alive."""
+        return self._thread.is_alive()
+    
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Get the current summaries.
+        
+        Returns:
+            List of summaries sorted by name
+        """
+        with self._lock:
+            return [self.items[name] for name in sorted(self.items)]
+    
+    def _list(self):
+        """List all resources and replace the stored summaries."""
+        response = self.list_fn(self.namespace, _preload_content=False)
+        data = json.loads(response.data)
+        summarize = SUMMARIZERS[self.kind]
+        items = {}
+        for obj in data.get('items') or []:
+            summary = summarize(obj)
+            items[summary['name']] = summary
+        with self._lock:
+            self.items = items
+        self._resource_version = (data.get('metadata') or {}).get('resourceVersion')
+        self.synced.set()
+        self.on_change()
+    
+    def _apply_event(self, event_type: str, obj: Dict[str, Any]):
+        """Apply one watch event to the stored summaries."""
+        metadata = obj.get('metadata') or {}
+        if metadata.get('resourceVersion'):
+            self._resource_version = metadata['resourceVersion']
+        if event_type == 'BOOKMARK':
+            return
+        
+        name = metadata.get('name')
+        with self._lock:
+            if event_type == 'DELETED':
+                self.items.pop(name, None)
+            else:
+                self.items[name] = SUMMARIZERS[self.kind](obj)
+        self.on_change()
+    
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                if self._resource_version is None:
+                    self._list()
+                
+                self._watch = k8s_watch.Watch()
+                for event in self._watch.stream(self.list_fn, self.namespace,
+                                                resource_version=self._resource_version,
+                                                allow_watch_bookmarks=True,
+                                                timeout_seconds=WATCH_TIMEOUT):
+                    if self._stop.is_set():
+                        break
+                    raw = event.get('raw_object') or {}
+                    if event.get('type') == 'ERROR':
+                        if raw.get('code') == 410:
+                            logger.info(f"Resource version expired for {self.kind} in {self.namespace}, relisting")
+                            self._resource_version = None
+                            break
+                        raise RuntimeError(raw.get('message', 'watch error'))
+                    self._apply_event(event['type'], raw)
+                self.last_error = None
+                backoff = 1
+            except ApiException as e:
+                if self._stop.is_set():
+                    break
+                if e.status == 410:
+                    self._resource_version = None
+                    continue
+                self._retry_after_error(f"{e.status} {e.reason}", backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                self._retry_after_error(str(e), backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+    
+    def _retry_after_error(self, message: str, backoff: float):
+        """Record a watch error and wait before reconnecting."""
+        self.last_error = message
+        logger.warning(f"Watch of {self.kind} in {self.namespace} failed: {message}, retrying in {backoff}s")
+        # Events may have been missed, start over from a fresh list
+        self._resource_version = None
+        self._stop.wait(backoff + random.uniform(0, backoff / 2))
+
+
+class KubernetesStatusCache:
+    """
+    Serves deployment and service status per namespace from informers.
+    
+    Namespaces are watched from their first status request on. Summaries of
+    a namespace are rendered once per change, so requests between changes
+    return the same prebuilt result.
+    """
+    
+    def __init__(self, run_command: Callable[..., Tuple[int, str, str]], kubeconfig: Optional[str] = None,
+                 context: Optional[str] = None, use_informers: bool = True, api_client: Any = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            run_command: Command runner used for the kubectl fallback
+            kubeconfig: Optional kubeconfig path
+            context: Optional kubeconfig context
+            use_informers: Watch with the kubernetes client when it is available
+            api_client: Optional configured kubernetes ApiClient, instead of
+                loading in-cluster configuration or the kubeconfig
+        """
+        self.run_command = run_command
+        self.kubeconfig = kubeconfig
+        self.context = context
+        self._api_client = None
+        self._informers: Dict[str, Tuple[Informer, Informer]] = {}
+        self._rendered: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.source = 'kubectl'
+        
+        if use_informers and _import_kubernetes():
+            try:
+                self._api_client = api_client or self._load_api_client()
+                self.source = 'watch'
+            except Exception as e:
+                logger.warning(f"Kubernetes client configuration failed ({str(e)}), using kubectl for status")
+        elif use_informers:
+            logger.info("kubernetes package not installed, using kubectl for status")
+    
+    def _load_api_client(self):
+        """Create an API client from in-cluster configuration or kubeconfig."""
+        if not self.kubeconfig and not self.context:
+            try:
+                k8s_config.load_incluster_config()
+                return k8s_client.ApiClient()
+            except k8s_config.ConfigException:
+                pass
+        return k8s_config.new_client_from_config(config_file=self.kubeconfig, context=self.context)
+    
+    def _informers_for(self, namespace: str) -> Tuple[Informer, Informer]:
+        """Get the informers of a namespace, starting them on first use."""
+        with self._lock:
+            informers = self._informers.get(namespace)
+            if informers is None:
+                apps = k8s_client.AppsV1Api(self._api_client)
+                core = k8s_client.CoreV1Api(self._api_client)
+                on_change = lambda: self._invalidate(namespace)
+                informers = (
+                    Informer('Deployment', namespace, apps.list_namespaced_deployment, on_change),
+                    Informer('Service', namespace, core.list_namespaced_service, on_change)
+                )
+                self._informers[namespace] = informers
+                for informer in informers:
+                    informer.start()
+            return informers
+    
+    def _invalidate(self, namespace: str):
+        with self._lock:
+            self._rendered.pop(namespace, None)
+    
+    def _namespace_exists(self, namespace: str) -> bool:
+        """Check a namespace once before watching it."""
+        try:
+            k8s_client.CoreV1Api(self._api_client).read_namespace(namespace, _preload_content=False)
+            return True
+        except ApiException as e:
+            if e.status == 404:
+                return False
+            raise
+    
+    def get_status(self, namespace: str) -> Dict[str, Any]:
+        """
+        Get deployment and service status of a namespace.
+        
+        Args:
+            namespace: Namespace to report on
+        
+        Returns:
+            Dict containing deployment and service summaries
+        """
+        if self._api_client is None:
+            return self._kubectl_status(namespace)
+        
+        with self._lock:
+            rendered = self._rendered.get(namespace)
+            watched = namespace in self._informers
+        if rendered is not None:
+            return rendered
+        
+        if not watched and not self._namespace_exists(namespace):
+            return {'status': 'error', 'message': f"Namespace not found: {namespace}"}
+        
+        deployments, services = self._informers_for(namespace)
+        deadline = time.monotonic() + SYNC_TIMEOUT
+        for informer in (deployments, services):
+            if not informer.synced.wait(max(0, deadline - time.monotonic())):
+                return {
+                    'status': 'error',
+                    'message': f"Timed out listing {informer.kind} objects in {namespace}: {informer.last_error}"
+                }
+        
+        with self._lock:
+            rendered = {
+                'status': 'success',
+                'namespace': namespace,
+                'source': 'watch',
+                'deployments': deployments.snapshot(),
+                'services': services.snapshot(),
+                'stale': bool(deployments.last_error or services.last_error)
+            }
+            if not rendered['stale']:
+                self._rendered[namespace] = rendered
+        return rendered
+    
+    def _kubectl_status(self, namespace: str) -> Dict[str, Any]:
+        """
+        Get status with one kubectl call, parsing its JSON output.
+        
+        Args:
+            namespace: Namespace to report on
+        
+        Returns:
+            Dict containing deployment and service summaries
+        """
+        cluster_args = []
+        if self.kubeconfig:
+            cluster_args.extend(['--kubeconfig', self.kubeconfig])
+        if self.context:
+            cluster_args.extend(['--context', self.context])
+        
+        cmd = ['kubectl', 'get', 'deployments,services', '-n', namespace, '-o', 'json'] + cluster_args
+        returncode, stdout, stderr = self.run_command(cmd, tail_lines=None)
+        if returncode != 0:
+            logger.error(f"Failed to get Kubernetes status: {stderr}")
+            return {'status': 'error', 'returncode': returncode, 'stderr': stderr}
+        
+        try:
+            items = json.loads(stdout).get('items') or []
+        except ValueError as e:
+            return {'status': 'error', 'message': f"Invalid kubectl output: {str(e)}"}
+        
+        # An empty list may mean the namespace does not exist, which kubectl does not report
+        if not items:
+            ns_cmd = ['kubectl', 'get', 'namespace', namespace] + cluster_args
+            ns_returncode, _, _ = self.run_command(ns_cmd)
+            if ns_returncode != 0:
+                logger.error(f"Namespace not found: {namespace}")
+                return {'status': 'error', 'message': f"Namespace not found: {namespace}"}
+        
+        deployments = [summarize_deployment(item) for item in items if item.get('kind') == 'Deployment']
+        services = [summarize_service(item) for item in items if item.get('kind') == 'Service']
+        return {
+            'status': 'success',
+            'namespace': namespace,
+            'source': 'kubectl',
+            'deployments': sorted(deployments, key=lambda item: item['name'] or ''),
+            'services': sorted(services, key=lambda item: item['name'] or '')
+        }
+    
+    def stop(self, timeout: float = 5):
+        """
+        Stop all informers and wait for their threads to exit.
+        
+        Namespaces requested afterwards are watched again from a fresh list.
+        
+        Args:
+            timeout: Maximum number of seconds to wait for each informer thread
+        """
+        with self._lock:
+            informers = [informer for pair in self._informers.values() for informer in pair]
+            self._informers.clear()
+            self._rendered.clear()
+        # Signal every informer first so their threads wind down in parallel
+        for informer in informers:
+            informer.stop(timeout=0)
+        for informer in informers:
+            informer.stop(timeout)
+        if any(informer.running for informer in informers):
+            logger.warning("Some Kubernetes informer threads did not stop in time")
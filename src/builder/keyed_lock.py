@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Keyed Lock - Fine-grained locking for Genesis operations
+
+This module provides a lock registry that hands out one lock per key, so
+operations only serialize against other operations touching the same
+component or deployment target.
+"""
+
+import time
+import logging
+import threading
+import contextlib
+from typing import Dict, Iterator, Hashable, List
+
+import metrics
+
+logger = logging.getLogger('genesis_locks')
+
+
+class KeyedLock:
+    """
+    Registry of locks keyed by the resource they protect.
+    
+    Locks are created lazily on first use and reference-counted by the
+    callers holding or waiting for them; a lock is dropped when its last
+    user leaves, so keys taken from requests (clusters, cloud providers) do
+    not accumulate.
+    """
+    
+    def __init__(self, name: str, label_keys: bool = True):
+        """
+        Initialize the lock registry.
+        
+        Args:
+            name: Name of the registry, used in log messages and metrics
+            label_keys: Label lock wait metrics with the key; only for registries
+                whose keys are validated against the configuration
+        """
+        self.name = name
+        self.label_keys = label_keys
+        # Key -> [lock, number of callers holding or waiting for it]
+        self._locks: Dict[Hashable, List] = {}
+        self._guard = threading.Lock()
+    
+    def _acquire_ref(self, key: Hashable) -> threading.Lock:
+        """
+        Get the lock for a key, creating it if necessary, and count the caller as a user.
+        
+        Args:
+            key: Resource key
+        
+        Returns:
+            Lock protecting the resource
+        """
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+            return entry[0]
+    
+    def _release_ref(self, key: Hashable):
+        """Stop counting the caller as a user of a key's lock, dropping the lock after its last user."""
+        with self._guard:
+            entry = self._locks[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+    
+    @contextlib.contextmanager
+    def lock(self, key: Hashable) -> Iterator[None]:
+        """
+        Hold the lock for a key for the duration of the context.
+        
+        The time spent waiting for the lock is recorded per registry, and per
+        key if the registry labels keys.
+        
+        Args:
+            key: Resource key
+        """
+        lock = self._acquire_ref(key)
+        try:
+            if lock.locked():
+                logger.info(f"Waiting for {self.name} lock: {key}")
+            started = time.monotonic()
+            with lock:
+                metrics.LOCK_WAIT.labels(self.name, str(key) if self.label_keys else '') \
+                    .observe(time.monotonic() - started)
+                yield
+        finally:
+            self._release_ref(key)
+    
+    def __len__(self) -> int:
+        with self._guard:
+            return len(self._locks)
+
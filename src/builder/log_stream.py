@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Log Stream - Per-operation ring buffers for live build and deploy output
+
+This module keeps the most recent output lines of each operation in a
+bounded ring buffer. Lines are addressed by absolute offsets so HTTP clients
+can follow a log and resume from the last line they received.
+"""
+
+import logging
+import threading
+import collections
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger('genesis_logs')
+
+
+class LogBuffer:
+    """
+    Bounded ring buffer of output lines with absolute line offsets.
+    
+    Once more than `max_lines` lines have been written the oldest lines are
+    dropped; readers asking for a dropped offset continue from the oldest
+    line still held.
+    """
+    
+    def __init__(self, max_lines: int = 5000):
+        """
+        Initialize the buffer.
+        
+        Args:
+            max_lines: Maximum number of lines held
+        """
+        self._lines = collections.deque(maxlen=max(1, int(max_lines)))
+        # Offset of the next line to be written
+        self._end = 0
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    @classmethod
+    def from_text(cls, text: str, max_lines: int = 5000, start: int = 0) -> 'LogBuffer':
+        """
+        Create a closed buffer holding previously stored output.
+        
+        Args:
+            text: Stored output
+            max_lines: Maximum number of lines held
+            start: Offset of the first stored line, non-zero if older lines
+                had been dropped before the output was stored
+            
+        Returns:
+            Closed log buffer
+        """
+        buffer = cls(max_lines)
+        buffer._end = max(0, int(start))
+        for line in text.splitlines():
+            buffer.append(line)
+        buffer.close()
+        return buffer
+    
+    def append(self, line: str):
+        """
+        Append a line to the buffer and wake up waiting readers.
+        
+        Args:
+            line: Output line without trailing newline
+        """
+        with self._condition:
+            self._lines.append(line)
+            self._end += 1
+            self._condition.notify_all()
+    
+    def close(self):
+        """Mark the log as complete and wake up waiting readers."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+    
+    @property
+    def start(self) -> int:
+        """Offset of the oldest line still held."""
+        with self._condition:
+            return self._end - len(self._lines)
+    
+    @property
+    def closed(self) -> bool:
+        """Whether the producing operation has finished."""
+        return self._closed
+    
+    def read(self, offset: int = 0, limit: Optional[int] = None) -> Tuple[int, List[str], int]:
+        """
+        Read lines starting at an offset.
+        
+        Args:
+            offset: Offset of the first line to read
+            limit: Optional maximum number of lines to return
+        
+        Returns:
+            Tuple of (offset of first returned line, lines, next offset)
+        """
+        with self._condition:
+            start = self._end - len(self._lines)
+            offset = min(max(offset, start), self._end)
+            lines = list(self._lines)[offset - start:]
+            if limit is not None:
+                lines = lines[:limit]
+            return offset, lines, offset + len(lines)
+    
+    def wait(self, offset: int, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until lines beyond an offset are available or the log is closed.
+        
+        Args:
+            offset: Offset the reader has consumed up to
+            timeout: Maximum number of seconds to wait
+        
+        Returns:
+            True if new lines are available or the log is closed
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._end > offset or self._closed, timeout)
+    
+    def text(self) -> str:
+        """
+        Get the buffered lines as one string.
+        
+        Returns:
+            Buffered output joined by newlines, starting at offset `start`
+        """
+        with self._condition:
+            return '\n'.join(self._lines)
+
+
+class LogBufferRegistry:
+    """
+    Registry of log buffers keyed by operation ID.
+    
+    Buffers of finished operations are retained up to `max_closed` entries so
+    clients can still read them shortly after completion.
+    """
+    
+    def __init__(self, max_lines: int = 5000, max_closed: int = 50):
+        """
+        Initialize the registry.
+        
+        Args:
+            max_lines: Maximum number of lines held per buffer
+            max_closed: Maximum number of finished buffers retained
+        """
+        self.max_lines = max_lines
+        self.max_closed = max_closed
+        self._buffers: Dict[str, LogBuffer] = collections.OrderedDict()
+        self._lock = threading.Lock()
+    
+    def create(self, operation_id: str) -> LogBuffer:
+        """
+        Create the log buffer of an operation.
+        
+        Args:
+            operation_id: ID of operation
+        
+        Returns:
+            New log buffer
+        """
+        buffer = LogBuffer(self.max_lines)
+        with self._lock:
+            self._buffers[operation_id] = buffer
+            self._evict()
+        return buffer
+    
+    def get(self, operation_id: str) -> Optional[LogBuffer]:
+        """
+        Get the log buffer of an operation.
+        
+        Args:
+            operation_id: ID of operation
+        
+        Returns:
+            Log buffer, or None if the operation has no live buffer
+        """
+        with self._lock:
+            return self._buffers.get(operation_id)
+    
+    def _evict(self):
+        """Drop the oldest finished buffers beyond the limit. Caller must hold the lock."""
+        closed = [op_id for op_id, buffer in self._buffers.items() if buffer.closed]
+        for operation_id in closed[:max(0, len(closed) - self.max_closed)]:
+            del self._buffers[operation_id]
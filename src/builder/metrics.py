@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Metrics - Prometheus instrumentation for Genesis Builder and API
+
+This module defines the Prometheus metrics recorded on the build, push,
+deploy, subprocess, lock and HTTP hot paths. When `prometheus_client` is not
+installed the metrics are no-ops, so instrumented code never has to check.
+"""
+
+import logging
+from typing import Callable, Tuple
+
+try:
+    import prometheus_client
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    prometheus_client = None
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger('genesis_metrics')
+
+# Buckets for operations taking seconds to minutes (builds, pushes, deploys)
+OPERATION_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800)
+# Buckets for short latencies (process spawn, lock waits, HTTP requests)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Buckets for build context sizes in bytes (1 KiB to 16 GiB)
+SIZE_BUCKETS = tuple(1024 * 4 ** exponent for exponent in range(13))
+
+CONTENT_TYPE = prometheus_client.CONTENT_TYPE_LATEST if PROMETHEUS_AVAILABLE else 'text/plain; charset=utf-8'
+
+
+class _NoopMetric:
+    """Stand-in for Prometheus metrics when prometheus_client is not installed."""
+    
+    def labels(self, *args, **kwargs) -> '_NoopMetric':
+        return self
+    
+    def observe(self, value: float):
+        pass
+    
+    def inc(self, amount: float = 1):
+        pass
+    
+    def dec(self, amount: float = 1):
+        pass
+    
+    def set(self, value: float):
+        pass
+    
+    def set_function(self, fn: Callable[[], float]):
+        pass
+
+
+def _histogram(name: str, documentation: str, labelnames: Tuple[str, ...], buckets: Tuple[float, ...]):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return prometheus_client.Histogram(name, documentation, labelnames, buckets=buckets)
+
+
+def _gauge(name: str, documentation: str):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return prometheus_client.Gauge(name, documentation)
+
+
+BUILD_DURATION = _histogram('genesis_build_duration_seconds', 'Duration of image builds',
+                            ('component', 'status'), OPERATION_BUCKETS)
+PUSH_DURATION = _histogram('genesis_push_duration_seconds', 'Duration of image pushes (all tags)',
+                           ('component', 'status'), OPERATION_BUCKETS)
+DEPLOY_DURATION = _histogram('genesis_deploy_duration_seconds', 'Duration of deploys to one cluster',
+                             ('cluster', 'status'), OPERATION_BUCKETS)
+CONTEXT_BYTES = _histogram('genesis_build_context_bytes', 'Size of the build context sent to the daemon',
+                           ('component',), SIZE_BUCKETS)
+CONTEXT_PREP_DURATION = _histogram('genesis_build_context_prep_seconds',
+                                   'Time to list and index a build context',
+                                   ('component',), LATENCY_BUCKETS)
+SUBPROCESS_SPAWN = _histogram('genesis_subprocess_spawn_seconds', 'Time to start a subprocess',
+                              ('command',), LATENCY_BUCKETS)
+LOCK_WAIT = _histogram('genesis_lock_wait_seconds', 'Time spent waiting for keyed locks',
+                       ('lock', 'key'), LATENCY_BUCKETS)
+HTTP_REQUEST_DURATION = _histogram('genesis_http_request_duration_seconds', 'Duration of API requests',
+                                   ('method', 'route', 'status'), LATENCY_BUCKETS)
+
+QUEUE_DEPTH = _gauge('genesis_queue_depth', 'Operations waiting for a worker')
+RUNNING_OPERATIONS = _gauge('genesis_running_operations', 'Operations currently being executed')
+OPERATIONS_STORED = _gauge('genesis_operations_stored', 'Operations held in the operation store')
+
+
+def command_label(cmd) -> str:
+    """
+    Label a command by its program and subcommand, e.g. `docker build`.
+    
+    Args:
+        cmd: Command as passed to subprocess
+    
+    Returns:
+        Low-cardinality command label
+    """
+    program = str(cmd[0]).rsplit('/', 1)[-1] if cmd else ''
+    if len(cmd) > 1 and not str(cmd[1]).startswith('-'):
+        return f"{program} {cmd[1]}"
+    return program
+
+
+def render() -> bytes:
+    """
+    Render all registered metrics in the Prometheus text format.
+    
+    Returns:
+        Exposition text, empty if prometheus_client is not installed
+    """
+    if not PROMETHEUS_AVAILABLE:
+        return b''
+    return prometheus_client.generate_latest()
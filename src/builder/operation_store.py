@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Operation Store - Bounded, persistent storage for Genesis API operations
+
+This module implements the storage behind `/api/operations`. Records are kept
+in a bounded in-memory LRU tier with TTL eviction, optionally backed by a
+local SQLite database so history survives restarts. Large command output
+(docker and kubectl logs) is split out of the hot record and stored
+separately.
+"""
+
+import os
+import abc
+import json
+import time
+import sqlite3
+import logging
+import threading
+import collections
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger('genesis_operations')
+
+# Operation states after which a record no longer changes
+FINISHED_STATES = ('completed', 'failed')
+# Result fields holding command output that may grow large
+LOG_FIELDS = ('stdout', 'stderr', 'kubectl_output')
+# Number of trailing characters of an offloaded log kept in the hot record
+LOG_INLINE_LIMIT = 2048
+
+
+def _split_logs(value: Any, path: str, logs: Dict[str, str]) -> Any:
+    """
+    Move large log fields out of a record value.
+    
+    Args:
+        value: Record value to process
+        path: Dotted path of the value within the record
+        logs: Dict collecting offloaded logs keyed by path
+    
+    Returns:
+        Value with large log fields replaced by their tail
+    """
+    if not isinstance(value, dict):
+        return value
+    
+    result = {}
+    for key, item in value.items():
+        item_path = f"{path}.{key}" if path else key
+        if key in LOG_FIELDS and isinstance(item, str) and len(item) > LOG_INLINE_LIMIT:
+            logs[item_path] = item
+            result[key] = item[-LOG_INLINE_LIMIT:]
+        else:
+            result[key] = _split_logs(item, item_path, logs)
+    return result
+
+
+class OperationStore(abc.ABC):
+    """
+    Base class for operation stores.
+    
+    Records are plain dicts keyed by their `id`. Updates replace top-level
+    fields, so callers pass new values rather than mutating stored ones.
+    """
+    
+    @abc.abstractmethod
+    def create(self, record: Dict[str, Any]):
+        """
+        Store a new operation record.
+        
+        Args:
+            record: Operation record, must contain an `id`
+        """
+    
+    @abc.abstractmethod
+    def update(self, operation_id: str, **fields: Any) -> bool:
+        """
+        Update fields of an operation record.
+        
+        Args:
+            operation_id: ID of operation
+            **fields: Fields to set
+        
+        Returns:
+            True if the operation exists
+        """
+    
+    @abc.abstractmethod
+    def get(self, operation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an operation record.
+        
+        Args:
+            operation_id: ID of operation
+        
+        Returns:
+            Copy of the operation record, or None if not found
+        """
+    
+    @abc.abstractmethod
+    def delete(self, operation_id: str):
+        """
+        Delete an operation record and its logs.
+        
+        Args:
+            operation_id: ID of operation
+        """
+    
+    @abc.abstractmethod
+    def save_logs(self, operation_id: str, logs: Dict[str, str]):
+        """
+        Store full logs of an operation outside its record.
+        
+        Args:
+            operation_id: ID of operation
+            logs: Dict mapping log names to log text
+        """
+    
+    @abc.abstractmethod
+    def get_logs(self, operation_id: str) -> Dict[str, str]:
+        """
+        Get the full logs offloaded from an operation record.
+        
+        Args:
+            operation_id: ID of operation
+        
+        Returns:
+            Dict mapping record paths (e.g. `result.stdout`) to log text
+        """
+    
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Number of stored operations."""
+    
+    def __contains__(self, operation_id: str) -> bool:
+        return self.get(operation_id) is not None
+    
+    @staticmethod
+    def _prepare(fields: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Split large logs out of fields before storing them.
+        
+        Args:
+            fields: Record fields
+        
+        Returns:
+            Tuple of (fields for the hot record, offloaded logs)
+        """
+        logs = {}
+        prepared = _split_logs(fields, '', logs)
+        if logs:
+            prepared['logs'] = sorted(logs)
+        return prepared, logs
+
+
+class MemoryOperationStore(OperationStore):
+    """
+    Bounded in-memory operation store.
+    
+    Holds at most `max_entries` records in LRU order. Finished operations
+    expire `ttl` seconds after their last update; running operations are
+    never evicted while finished ones remain.
+    """
+    
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = 3600):
+        """
+        Initialize the store.
+        
+        Args:
+            max_entries: Maximum number of records kept in memory
+            ttl: Seconds after which finished operations expire, None to disable
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self._records = collections.OrderedDict()
+        self._logs: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+    
+    def create(self, record: Dict[str, Any]):
+        prepared, logs = self._prepare(record)
+        prepared['updated_at'] = time.time()
+        with self._lock:
+            self._records[record['id']] = prepared
+            self._logs[record['id']] = logs
+            self._evict()
+    
+    def update(self, operation_id: str, **fields: Any) -> bool:
+        prepared, logs = self._prepare(fields)
+        with self._lock:
+            record = self._records.get(operation_id)
+            if record is None:
+                return False
+            if 'logs' in prepared:
+                prepared['logs'] = sorted(set(record.get('logs', [])) | set(prepared['logs']))
+            record.update(prepared)
+            record['updated_at'] = time.time()
+            self._logs.setdefault(operation_id, {}).update(logs)
+            self._records.move_to_end(operation_id)
+            return True
+    
+    def get(self, operation_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(operation_id)
+            if record is None:
+                return None
+            if self._expired(record, time.time()):
+                self._remove(operation_id)
+                return None
+            self._records.move_to_end(operation_id)
+            return dict(record)
+    
+    def put(self, record: Dict[str, Any], logs: Optional[Dict[str, str]] = None):
+        """
+        Insert an already prepared record, e.g. one loaded from disk.
+        
+        Args:
+            record: Prepared operation record
+            logs: Optional offloaded logs of the record
+        """
+        with self._lock:
+            self._records[record['id']] = dict(record)
+            if logs is not None:
+                self._logs[record['id']] = logs
+            self._evict()
+    
+    def delete(self, operation_id: str):
+        with self._lock:
+            self._remove(operation_id)
+    
+    def save_logs(self, operation_id: str, logs: Dict[str, str]):
+        with self._lock:
+            if operation_id in self._records:
+                self._logs.setdefault(operation_id, {}).update(logs)
+    
+    def get_logs(self, operation_id: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._logs.get(operation_id, {}))
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+    
+    def _expired(self, record: Dict[str, Any], now: float) -> bool:
+        """Check whether a finished record has outlived the TTL."""
+        return (self.ttl is not None
+                and record.get('status') in FINISHED_STATES
+                and now - record.get('updated_at', now) > self.ttl)
+    
+    def _remove(self, operation_id: str):
+        """Remove a record and its logs. Caller must hold the lock."""
+        self._records.pop(operation_id, None)
+        self._logs.pop(operation_id, None)
+    
+    def _evict(self):
+        """Drop expired records and enforce capacity. Caller must hold the lock."""
+        now = time.time()
+        for operation_id in [op_id for op_id, record in self._records.items() if self._expired(record, now)]:
+            self._remove(operation_id)
+        
+        if len(self._records) <= self.max_entries:
+            return
+        
+        # Evict least recently used finished operations first
+        for operation_id in [op_id for op_id, record in self._records.items()
+                             if record.get('status') in FINISHED_STATES]:
+            if len(self._records) <= self.max_entries:
+                return
+            self._remove(operation_id)
+        
+        while len(self._records) > self.max_entries:
+            operation_id, _ = self._records.popitem(last=False)
+            self._logs.pop(operation_id, None)
+
+
+class SQLiteOperationStore(OperationStore):
+    """
+    Operation store persisted in a local SQLite database.
+    
+    A bounded MemoryOperationStore caches hot records in front of the
+    database; every write goes through to disk. Offloaded logs live in a
+    separate table and are only read when requested.
+    """
+    
+    # Number of inserts between purges of expired operations
+    PURGE_INTERVAL = 100
+    
+    def __init__(self, path: str, max_entries: int = 1000, ttl: Optional[float] = 7 * 24 * 3600):
+        """
+        Initialize the store and open the database.
+        
+        Args:
+            path: Path of the SQLite database file
+            max_entries: Maximum number of records cached in memory
+            ttl: Seconds after which finished operations are purged, None to disable
+        """
+        self.path = path
+        self.ttl = ttl
+        self._cache = MemoryOperationStore(max_entries=max_entries, ttl=None)
+        self._lock = threading.RLock()
+        self._inserts = 0
+        # Number of rows in the operations table, maintained by every insert and delete
+        self._count = 0
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS operations ('
+            'id TEXT PRIMARY KEY, status TEXT, updated_at REAL, record TEXT NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS operations_updated ON operations (status, updated_at)')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS operation_logs ('
+            'operation_id TEXT NOT NULL, path TEXT NOT NULL, content TEXT NOT NULL, '
+            'PRIMARY KEY (operation_id, path))'
+        )
+        self._db.commit()
+        self._count = self._db.execute('SELECT COUNT(*) FROM operations').fetchone()[0]
+        
+        self._recover_interrupted()
+        self._purge()
+        logger.info(f"Operation store opened at {path}")
+    
+    def _recover_interrupted(self):
+        """Mark operations left unfinished by a previous process as failed."""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT record FROM operations WHERE status NOT IN (?, ?)', FINISHED_STATES
+            ).fetchall()
+            for (data,) in rows:
+                record = json.loads(data)
+                record['status'] = 'failed'
+                record['error'] = 'Interrupted by API restart'
+                record['completed_at'] = record.get('completed_at') or time.strftime('%Y-%m-%dT%H:%M:%S')
+                self._write(record)
+            self._db.commit()
+        
+        if rows:
+            logger.warning(f"Marked {len(rows)} interrupted operations as failed")
+    
+    def _write(self, record: Dict[str, Any]):
+        """Write a record to the database. Caller must hold the lock."""
+        self._db.execute(
+            'INSERT OR REPLACE INTO operations (id, status, updated_at, record) VALUES (?, ?, ?, ?)',
+            (record['id'], record.get('status'), record.get('updated_at', time.time()), json.dumps(record))
+        )
+    
+    def _write_logs(self, operation_id: str, logs: Dict[str, str]):
+        """Write offloaded logs to the database. Caller must hold the lock."""
+        self._db.executemany(
+            'INSERT OR REPLACE INTO operation_logs (operation_id, path, content) VALUES (?, ?, ?)',
+            [(operation_id, path, content) for path, content in logs.items()]
+        )
+    
+    def create(self, record: Dict[str, Any]):
+        prepared, logs = self._prepare(record)
+        prepared['updated_at'] = time.time()
+        with self._lock:
+            exists = self._db.execute('SELECT 1 FROM operations WHERE id = ?', (record['id'],)).fetchone()
+            self._write(prepared)
+            self._write_logs(record['id'], logs)
+            self._db.commit()
+            self._cache.put(prepared)
+            self._count += 0 if exists else 1
+            self._inserts += 1
+            purge = self._inserts % self.PURGE_INTERVAL == 0
+        if purge:
+            self._purge()
+    
+    def update(self, operation_id: str, **fields: Any) -> bool:
+        prepared, logs = self._prepare(fields)
+        with self._lock:
+            record = self.get(operation_id)
+            if record is None:
+                return False
+            
+            if 'logs' in prepared:
+                prepared['logs'] = sorted(set(record.get('logs', [])) | set(prepared['logs']))
+            record.update(prepared)
+            record['updated_at'] = time.time()
+            
+            self._write(record)
+            self._write_logs(operation_id, logs)
+            self._db.commit()
+            self._cache.put(record)
+        return True
+    
+    def get(self, operation_id: str) -> Optional[Dict[str, Any]]:
+        record = self._cache.get(operation_id)
+        if record is not None:
+            return record
+        
+        with self._lock:
+            row = self._db.execute('SELECT record FROM operations WHERE id = ?', (operation_id,)).fetchone()
+        if row is None:
+            return None
+        
+        record = json.loads(row[0])
+        self._cache.put(record)
+        return dict(record)
+    
+    def delete(self, operation_id: str):
+        with self._lock:
+            deleted = self._db.execute('DELETE FROM operations WHERE id = ?', (operation_id,)).rowcount
+            self._db.execute('DELETE FROM operation_logs WHERE operation_id = ?', (operation_id,))
+            self._db.commit()
+            self._cache.delete(operation_id)
+            self._count -= deleted
+    
+    def save_logs(self, operation_id: str, logs: Dict[str, str]):
+        with self._lock:
+            self._write_logs(operation_id, logs)
+            self._db.commit()
+    
+    def get_logs(self, operation_id: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT path, content FROM operation_logs WHERE operation_id = ?', (operation_id,)
+            ).fetchall()
+        return dict(rows)
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def _purge(self):
+        """Delete finished operations older than the TTL."""
+        if self.ttl is None:
+            return
+        
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [row[0] for row in self._db.execute(
+                'SELECT id FROM operations WHERE status IN (?, ?) AND updated_at < ?',
+                FINISHED_STATES + (cutoff,)
+            )]
+            for operation_id in expired:
+                self._db.execute('DELETE FROM operations WHERE id = ?', (operation_id,))
+                self._db.execute('DELETE FROM operation_logs WHERE operation_id = ?', (operation_id,))
+                self._cache.delete(operation_id)
+            self._db.commit()
+            self._count -= len(expired)
+        
+        if expired:
+            logger.info(f"Purged {len(expired)} expired operations")
+
+
+def create_operation_store(backend: Optional[str] = None, path: Optional[str] = None) -> OperationStore:
+    """
+    Create the operation store configured through the environment.
+    
+    Args:
+        backend: Store backend (`memory` or `sqlite`), defaults to GENESIS_OPERATION_STORE
+        path: Database path for the SQLite backend, defaults to GENESIS_OPERATION_DB
+    
+    Returns:
+        Operation store instance
+    """
+    backend = backend or os.environ.get('GENESIS_OPERATION_STORE', 'sqlite')
+    max_entries = int(os.environ.get('GENESIS_OPERATION_CACHE_SIZE', 1000))
+    
+    if backend == 'sqlite':
+        state_dir = os.environ.get('GENESIS_STATE_DIR', '.genesis')
+        path = path or os.environ.get('GENESIS_OPERATION_DB', os.path.join(state_dir, 'operations.db'))
+        ttl = float(os.environ.get('GENESIS_OPERATION_TTL', 7 * 24 * 3600))
+        try:
+            return SQLiteOperationStore(path, max_entries=max_entries, ttl=ttl)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Failed to open operation store at {path}: {str(e)}")
+            logger.info("Falling back to in-memory operation store")
+    
+    ttl = float(os.environ.get('GENESIS_OPERATION_TTL', 3600))
+    return MemoryOperationStore(max_entries=max_entries, ttl=ttl)
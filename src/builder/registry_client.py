@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Registry Client - Minimal Docker Registry HTTP API v2 client
+
+This module implements the few registry calls Genesis Builder needs without
+going through the docker CLI: fetching a manifest and putting it under an
+additional tag, so extra tags of an image are published without uploading
+or even checking its blobs again.
+"""
+
+import re
+import json
+import time
+import base64
+import logging
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger('genesis_registry')
+
+# Manifest media types accepted when fetching manifests
+MANIFEST_MEDIA_TYPES = (
+    'application/vnd.docker.distribution.manifest.v2+json',
+    'application/vnd.docker.distribution.manifest.list.v2+json',
+    'application/vnd.oci.image.manifest.v1+json',
+    'application/vnd.oci.image.index.v1+json'
+)
+
+
+class RegistryError(Exception):
+    """Raised when a registry request fails."""
+
+
+class RegistryClient:
+    """
+    Client for the Docker Registry HTTP API v2.
+    
+    Supports anonymous access, basic auth and bearer token auth. Bearer
+    tokens are cached per scope until they expire.
+    """
+    
+    def __init__(self, url: str, username: Optional[str] = None, password: Optional[str] = None,
+                 insecure: Optional[bool] = None, timeout: float = 30):
+        """
+        Initialize the client.
+        
+        Args:
+            url: Registry host (and port), optionally prefixed with a scheme
+            username: Optional registry username
+            password: Optional registry password
+            insecure: Use plain HTTP; defaults to True for localhost registries
+            timeout: Request timeout in seconds
+        """
+        if '://' in url:
+            scheme, host = url.split('://', 1)
+        else:
+            host = url
+            if insecure is None:
+                insecure = host.split(':')[0] in ('localhost', '127.0.0.1')
+            scheme = 'http' if insecure else 'https'
+        self.base_url = f"{scheme}://{host.rstrip('/')}"
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+    
+    def _basic_auth(self) -> Optional[str]:
+        """Get the basic auth header value, if credentials are configured."""
+        if not (self.username and self.password):
+            return None
+        credentials = f"{self.username}:{self.password}".encode('utf-8')
+        return f"Basic {base64.b64encode(credentials).decode('ascii')}"
+    
+    def _fetch_token(self, challenge: str, scope: str) -> str:
+        """
+        Fetch a bearer token for a WWW-Authenticate challenge.
+        
+        Args:
+            challenge: Value of the WWW-Authenticate header
+            scope: Requested repository scope
+        
+        Returns:
+            Bearer token
+        """
+        params = dict(re.findall(r'(\w+)="([^"]*)"', challenge))
+        realm = params.pop('realm', None)
+        if not realm:
+            raise RegistryError(f"Unsupported auth challenge: {challenge}")
+        params['scope'] = scope
+        
+        request = urllib.request.Request(f"{realm}?{urllib.parse.urlencode(params)}")
+        basic = self._basic_auth()
+        if basic:
+            request.add_header('Authorization', basic)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read().decode('utf-8'))
+        except (OSError, ValueError) as e:
+            raise RegistryError(f"Token request to {realm} failed: {str(e)}")
+        
+        token = data.get('token') or data.get('access_token')
+        if not token:
+            raise RegistryError('Token endpoint returned no token')
+        expires_in = float(data.get('expires_in', 60))
+        with self._lock:
+            self._tokens[scope] = (token, time.monotonic() + expires_in - 5)
+        return token
+    
+    def _request(self, method: str, path: str, scope: str, body: Optional[bytes] = None,
+                 headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Send a registry request, authenticating on demand.
+        
+        Args:
+            method: HTTP method
+            path: Request path below /v2/
+            scope: Auth scope needed for the request
+            body: Optional request body
+            headers: Optional request headers
+        
+        Returns:
+            Tuple of (status code, response headers, response body)
+        """
+        url = f"{self.base_url}/v2/{path}"
+        authorization = None
+        with self._lock:
+            token = self._tokens.get(scope)
+        if token and token[1] > time.monotonic():
+            authorization = f"Bearer {token[0]}"
+        elif self._basic_auth():
+            authorization = self._basic_auth()
+        
+        for attempt in range(2):
+            request = urllib.request.Request(url, data=body, method=method, headers=dict(headers or {}))
+            if authorization:
+                request.add_header('Authorization', authorization)
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return response.status, dict(response.headers), response.read()
+            except urllib.error.HTTPError as e:
+                challenge = e.headers.get('WWW-Authenticate', '')
+                if e.code == 401 and attempt == 0 and challenge.lower().startswith('bearer'):
+                    authorization = f"Bearer {self._fetch_token(challenge, scope)}"
+                    continue
+                raise RegistryError(f"{method} {url} failed: {e.code} {e.read().decode('utf-8', 'replace')[:200]}")
+            except urllib.error.URLError as e:
+                raise RegistryError(f"{method} {url} failed: {e.reason}")
+            except OSError as e:
+                raise RegistryError(f"{method} {url} failed: {str(e)}")
+        
+        raise RegistryError(f"{method} {url} failed: authentication rejected")
+    
+    def get_manifest(self, repository: str, reference: str) -> Tuple[bytes, str, Optional[str]]:
+        """
+        Fetch a manifest.
+        
+        Args:
+            repository: Repository name
+            reference: Tag or digest
+        
+        Returns:
+            Tuple of (raw manifest, media type, manifest digest)
+        """
+        _, headers, body = self._request(
+            'GET', f"{repository}/manifests/{reference}", f"repository:{repository}:pull",
+            headers={'Accept': ', '.join(MANIFEST_MEDIA_TYPES)}
+        )
+        media_type = headers.get('Content-Type') or \
+            self._decode_manifest(body, repository, reference).get('mediaType', MANIFEST_MEDIA_TYPES[0])
+        return body, media_type, headers.get('Docker-Content-Digest')
+    
+    @staticmethod
+    def _decode_manifest(manifest: bytes, repository: str, reference: str) -> Dict[str, Any]:
+        """
+        Parse a raw manifest.
+        
+        Args:
+            manifest: Raw manifest
+            repository: Repository name, for error messages
+            reference: Tag or digest, for error messages
+        
+        Returns:
+            Parsed manifest
+        
+        Raises:
+            RegistryError: If the manifest is not a JSON object
+        """
+        try:
+            data = json.loads(manifest)
+        except ValueError as e:
+            raise RegistryError(f"Malformed manifest {repository}:{reference}: {str(e)}")
+        if not isinstance(data, dict):
+            raise RegistryError(f"Malformed manifest {repository}:{reference}: not a JSON object")
+        return data
+    
+    def put_manifest(self, repository: str, tag: str, manifest: bytes, media_type: str) -> Optional[str]:
+        """
+        Store a manifest under a tag.
+        
+        Args:
+            repository: Repository name
+            tag: Tag to publish
+            manifest: Raw manifest, byte-for-byte as fetched
+            media_type: Manifest media type
+        
+        Returns:
+            Digest reported by the registry
+        """
+        _, headers, _ = self._request(
+            'PUT', f"{repository}/manifests/{tag}", f"repository:{repository}:pull,push",
+            body=manifest, headers={'Content-Type': media_type}
+        )
+        return headers.get('Docker-Content-Digest')
+    
+    def tag(self, repository: str, source: str, tag: str) -> Dict[str, Any]:
+        """
+        Publish an existing manifest under another tag without moving blobs.
+        
+        Args:
+            repository: Repository name
+            source: Existing tag or digest
+            tag: Additional tag
+        
+        Returns:
+            Dict containing the manifest and its digest
+        """
+        manifest, media_type, digest = self.get_manifest(repository, source)
+        data = self._decode_manifest(manifest, repository, source)
+        put_digest = self.put_manifest(repository, tag, manifest, media_type)
+        return {'manifest': data, 'digest': put_digest or digest}
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Registry Session - Shared registry logins for Genesis Builder
+
+This module keeps track of registry logins so the builder authenticates once
+per registry and credential set instead of before every push. Sessions
+expire after a configurable time and are renewed early when a push fails
+with an authentication error.
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Callable, Tuple
+
+logger = logging.getLogger('genesis_registry')
+
+# Fragments of docker/registry error output indicating missing or expired credentials
+AUTH_ERROR_MARKERS = (
+    'unauthorized',
+    'authentication required',
+    'no basic auth credentials',
+    'denied: requested access',
+    'access token has insufficient scopes'
+)
+
+
+def is_auth_error(output: str) -> bool:
+    """
+    Check whether command output indicates an authentication failure.
+    
+    Args:
+        output: stderr/stdout of a registry operation
+    
+    Returns:
+        True if the registry rejected the credentials
+    """
+    output = (output or '').lower()
+    return any(marker in output for marker in AUTH_ERROR_MARKERS)
+
+
+class RegistrySessionManager:
+    """
+    Caches registry login sessions, shared across concurrent pushes.
+    
+    Each (registry, username, password) combination has its own session and
+    lock, so concurrent pushes to the same registry wait for a single login
+    while pushes to other registries proceed independently.
+    """
+    
+    def __init__(self, login_fn: Callable[[str, str, str], Tuple[bool, str]], ttl: float = 3600):
+        """
+        Initialize the session manager.
+        
+        Args:
+            login_fn: Callable performing a login, returning (success, message)
+            ttl: Seconds after which a session is considered expired
+        """
+        self.login_fn = login_fn
+        self.ttl = ttl
+        self.logins = 0
+        self._sessions: Dict[Tuple[str, str, str], float] = {}
+        self._locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._guard = threading.Lock()
+    
+    @staticmethod
+    def _key(registry: str, username: str, password: str) -> Tuple[str, str, str]:
+        """Build the session key without keeping the plain password around."""
+        return registry, username, hashlib.sha256(password.encode('utf-8')).hexdigest()
+    
+    def _lock_for(self, key: Tuple[str, str, str]) -> threading.Lock:
+        """Get the lock serializing logins for a session key."""
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+    
+    def ensure(self, registry: str, username: str, password: str) -> Tuple[bool, str]:
+        """
+        Make sure a valid session exists, logging in if necessary.
+        
+        Args:
+            registry: Registry URL
+            username: Registry username
+            password: Registry password
+        
+        Returns:
+            Tuple of (success, message)
+        """
+        key = self._key(registry, username, password)
+        with self._lock_for(key):
+            expires_at = self._sessions.get(key)
+            if expires_at is not None and expires_at > time.monotonic():
+                return True, 'Session reused'
+            
+            logger.info(f"Logging in to registry {registry} as {username}")
+            success, message = self.login_fn(registry, username, password)
+            with self._guard:
+                self.logins += 1
+            if success:
+                self._sessions[key] = time.monotonic() + self.ttl
+            else:
+                self._sessions.pop(key, None)
+            return success, message
+    
+    def invalidate(self, registry: str, username: str, password: str):
+        """
+        Drop a session so the next push logs in again.
+        
+        Args:
+            registry: Registry URL
+            username: Registry username
+            password: Registry password
+        """
+        key = self._key(registry, username, password)
+        with self._lock_for(key):
+            if self._sessions.pop(key, None) is not None:
+                logger.info(f"Invalidated registry session for {registry} ({username})")
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get session statistics.
+        
+        Returns:
+            Dict containing the number of logins performed and active sessions
+        """
+        now = time.monotonic()
+        with self._guard:
+            active = sum(1 for expires_at in self._sessions.values() if expires_at > now)
+            return {'logins': self.logins, 'active_sessions': active}
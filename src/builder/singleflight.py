@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Single Flight - Request coalescing for Genesis operations
+
+This module deduplicates concurrent identical work. SingleFlight shares one
+call among concurrent callers asking for the same key (status queries), and
+InFlightRegistry maps a key to the operation currently producing it, so
+duplicate build requests attach to that operation instead of starting
+another one.
+"""
+
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple, Hashable
+
+logger = logging.getLogger('genesis_singleflight')
+
+
+class _Call:
+    """A call in flight and the outcome shared with its waiters."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Shares the result of a call among concurrent callers using the same key.
+    
+    Results are not cached: a call starting after the previous one finished
+    runs again, so callers never see results older than their request.
+    """
+    
+    def __init__(self, name: str):
+        """
+        Initialize the group.
+        
+        Args:
+            name: Name of the group, used in log messages
+        """
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._guard = threading.Lock()
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Call a function, or wait for the call already running for the key.
+        
+        Exceptions raised by the function are raised in every caller sharing
+        the call.
+        
+        Args:
+            key: Key identifying identical calls
+            fn: Function to call
+        
+        Returns:
+            Tuple of (result, True if the result came from another caller's call)
+        """
+        with self._guard:
+            call = self._calls.get(key)
+            shared = call is not None
+            if shared:
+                call.waiters += 1
+            else:
+                call = self._calls[key] = _Call()
+        
+        if shared:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._guard:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.debug(f"{self.name}: shared {key} with {call.waiters} callers")
+        return call.result, False
+
+
+class InFlightRegistry:
+    """
+    Registry of the operations currently producing a result, by key.
+    
+    The first operation claiming a key owns it until it releases the key;
+    later claims get the owner's ID back and can attach to it.
+    """
+    
+    def __init__(self, name: str):
+        """
+        Initialize the registry.
+        
+        Args:
+            name: Name of the registry, used in log messages
+        """
+        self.name = name
+        self._owners: Dict[Hashable, str] = {}
+        self._guard = threading.Lock()
+    
+    def claim(self, key: Hashable, operation_id: str,
+              is_active: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        Claim a key for an operation unless another operation owns it.
+        
+        Args:
+            key: Key identifying the result, e.g. a component and its build inputs
+            operation_id: ID of the operation claiming the key
+            is_active: Optional check of the current owner; owners failing it
+                (finished or lost operations) are replaced
+        
+        Returns:
+            ID of the operation owning the key, None if the claim succeeded
+        """
+        with self._guard:
+            owner = self._owners.get(key)
+            if owner is not None and owner != operation_id and (is_active is None or is_active(owner)):
+                return owner
+            if owner is not None and owner != operation_id:
+                logger.warning(f"{self.name}: replacing inactive owner {owner} of {key}")
+            self._owners[key] = operation_id
+            return None
+    
+    def release(self, key: Hashable, operation_id: str):
+        """
+        Release a key claimed by an operation.
+        
+        Args:
+            key: Claimed key
+            operation_id: ID of the operation that claimed the key
+        """
+        with self._guard:
+            if self._owners.get(key) == operation_id:
+                del self._owners[key]
+    
+    def __len__(self) -> int:
+        with self._guard:
+            return len(self._owners)
@@ -0,0 +1,11 @@
+"""
+Shared test setup
+
+The builder modules import each other by module name (they run from
+src/builder), so tests put that directory on the import path the same way.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'builder'))
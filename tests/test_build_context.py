@@ -0,0 +1,68 @@
+"""Tests for build context listing and archiving."""
+
+import io
+import os
+import tarfile
+
+import pytest
+
+from build_cache import ContextIndex
+from build_context import DockerIgnore, iter_context_files, iter_context_tar
+
+
+@pytest.fixture
+def context(tmp_path):
+    root = tmp_path / 'context'
+    (root / 'src' / 'pkg').mkdir(parents=True)
+    (root / 'src' / 'pkg' / 'main.py').write_text('print("main")\n')
+    (root / 'empty').mkdir()
+    (root / 'Dockerfile').write_text('FROM scratch\nCOPY . /app\n')
+    os.symlink('src/pkg', root / 'linked')
+    os.symlink('Dockerfile', root / 'Dockerfile.link')
+    return root
+
+
+def archive(context, paths):
+    data = b''.join(iter_context_tar([(path, os.path.join(context, path)) for path in paths]))
+    return tarfile.open(fileobj=io.BytesIO(data))
+
+
+def test_directories_and_symlinked_directories_are_listed(context):
+    assert list(iter_context_files(str(context))) == [
+        'Dockerfile', 'Dockerfile.link', 'linked', 'empty/', 'src/', 'src/pkg/', 'src/pkg/main.py'
+    ]
+
+
+def test_archive_keeps_empty_directories_and_directory_symlinks(context):
+    with archive(context, iter_context_files(str(context))) as tar:
+        members = {member.name: member for member in tar.getmembers()}
+        
+        assert members['empty'].isdir()
+        assert members['src/pkg'].isdir()
+        assert members['linked'].issym()
+        assert members['linked'].linkname == 'src/pkg'
+        assert members['Dockerfile.link'].linkname == 'Dockerfile'
+        assert tar.extractfile('src/pkg/main.py').read() == b'print("main")\n'
+
+
+def test_dockerignore_applies_to_directories_and_symlinks(context):
+    ignore = DockerIgnore(['empty', 'linked', 'src/*'])
+    
+    assert list(iter_context_files(str(context), ignore)) == ['Dockerfile', 'Dockerfile.link', 'src/']
+
+
+def test_dockerignore_exception_keeps_files_of_excluded_directory(context):
+    ignore = DockerIgnore(['src', '!src/pkg/main.py'])
+    
+    assert list(iter_context_files(str(context), ignore)) == [
+        'Dockerfile', 'Dockerfile.link', 'linked', 'empty/', 'src/pkg/main.py'
+    ]
+
+
+def test_context_index_scans_directories_without_size(context, tmp_path):
+    scan = ContextIndex(str(tmp_path / 'index')).scan(str(context))
+    sizes = {path: size for path, size, _ in scan['files']}
+    
+    assert sizes['empty/'] == sizes['src/'] == 0
+    assert sizes['linked'] == len('src/pkg')
+    assert scan['bytes'] == sum(sizes.values())
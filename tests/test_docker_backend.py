@@ -0,0 +1,218 @@
+"""Tests for the Engine API Docker backend, run against the fake Docker daemon."""
+
+import json
+import base64
+
+import pytest
+
+from fake_docker_engine import FakeDockerEngine, _protobuf_field, _protobuf_timestamp
+from docker_backend import CLIDockerBackend, EngineAPIClient, EngineAPIDockerBackend, decode_buildkit_status
+
+DOCKERFILE = 'FROM alpine:3.19\nRUN echo built\n'
+
+
+class RecordingRunner:
+    """Command runner standing in for GenesisBuilder._run_command."""
+    
+    def __init__(self, returncode=0, stdout='', stderr=''):
+        self.result = (returncode, stdout, stderr)
+        self.calls = []
+    
+    def __call__(self, cmd, log_sink=None, input_data=None, tail_lines=200):
+        self.calls.append({'cmd': cmd, 'input_data': input_data})
+        return self.result
+
+
+@pytest.fixture
+def context(tmp_path):
+    (tmp_path / 'Dockerfile').write_text(DOCKERFILE)
+    (tmp_path / 'app.py').write_text('print("hello")\n')
+    return tmp_path
+
+
+@pytest.fixture
+def engine():
+    with FakeDockerEngine(output_lines=3, credentials={'robot': 'secret'}) as fake:
+        yield fake
+
+
+def backend_for(engine, **kwargs):
+    return EngineAPIDockerBackend(EngineAPIClient(engine.socket_path), **kwargs)
+
+
+def build(backend, context, **kwargs):
+    lines = []
+    result = backend.build(['registry.local/app:1'], str(context / 'Dockerfile'), str(context), ['MODE=test'],
+                           log_sink=lines.append, **kwargs)
+    return result, lines
+
+
+def test_classic_build_events_become_cli_output(engine, context):
+    (returncode, stdout, stderr), lines = build(backend_for(engine, buildkit=False), context)
+    
+    assert returncode == 0
+    assert stderr == ''
+    assert lines[0].startswith('Sending build context to Docker daemon')
+    assert lines[1:3] == ['Step 1/2 : FROM alpine:3.19', 'Step 2/2 : RUN echo built']
+    assert lines[3:6] == [' ---> output line 0', ' ---> output line 1', ' ---> output line 2']
+    image = engine.images['registry.local/app:1']
+    assert f"Image ID: {image['Id']}" in lines
+    assert lines[-1] == 'Successfully tagged registry.local/app:1'
+    assert stdout == ''.join(line + '\n' for line in lines)
+    assert engine.requests.count('POST /build') == 1
+
+
+def test_buildkit_trace_events_become_rawjson_lines(engine, context):
+    (returncode, _, _), lines = build(backend_for(engine), context)
+    
+    assert returncode == 0
+    progress = [json.loads(line) for line in lines if line.startswith('{')]
+    vertexes = [vertex for event in progress for vertex in event['vertexes']]
+    assert [vertex['name'] for vertex in vertexes if 'completed' in vertex] == [
+        '[1/2] FROM alpine:3.19', '[2/2] RUN echo built']
+    statuses = [status for event in progress for status in event['statuses']]
+    assert statuses[0]['id'] == 'transferring context'
+    assert statuses[0]['current'] == statuses[0]['total'] > 0
+    logs = [base64.b64decode(log['data']).decode('utf-8') for event in progress for log in event['logs']]
+    assert logs == ['output line 0\n', 'output line 1\n', 'output line 2\n']
+    assert lines[-1] == f"Image ID: {engine.images['registry.local/app:1']['Id']}"
+
+
+def test_failed_build_reports_error(engine, context):
+    engine.fail_builds = True
+    
+    (returncode, _, stderr), lines = build(backend_for(engine), context)
+    
+    assert returncode == 1
+    assert stderr == 'build failed'
+    assert any('"error": "build failed"' in line for line in lines)
+    assert 'registry.local/app:1' not in engine.images
+
+
+def test_push_sends_credentials_and_reports_layers(engine):
+    engine.add_image('registry.local/app:1', layers=2)
+    backend = backend_for(engine)
+    lines = []
+    
+    returncode, _, stderr = backend.push('registry.local/app:1', log_sink=lines.append,
+                                         credentials=('registry.local', 'robot', 'secret'))
+    
+    assert (returncode, stderr) == (0, '')
+    assert lines[0] == 'The push refers to repository [registry.local/app]'
+    assert [line.split(': ')[1] for line in lines[1:5]] == ['Preparing', 'Pushed', 'Preparing', 'Pushed']
+    assert lines[-1].startswith('1: digest: sha256:')
+    assert 'POST /images/registry.local/app/push' in engine.requests
+    
+    # Layers pushed before are skipped by the registry
+    _, stdout, _ = backend.push('registry.local/app:1', credentials=('registry.local', 'robot', 'secret'))
+    assert stdout.count('Layer already exists') == 2
+
+
+def test_push_without_valid_credentials_fails(engine):
+    engine.add_image('registry.local/app:1')
+    
+    returncode, _, stderr = backend_for(engine).push('registry.local/app:1',
+                                                     credentials=('registry.local', 'robot', 'wrong'))
+    
+    assert returncode == 1
+    assert stderr == 'unauthorized: authentication required'
+
+
+def test_push_of_missing_image_fails(engine):
+    returncode, _, stderr = backend_for(engine).push('registry.local/missing:1',
+                                                     credentials=('registry.local', 'robot', 'secret'))
+    
+    assert returncode == 1
+    assert 'does not exist locally' in stderr
+
+
+def test_login_validates_credentials(engine):
+    backend = backend_for(engine)
+    
+    assert backend.login('registry.local', 'robot', 'secret') == (True, 'Login Succeeded')
+    success, message = backend.login('registry.local', 'robot', 'wrong')
+    assert success is False
+    assert 'incorrect username or password' in message
+
+
+@pytest.mark.parametrize('cache_from,cache_to', [
+    (['type=registry,ref=registry.local/app:cache,mode=max'], None),
+    (['type=local,src=/tmp/cache'], None),
+    (None, ['type=registry,ref=registry.local/app:cache,mode=max']),
+])
+def test_unsupported_cache_specs_build_with_cli_fallback(engine, context, cache_from, cache_to):
+    runner = RecordingRunner()
+    backend = backend_for(engine, fallback=CLIDockerBackend(runner))
+    
+    (returncode, _, _), _ = build(backend, context, cache_from=cache_from, cache_to=cache_to)
+    
+    assert returncode == 0
+    assert 'POST /build' not in engine.requests
+    [call] = runner.calls
+    cmd = call['cmd']
+    assert cmd[:4] == ['docker', 'build', '-t', 'registry.local/app:1']
+    for spec in cache_from or []:
+        assert cmd[cmd.index('--cache-from') + 1] == spec
+    for spec in cache_to or []:
+        assert cmd[cmd.index('--cache-to') + 1] == spec
+    assert cmd[-3:] == ['-f', str(context / 'Dockerfile'), str(context)]
+
+
+def test_supported_cache_specs_build_through_engine(engine, context):
+    runner = RecordingRunner()
+    backend = backend_for(engine, fallback=CLIDockerBackend(runner), buildkit=False)
+    
+    (returncode, _, _), _ = build(backend, context, cache_from=['type=registry,ref=registry.local/app:cache'],
+                                  cache_to=['type=inline'])
+    
+    assert returncode == 0
+    assert runner.calls == []
+    assert engine.requests.count('POST /build') == 1
+
+
+def test_unreachable_daemon_uses_cli_fallback(tmp_path, context):
+    runner = RecordingRunner(stdout='Login Succeeded\n')
+    backend = EngineAPIDockerBackend(EngineAPIClient(str(tmp_path / 'missing.sock')),
+                                     fallback=CLIDockerBackend(runner))
+    
+    assert backend.ping() is False
+    assert backend.login('registry.local', 'robot', 'secret') == (True, 'Login succeeded')
+    assert runner.calls[-1] == {'cmd': ['docker', 'login', 'registry.local', '-u', 'robot', '--password-stdin'],
+                                'input_data': 'secret'}
+    (returncode, _, _), _ = build(backend, context)
+    assert returncode == 0
+    assert runner.calls[-1]['cmd'][:2] == ['docker', 'build']
+
+
+def test_decode_buildkit_status():
+    digest = 'sha256:' + 'a' * 64
+    vertex = (_protobuf_field(1, digest) + _protobuf_field(3, '[1/1] RUN make') + _protobuf_field(4, 1) +
+              _protobuf_field(5, _protobuf_timestamp(1704067200.5)) +
+              _protobuf_field(6, _protobuf_timestamp(1704067202.25)) + _protobuf_field(7, 'exit code: 2'))
+    status = (_protobuf_field(1, 'pulling layer') + _protobuf_field(2, digest) + _protobuf_field(3, 'layer 1') +
+              _protobuf_field(4, 512) + _protobuf_field(5, 1024))
+    log = _protobuf_field(1, digest) + _protobuf_field(3, 2) + _protobuf_field(4, b'compiling\n')
+    message = _protobuf_field(1, vertex) + _protobuf_field(2, status) + _protobuf_field(3, log)
+    
+    assert decode_buildkit_status(message) == {
+        'vertexes': [{'digest': digest, 'name': '[1/1] RUN make', 'cached': True,
+                      'started': '2024-01-01T00:00:00.500000000Z', 'completed': '2024-01-01T00:00:02.250000000Z',
+                      'error': 'exit code: 2'}],
+        'statuses': [{'id': 'pulling layer', 'vertex': digest, 'name': 'layer 1', 'current': 512, 'total': 1024}],
+        'logs': [{'vertex': digest, 'stream': 2, 'data': base64.b64encode(b'compiling\n').decode('ascii')}]
+    }
+
+
+def test_decode_buildkit_status_defaults_missing_fields():
+    vertex = _protobuf_field(1, 'sha256:b') + _protobuf_field(3, '[1/1] FROM scratch')
+    
+    assert decode_buildkit_status(_protobuf_field(1, vertex) + _protobuf_field(2, b'')) == {
+        'vertexes': [{'digest': 'sha256:b', 'name': '[1/1] FROM scratch'}],
+        'statuses': [{'id': None, 'vertex': None, 'name': None, 'current': 0, 'total': 0}],
+        'logs': []
+    }
+
+
+def test_decode_buildkit_status_rejects_truncated_message():
+    with pytest.raises(ValueError):
+        decode_buildkit_status(_protobuf_field(1, b'vertex')[:-2])
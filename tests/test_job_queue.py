@@ -0,0 +1,48 @@
+"""Tests for the bounded job queue."""
+
+import threading
+
+import pytest
+
+from job_queue import JobQueue, QueueFullError
+
+
+def test_rejected_job_reports_no_state():
+    states = []
+    release = threading.Event()
+    started = threading.Event()
+    jobs = JobQueue(workers=1, max_size=1, on_state=lambda job_id, state: states.append((job_id, state)))
+    
+    def block():
+        started.set()
+        release.wait(5)
+    
+    try:
+        jobs.submit('running', block)
+        assert started.wait(5)
+        jobs.submit('queued', block)
+        with pytest.raises(QueueFullError) as error:
+            jobs.submit('rejected', block)
+        assert error.value.retry_after >= 1
+        assert [job_id for job_id, _ in states if job_id == 'rejected'] == []
+        assert ('queued', 'pending') in states
+    finally:
+        release.set()
+
+
+def test_pending_is_reported_before_running():
+    states = []
+    done = threading.Event()
+    
+    def on_state(job_id, state):
+        if state == 'pending':
+            # A slow observer must not let the worker report 'running' first
+            done.wait(0.2)
+        states.append(state)
+    
+    jobs = JobQueue(workers=2, on_state=on_state)
+    finished = threading.Event()
+    jobs.submit('job', finished.set)
+    
+    assert finished.wait(5)
+    assert states == ['pending', 'running']
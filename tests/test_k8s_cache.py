@@ -0,0 +1,190 @@
+"""Tests for the watch-based Kubernetes status cache, run against the fake API server."""
+
+import json
+import time
+
+import pytest
+
+pytest.importorskip('kubernetes')
+
+from kubernetes import client as k8s_client
+
+from fake_kube_api import FakeKubeAPI
+from k8s_cache import KubernetesStatusCache, summarize_deployment, summarize_service
+
+NAMESPACE = 'singularity-system'
+
+
+def deployment(name, replicas=2, ready=1, image='registry/app:1', conditions=None):
+    return {
+        'metadata': {'name': name, 'generation': 3},
+        'spec': {'replicas': replicas, 'selector': {'matchLabels': {'app': name}},
+                 'template': {'metadata': {'labels': {'app': name}},
+                              'spec': {'containers': [{'name': name, 'image': image}]}}},
+        'status': {'readyReplicas': ready, 'updatedReplicas': ready, 'availableReplicas': ready,
+                   'observedGeneration': 3,
+                   'conditions': conditions or [{'type': 'Available', 'status': 'True',
+                                                 'reason': 'MinimumReplicasAvailable', 'message': 'ok',
+                                                 'lastUpdateTime': '2024-01-01T00:00:00Z'}]}
+    }
+
+
+def service(name, port=80):
+    return {
+        'metadata': {'name': name},
+        'spec': {'type': 'LoadBalancer', 'clusterIP': '10.0.0.7',
+                 'ports': [{'name': 'http', 'port': port, 'targetPort': 8080, 'nodePort': 30080}]},
+        'status': {'loadBalancer': {'ingress': [{'ip': '203.0.113.5'}, {'hostname': 'lb.example'}]}}
+    }
+
+
+def wait_for(predicate, timeout=10):
+    """Poll until predicate returns a truthy value."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = predicate()
+        if value:
+            return value
+        time.sleep(0.02)
+    raise AssertionError('condition not met in time')
+
+
+def names(status, key):
+    return [item['name'] for item in status[key]]
+
+
+@pytest.fixture
+def api():
+    with FakeKubeAPI(namespaces=[NAMESPACE]) as server:
+        yield server
+
+
+@pytest.fixture
+def cache(api):
+    configuration = k8s_client.Configuration()
+    configuration.host = api.url
+    status_cache = KubernetesStatusCache(None, api_client=k8s_client.ApiClient(configuration))
+    yield status_cache
+    status_cache.stop()
+
+
+def test_initial_list_returns_trimmed_summaries(api, cache):
+    api.put('Deployment', NAMESPACE, deployment('engine', replicas=3, ready=2, image='registry/engine:7'))
+    api.put('Service', NAMESPACE, service('engine'))
+    
+    status = cache.get_status(NAMESPACE)
+    
+    assert status['status'] == 'success'
+    assert status['source'] == 'watch'
+    assert status['stale'] is False
+    assert status['deployments'] == [{
+        'name': 'engine',
+        'replicas': {'desired': 3, 'ready': 2, 'updated': 2, 'available': 2},
+        'images': ['registry/engine:7'],
+        'generation': 3,
+        'observed_generation': 3,
+        'conditions': [{'type': 'Available', 'status': 'True', 'reason': 'MinimumReplicasAvailable',
+                        'message': 'ok'}]
+    }]
+    assert status['services'] == [{
+        'name': 'engine',
+        'type': 'LoadBalancer',
+        'cluster_ip': '10.0.0.7',
+        'external': ['203.0.113.5', 'lb.example'],
+        'ports': [{'name': 'http', 'port': 80, 'target_port': 8080, 'node_port': 30080, 'protocol': 'TCP'}]
+    }]
+
+
+def test_unknown_namespace_is_reported(cache):
+    assert cache.get_status('missing') == {'status': 'error', 'message': 'Namespace not found: missing'}
+
+
+def test_watch_applies_added_modified_and_deleted_events(api, cache):
+    api.put('Deployment', NAMESPACE, deployment('engine'))
+    assert names(cache.get_status(NAMESPACE), 'deployments') == ['engine']
+    wait_for(lambda: api.watch_count() == 2)
+    
+    api.put('Deployment', NAMESPACE, deployment('monitor'))
+    wait_for(lambda: names(cache.get_status(NAMESPACE), 'deployments') == ['engine', 'monitor'])
+    
+    api.put('Deployment', NAMESPACE, deployment('engine', ready=2, image='registry/engine:8'))
+    engine = wait_for(lambda: [item for item in cache.get_status(NAMESPACE)['deployments']
+                               if item['name'] == 'engine' and item['replicas']['ready'] == 2])
+    assert engine[0]['images'] == ['registry/engine:8']
+    
+    api.delete('Deployment', NAMESPACE, 'monitor')
+    wait_for(lambda: names(cache.get_status(NAMESPACE), 'deployments') == ['engine'])
+    
+    api.put('Service', NAMESPACE, service('engine', port=443))
+    wait_for(lambda: [item['ports'][0]['port'] for item in cache.get_status(NAMESPACE)['services']] == [443])
+    
+    # Every change arrived through the watch, none through a relist after an error
+    assert api.requests.count(f"GET /apis/apps/v1/namespaces/{NAMESPACE}/deployments") == 1
+    assert all(informer.last_error is None for informer in cache._informers[NAMESPACE])
+
+
+def test_status_is_rendered_once_per_change(api, cache):
+    api.put('Deployment', NAMESPACE, deployment('engine'))
+    first = cache.get_status(NAMESPACE)
+    assert cache.get_status(NAMESPACE) is first
+    
+    api.put('Deployment', NAMESPACE, deployment('engine', ready=2))
+    wait_for(lambda: cache.get_status(NAMESPACE) is not first)
+
+
+def test_watch_resumes_after_disconnect(api, cache):
+    api.put('Deployment', NAMESPACE, deployment('engine'))
+    cache.get_status(NAMESPACE)
+    wait_for(lambda: api.watch_count() == 2)
+    lists_before = sum(1 for request in api.requests if not request.endswith('?watch'))
+    
+    api.disconnect_watches()
+    api.put('Deployment', NAMESPACE, deployment('monitor'))
+    
+    wait_for(lambda: names(cache.get_status(NAMESPACE), 'deployments') == ['engine', 'monitor'])
+    wait_for(lambda: api.watch_count() == 2)
+    # A dropped watch resumes from the last resource version instead of relisting
+    assert sum(1 for request in api.requests if not request.endswith('?watch')) == lists_before
+
+
+def test_expired_resource_version_relists(api, cache):
+    api.put('Deployment', NAMESPACE, deployment('engine'))
+    cache.get_status(NAMESPACE)
+    wait_for(lambda: api.watch_count() == 2)
+    deployment_path = f"GET /apis/apps/v1/namespaces/{NAMESPACE}/deployments"
+    assert api.requests.count(deployment_path) == 1
+    
+    api.expire_watches()
+    wait_for(lambda: api.requests.count(deployment_path) == 2)
+    
+    api.delete('Deployment', NAMESPACE, 'engine')
+    wait_for(lambda: names(cache.get_status(NAMESPACE), 'deployments') == [])
+
+
+def test_stop_ends_informer_threads(api, cache):
+    cache.get_status(NAMESPACE)
+    wait_for(lambda: api.watch_count() == 2)
+    informers = cache._informers[NAMESPACE]
+    
+    started = time.monotonic()
+    cache.stop()
+    
+    # Open watches are closed rather than left to run into WATCH_TIMEOUT
+    assert time.monotonic() - started < 5
+    assert not any(informer.running for informer in informers)
+
+
+def test_kubectl_fallback_parses_one_call():
+    calls = []
+    output = {'items': [dict(deployment('engine'), kind='Deployment'), dict(service('engine'), kind='Service')]}
+    
+    def run_command(cmd, **kwargs):
+        calls.append(cmd)
+        return 0, json.dumps(output), ''
+    
+    status = KubernetesStatusCache(run_command, context='alpha', use_informers=False).get_status(NAMESPACE)
+    
+    assert status['source'] == 'kubectl'
+    assert status['deployments'] == [summarize_deployment(output['items'][0])]
+    assert status['services'] == [summarize_service(output['items'][1])]
+    assert calls == [['kubectl', 'get', 'deployments,services', '-n', NAMESPACE, '-o', 'json', '--context', 'alpha']]
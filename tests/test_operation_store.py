@@ -0,0 +1,19 @@
+"""Tests for the operation store factory."""
+
+from operation_store import MemoryOperationStore, SQLiteOperationStore, create_operation_store
+
+
+def test_sqlite_store_is_created(tmp_path):
+    store = create_operation_store('sqlite', str(tmp_path / 'state' / 'operations.db'))
+    
+    assert isinstance(store, SQLiteOperationStore)
+
+
+def test_unusable_state_dir_falls_back_to_memory(tmp_path):
+    # The database directory cannot be created below a regular file
+    blocker = tmp_path / 'state'
+    blocker.write_text('')
+    
+    store = create_operation_store('sqlite', str(blocker / 'operations.db'))
+    
+    assert isinstance(store, MemoryOperationStore)